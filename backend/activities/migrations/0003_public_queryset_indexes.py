@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_alter_activity_options_activity_season'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'season', 'order', 'title'], name='activity_active_order_idx'),
+        ),
+    ]
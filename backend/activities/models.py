@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
+from django.contrib.contenttypes.fields import GenericRelation
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
 from core.models import SEOMixin
@@ -59,6 +60,7 @@ class Activity(SEOMixin):
         format='WEBP',
         options={'quality': 85}
     )
+    renditions = GenericRelation('core.Rendition')
     video = models.FileField(
         upload_to='activities/videos/',
         blank=True,
@@ -79,6 +81,13 @@ class Activity(SEOMixin):
         verbose_name = 'Активность'
         verbose_name_plural = 'Активности'
         ordering = ['category', 'season', 'order', 'title']
+        indexes = [
+            # /api/activities/: активные по категории, сезону и порядку
+            models.Index(
+                fields=['category', 'season', 'order', 'title'], condition=models.Q(is_active=True),
+                name='activity_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.get_category_display()} - {self.title}'
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Activity
+from core.serializer_mixins import ImageVariantsMixin
 
 
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(ImageVariantsMixin, serializers.ModelSerializer):
     """Сериализатор для активности"""
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
@@ -21,37 +22,15 @@ class ActivitySerializer(serializers.ModelSerializer):
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['image_webp'], 'image')
 
     def get_video_url(self, obj):
         """Возвращает URL видео"""
-        if obj.video:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.video.url)
-            return obj.video.url
-        return None
+        return self.get_file_url(obj.video)
 
     def get_seo_fields(self, obj):
         """Возвращает SEO поля"""
@@ -1,13 +1,16 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from core.api_cache import CachedResponseMixin
+from core.media_urls import MediaBaseMixin
 from .models import Activity
 from .serializers import ActivitySerializer
 
 
-class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
+class ActivityViewSet(MediaBaseMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для активностей"""
-    queryset = Activity.objects.filter(is_active=True)
+    cache_namespace = 'activities'
+    queryset = Activity.objects.filter(is_active=True).prefetch_related('renditions')
     serializer_class = ActivitySerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -90,6 +90,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.singletons.SingletonCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -115,13 +116,141 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Профили SQLite (SQLITE_PROFILE):
+# production - WAL (читатели не ждут писателя), synchronous=NORMAL,
+# mmap и кеш страниц в памяти; прагмы выполняются на каждом новом
+# соединении. Транзакции IMMEDIATE берут блокировку записи сразу,
+# поэтому конкурирующая запись ждет busy_timeout, а не падает
+# с "database is locked" при повышении блокировки.
+# default - настройки SQLite по умолчанию (журнал DELETE), для разработки
+# и тестов. Продакшен включает production в .env.
+SQLITE_PROFILES = {
+    'production': {
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA mmap_size=268435456;'
+            'PRAGMA cache_size=-65536;'
+            'PRAGMA temp_store=MEMORY;'
+            'PRAGMA busy_timeout=5000;'
+        ),
+        'transaction_mode': 'IMMEDIATE',
+    },
+    'default': {},
+}
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_PROFILES[SQLITE_PROFILE],
     }
 }
 
+# PostgreSQL (DB_ENGINE=postgresql) - для нескольких серверов и большого
+# числа воркеров. Данные из SQLite переносит команда copy_sqlite_data.
+# Без POSTGRES_POOL_SIZE соединение процесса переиспользуется между
+# запросами (CONN_MAX_AGE, с проверкой перед запросом). С ним - пул psycopg
+# в каждом процессе (нужен при потоках/ASGI), Django тогда требует
+# CONN_MAX_AGE = 0.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+if DB_ENGINE == 'postgresql':
+    POSTGRES_POOL_SIZE = int(os.environ.get('POSTGRES_POOL_SIZE', '0'))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'sp_new'),
+            'USER': os.environ.get('POSTGRES_USER', 'sp_new'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if POSTGRES_POOL_SIZE else int(os.environ.get('POSTGRES_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': 1,
+                    'max_size': POSTGRES_POOL_SIZE,
+                    'timeout': 10,
+                },
+            } if POSTGRES_POOL_SIZE else {},
+        }
+    }
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Cache
+# В продакшене - Redis (общий для всех процессов gunicorn),
+# в разработке и тестах - локальная память процесса (без REDIS_URL
+# при DEBUG=False кеш ответов API выключается)
+
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'sp-new',
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                # При недоступности Redis API работает без кеша
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+    DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Кеш ответов публичного API (core.api_cache). Актуальность обеспечивается
+# сбросом по сигналам моделей, таймаут лишь ограничивает объем кеша.
+API_CACHE_ENABLED = os.environ.get('API_CACHE_ENABLED', 'True') == 'True'
+if API_CACHE_ENABLED and not REDIS_URL and not DEBUG:
+    # Сброс кеша после сохранения виден только процессу, обработавшему
+    # сохранение: остальные процессы gunicorn отдавали бы старые ответы
+    import warnings
+    warnings.warn(
+        'REDIS_URL не задан: кеш ответов API выключен. '
+        'Установите REDIS_URL в .env файле или переменных окружения.',
+        UserWarning
+    )
+    API_CACHE_ENABLED = False
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', str(60 * 60 * 24)))
+
+# Снимки JSON ответов (core.snapshots): хранятся в кеше ('cache') или в
+# каталоге API_SNAPSHOT_ROOT ('disk'), вместе со сжатыми копиями.
+# brotli используется, если установлен пакет brotli.
+API_SNAPSHOT_STORAGE = os.environ.get('API_SNAPSHOT_STORAGE', 'cache')
+API_SNAPSHOT_ROOT = os.environ.get('API_SNAPSHOT_ROOT', str(BASE_DIR / 'snapshots'))
+API_SNAPSHOT_ENCODINGS = [
+    encoding.strip()
+    for encoding in os.environ.get('API_SNAPSHOT_ENCODINGS', 'br,gzip').split(',')
+    if encoding.strip()
+]
+# Адреса сайта, для которых снимки перестраиваются в фоне после сохранения
+# моделей, например https://example.com (через запятую; пусто - при первом запросе)
+API_SNAPSHOT_ORIGINS = [
+    origin.strip().rstrip('/')
+    for origin in os.environ.get('API_SNAPSHOT_ORIGINS', '').split(',')
+    if origin.strip()
+]
+
+# Async путь чтения публичного API (core.async_reads) - только под ASGI
+# (gunicorn -k uvicorn_worker.UvicornWorker config.asgi:application)
+API_ASYNC_READS = os.environ.get('API_ASYNC_READS', 'False') == 'True'
+
+# Singleton-модели (SiteSettings, Restaurant) читаются из кеша django-solo,
+# save() обновляет запись в кеше (см. core/singletons.py). Кеш в памяти
+# процесса обновился бы только в процессе, обработавшем save(), поэтому
+# без REDIS_URL при DEBUG=False объект читается из БД (раз на запрос)
+SOLO_CACHE = 'default' if REDIS_URL or DEBUG else None
+SOLO_CACHE_TIMEOUT = 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -163,6 +292,17 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Media files
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Оригиналы медиа сохраняются по SHA-256 содержимого с дедупликацией
+# (core.storage); варианты ImageKit - по хешу оригинала и спецификации
+MEDIA_CONTENT_ADDRESSED = os.environ.get('MEDIA_CONTENT_ADDRESSED', 'True') == 'True'
+if MEDIA_CONTENT_ADDRESSED:
+    STORAGES = {
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+# Префикс медиа URL в ответах API (например, https://cdn.example.com).
+# Пусто - схема и хост запроса
+MEDIA_BASE_URL = os.environ.get('MEDIA_BASE_URL', '')
 
 # CORS settings
 if DEBUG:
@@ -205,6 +345,8 @@ else:
     ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Префикс медиа для ответов с ?urls=relative (core.media_urls)
+CORS_EXPOSE_HEADERS = ['X-Media-Base']
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -219,4 +361,18 @@ REST_FRAMEWORK = {
 
 # ImageKit settings
 IMAGEKIT_DEFAULT_CACHEFILE_BACKEND = 'imagekit.cachefiles.backends.Simple'
-IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY = 'imagekit.cachefiles.strategies.JustInTime'
+# Имена вариантов содержат отпечаток исходника и параметров (core.storage):
+# файл под одним URL не меняется, nginx отдает их с Cache-Control immutable
+IMAGEKIT_SPEC_CACHEFILE_NAMER = 'core.storage.rendition_namer'
+# Варианты не генерируются внутри запроса: их создает фоновый пул потоков
+# после сохранения модели (core.image_pipeline). До готовности варианта
+# API отдает оригинальное изображение.
+IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY = 'core.image_pipeline.DeferredStrategy'
+
+# Количество потоков генерации вариантов в каждом процессе (0 - синхронно)
+IMAGE_RENDITION_WORKERS = int(os.environ.get('IMAGE_RENDITION_WORKERS', '2'))
+
+# Загрузка больших файлов частями (core.chunked_uploads). Часть должна
+# проходить через client_max_body_size nginx.
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', str(1024 * 1024 * 1024)))
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.utils.html import format_html
 from solo.admin import SingletonModelAdmin
+from .api_cache import invalidate_model
 from .models import SiteSettings, Statistic, GalleryImage, HeroSection, HeroImage
 
 
@@ -90,12 +91,14 @@ def activate_hero(modeladmin, request, queryset):
     HeroSection.objects.filter(is_active=True).update(is_active=False)
     # Активируем выбранные
     queryset.update(is_active=True)
+    invalidate_model(HeroSection)
 
 
 @admin.action(description='Деактивировать выбранные Hero секции')
 def deactivate_hero(modeladmin, request, queryset):
     """Действие для деактивации Hero секций"""
     queryset.update(is_active=False)
+    invalidate_model(HeroSection)
 
 
 @admin.register(HeroSection)
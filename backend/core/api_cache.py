@@ -0,0 +1,340 @@
+"""
+Кеш ответов публичного read-only API и условные GET
+
+JSON ответы GET хранятся готовыми снимками (core.snapshots) по схеме,
+хосту, пути и query string. Каждая вьюха относится к пространству имен,
+которое зависит от набора моделей (API_CACHE_DEPENDENCIES). При сохранении
+или удалении любой из этих моделей версия пространства имен увеличивается:
+новые запросы используют новые ключи, а старые записи истекают по таймауту.
+Та же версия дает ETag ответа, а время ее увеличения - Last-Modified.
+Для моделей с отложенной публикацией (API_CACHE_SCHEDULES) версия
+увеличивается и без сохранения, когда наступает ближайшая дата публикации.
+
+В продакшене кеш хранится в Redis (REDIS_URL), поэтому инвалидация общая
+для всех процессов gunicorn. Без Redis используется память процесса.
+"""
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .snapshots import (
+    SNAPSHOT_BYPASS, SNAPSHOT_DATA, SNAPSHOT_REFRESH, apply_snapshot, choose_encoding,
+    enqueue_warm, etag_for_encoding, get_encodings, get_snapshot, get_snapshot_mode,
+    is_snapshot_request, make_snapshot, set_snapshot, snapshot_data, snapshot_response,
+)
+
+
+API_CACHE_DEPENDENCIES = {
+    'statistics': ('core.Statistic',),
+    'gallery': ('core.GalleryImage',),
+    'hero': ('core.HeroSection', 'core.HeroImage'),
+    'site-settings': ('core.SiteSettings',),
+    # Schema.org JSON размещений, новостей и ресторана берет данные из SiteSettings
+    'lodges': (
+        'lodges.LodgeType', 'lodges.Lodge', 'lodges.LodgeImage',
+        'lodges.LodgePrice', 'lodges.LodgeAvailability', 'core.SiteSettings',
+    ),
+    'news': ('news.News', 'core.SiteSettings'),
+    'activities': ('activities.Activity',),
+    'events': ('events.EventType',),
+    'restaurant': (
+        'restaurant.Restaurant', 'restaurant.RestaurantImage',
+        'restaurant.MealType', 'restaurant.RestaurantBenefit', 'core.SiteSettings',
+    ),
+}
+"""Пространство имен кеша -> модели, от которых зависят его ответы"""
+
+API_CACHE_BUNDLES = {
+    'home': (
+        'hero', 'site-settings', 'statistics', 'gallery',
+        'lodges', 'activities', 'events', 'news',
+    ),
+    'lodges': ('site-settings', 'lodges'),
+    'restaurant': ('site-settings', 'restaurant'),
+}
+"""Бандл страницы (core.bundles) -> пространства имен его разделов"""
+
+API_CACHE_SCHEDULES = {
+    'news.News': 'published_at',
+}
+"""Модель -> поле даты публикации: ответы меняются, когда дата наступает"""
+
+
+def get_bundle_namespace(bundle):
+    return f'bundle-{bundle}'
+
+
+# Бандл кешируется целиком и сбрасывается при изменении модели любого раздела
+for _bundle, _namespaces in API_CACHE_BUNDLES.items():
+    API_CACHE_DEPENDENCIES[get_bundle_namespace(_bundle)] = tuple(dict.fromkeys(
+        label for namespace in _namespaces for label in API_CACHE_DEPENDENCIES[namespace]
+    ))
+
+_MODEL_NAMESPACES = {}
+_NAMESPACE_SCHEDULES = {}
+for _namespace, _labels in API_CACHE_DEPENDENCIES.items():
+    for _label in _labels:
+        _MODEL_NAMESPACES.setdefault(_label, []).append(_namespace)
+        if _label in API_CACHE_SCHEDULES:
+            _NAMESPACE_SCHEDULES.setdefault(_namespace, []).append(_label)
+
+
+def _version_key(namespace):
+    return f'api-cache:{namespace}:version'
+
+
+def _modified_key(namespace):
+    return f'api-cache:{namespace}:modified'
+
+
+def _schedule_key(label):
+    return f'api-cache:{label}:next-publication'
+
+
+def get_next_publication(label):
+    """UNIX-время ближайшей будущей даты публикации модели (0 - нет)"""
+    field = API_CACHE_SCHEDULES[label]
+    value = (
+        apps.get_model(label)._default_manager
+        .filter(**{f'{field}__gt': timezone.now()})
+        .order_by(field)
+        .values_list(field, flat=True)
+        .first()
+    )
+    return value.timestamp() if value else 0
+
+
+def _publish_scheduled(labels, state):
+    """
+    Сбрасывает кеш моделей, у которых наступила дата публикации
+
+    Ближайшая дата хранится в кеше и пересчитывается после сброса.
+
+    Returns:
+        bool: Был ли сброс
+    """
+    now = timezone.now().timestamp()
+    published = False
+    for label in labels:
+        key = _schedule_key(label)
+        next_publication = state.get(key)
+        if next_publication is None:
+            next_publication = get_next_publication(label)
+            cache.set(key, next_publication, None)
+        if next_publication and next_publication <= now:
+            invalidate_model(apps.get_model(label))
+            published = True
+    return published
+
+
+def _is_schedule_current(labels, state):
+    now = timezone.now().timestamp()
+    for label in labels:
+        next_publication = state.get(_schedule_key(label))
+        if next_publication is None or 0 < next_publication <= now:
+            return False
+    return True
+
+
+def get_namespace_state(namespace):
+    """
+    Текущая версия пространства имен и время его последнего изменения
+
+    Returns:
+        tuple: (version, modified) - версия и UNIX-время в секундах
+    """
+    labels = _NAMESPACE_SCHEDULES.get(namespace, ())
+    keys = (_version_key(namespace), _modified_key(namespace))
+    state = cache.get_many([*keys, *map(_schedule_key, labels)])
+    if labels and _publish_scheduled(labels, state):
+        state = cache.get_many(keys)
+    if not all(key in state for key in keys):
+        # Начальная версия от времени: после вытеснения ключа версии
+        # старые записи не станут снова актуальными
+        now = time.time_ns()
+        cache.add(keys[0], now, None)
+        cache.add(keys[1], now // 10 ** 9, None)
+        state = cache.get_many(keys)
+    return state.get(keys[0]), state.get(keys[1])
+
+
+async def aget_namespace_state(namespace):
+    """Асинхронный вариант get_namespace_state (ASGI)"""
+    labels = _NAMESPACE_SCHEDULES.get(namespace, ())
+    keys = (_version_key(namespace), _modified_key(namespace))
+    state = await cache.aget_many([*keys, *map(_schedule_key, labels)])
+    if not _is_schedule_current(labels, state):
+        # Дату публикации нужно пересчитать запросом к БД
+        return await sync_to_async(get_namespace_state)(namespace)
+    if not all(key in state for key in keys):
+        now = time.time_ns()
+        await cache.aadd(keys[0], now, None)
+        await cache.aadd(keys[1], now // 10 ** 9, None)
+        state = await cache.aget_many(keys)
+    return state.get(keys[0]), state.get(keys[1])
+
+
+def bump_namespace(namespace):
+    """Увеличивает версию пространства имен (сбрасывает его кеш и ETag)"""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(_modified_key(namespace), int(time.time()), None)
+
+
+def get_model_namespaces(model):
+    """Пространства имен, зависящие от модели"""
+    return _MODEL_NAMESPACES.get(model._meta.label, [])
+
+
+def invalidate_model(model):
+    """
+    Сбрасывает кеш ответов, зависящих от модели
+
+    Внутри транзакции сброс повторяется после коммита: параллельный запрос
+    мог закешировать данные, прочитанные до коммита, под новой версией.
+    """
+    namespaces = get_model_namespaces(model)
+    if not namespaces:
+        return
+
+    def bump():
+        for namespace in namespaces:
+            bump_namespace(namespace)
+        if model._meta.label in API_CACHE_SCHEDULES:
+            # Сохранение могло изменить дату публикации
+            cache.delete(_schedule_key(model._meta.label))
+
+    def bump_and_warm():
+        bump()
+        enqueue_warm(namespaces)
+
+    if transaction.get_connection().in_atomic_block:
+        bump()
+        transaction.on_commit(bump_and_warm)
+    else:
+        bump_and_warm()
+
+
+def build_cache_key(request, namespace, version):
+    """Ключ снимка ответа: пространство имен, его версия и полный URL запроса"""
+    url_hash = hashlib.sha1(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return f'api-snapshot:{namespace}:{version}:{url_hash}'
+
+
+def build_etag(request, namespace, version, renderer_format=None):
+    """
+    Сильный ETag ответа
+
+    Ответ однозначно определяется версией пространства имен, полным URL
+    и форматом рендерера (JSON или browsable API). Без renderer_format
+    формат берется из выбранного DRF рендерера.
+    """
+    if renderer_format is None:
+        renderer = getattr(request, 'accepted_renderer', None)
+        renderer_format = getattr(renderer, 'format', '') or ''
+    value = '|'.join([
+        namespace,
+        str(version),
+        request.build_absolute_uri(),
+        renderer_format,
+    ])
+    return quote_etag(hashlib.sha1(value.encode('utf-8')).hexdigest())
+
+
+def set_validators(response, etag, modified):
+    """Заголовки условного GET для ответа"""
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    # Клиент может хранить ответ, но обязан перепроверять его по ETag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Миксин для вьюх публичного API: отдает ответы list и retrieve
+    из снимков и поддерживает условные GET
+
+    Ответы получают ETag и Last-Modified по версии пространства имен.
+    На If-None-Match / If-Modified-Since с актуальной версией отдается
+    304 без выполнения запросов к БД и сериализаторов. JSON ответ
+    рендерится один раз на версию (в dispatch, после finalize_response)
+    и дальше отдается байтами снимка, сжатыми по Accept-Encoding.
+
+    Атрибут cache_namespace - ключ из API_CACHE_DEPENDENCIES.
+    """
+    cache_namespace = None
+
+    def dispatch(self, request, *args, **kwargs):
+        self._snapshot_key = None
+        response = super().dispatch(request, *args, **kwargs)
+        if self._snapshot_key is not None and response.status_code == 200:
+            response.render()
+            snapshot = make_snapshot(response.content)
+            set_snapshot(self._snapshot_key, snapshot)
+            apply_snapshot(response, snapshot, self._snapshot_encoding)
+        return response
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """Возвращает 304, ответ из снимка или вызывает handler и сохраняет снимок"""
+        if self.cache_namespace is None:
+            return handler(request, *args, **kwargs)
+
+        mode = get_snapshot_mode(request)
+        use_snapshot = (
+            settings.API_CACHE_ENABLED
+            and mode != SNAPSHOT_BYPASS
+            and is_snapshot_request(request)
+        )
+        # Ответ разделу бандла нужен как данные, а не байты
+        encoding = choose_encoding(request) if use_snapshot and mode != SNAPSHOT_DATA else None
+
+        version, modified = get_namespace_state(self.cache_namespace)
+        etag = etag_for_encoding(build_etag(request, self.cache_namespace, version), encoding)
+
+        conditional = get_conditional_response(request, etag=etag, last_modified=modified)
+        if conditional is not None:
+            return self._set_snapshot_headers(set_validators(conditional, etag, modified), use_snapshot)
+
+        if not use_snapshot:
+            response = handler(request, *args, **kwargs)
+        else:
+            key = build_cache_key(request, self.cache_namespace, version)
+            snapshot = get_snapshot(key) if mode != SNAPSHOT_REFRESH else None
+            if snapshot is None:
+                response = handler(request, *args, **kwargs)
+                if response.status_code == 200:
+                    self._snapshot_key = key
+                    self._snapshot_encoding = encoding
+            elif mode == SNAPSHOT_DATA:
+                response = Response(snapshot_data(snapshot))
+            else:
+                response = snapshot_response(snapshot, encoding)
+
+        if response.status_code == 200:
+            set_validators(response, etag, modified)
+            self._set_snapshot_headers(response, use_snapshot)
+        return response
+
+    def _set_snapshot_headers(self, response, use_snapshot):
+        if use_snapshot and get_encodings():
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
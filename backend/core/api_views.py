@@ -1,6 +1,8 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from .bundles import PAGE_BUNDLES
+
 
 @api_view(['GET'])
 def api_root(request, format=None):
@@ -32,6 +34,9 @@ def api_root(request, format=None):
             'site-settings': f'{base_url}/site-settings/',
             'statistics': f'{base_url}/statistics/',
             'gallery': f'{base_url}/gallery/',
+            'bundles': {
+                page: f'{base_url}/bundle/{page}/' for page in PAGE_BUNDLES
+            },
             'admin-status': f'{base_url}/auth/admin-status/',
             'csrf': f'{base_url}/auth/csrf/',
             'hero-edit-active': f'{base_url}/auth/edit/hero/active/',
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .image_registry import image_spec_registry
+        image_spec_registry.build()
+
+        from . import signals  # noqa: F401
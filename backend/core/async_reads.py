@@ -0,0 +1,100 @@
+"""
+Асинхронные ответы публичного API из кеша (ASGI)
+
+При API_ASYNC_READS=True вьюхи с AsyncReadMixin оборачиваются в async view:
+проверка версии кеша, условный GET (304) и отдача снимка JSON
+(core.snapshots) выполняются через асинхронный API кеша, без синхронного
+конвейера DRF.
+Промах кеша, другие методы и browsable API передаются исходной вьюхе DRF
+через sync_to_async и выполняются в одном потоке процесса. Асинхронный ORM
+Django (aget, async for) здесь не помог бы: он выполняет запросы через тот
+же sync_to_async, а сериализаторы DRF синхронные.
+
+Воркер ASGI (uvicorn) держит много одновременных запросов SSR, ожидающих
+кеш, вместо одного запроса на процесс gunicorn. Под WSGI флаг нужно
+оставить выключенным: async view там выполняется через async_to_sync
+с отдельным event loop на запрос.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .api_cache import aget_namespace_state, build_cache_key, build_etag, set_validators
+from .media_urls import set_media_base_header
+from .snapshots import aget_snapshot, choose_encoding, etag_for_encoding, get_encodings, snapshot_response
+
+JSON_FORMAT = 'json'
+READ_ONLY_ALLOW = 'GET, HEAD, OPTIONS'
+
+
+def accepts_json(request):
+    """
+    Выберет ли DRF JSONRenderer для запроса
+
+    Браузер (Accept с text/html) получает browsable API через вьюху DRF.
+    """
+    if request.GET.get('format', JSON_FORMAT) != JSON_FORMAT:
+        return False
+    return 'text/html' not in request.headers.get('Accept', '')
+
+
+def set_read_headers(response):
+    """Allow и Vary, которые ответу добавил бы DRF и CachedResponseMixin"""
+    response['Allow'] = READ_ONLY_ALLOW
+    patch_vary_headers(response, ['Accept'])
+    if settings.API_CACHE_ENABLED and get_encodings():
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def async_read_view(view, view_class):
+    """
+    Async view поверх вьюхи DRF с CachedResponseMixin
+
+    Returns:
+        coroutine function: принимает те же аргументы, что и view
+    """
+    namespace = view_class.cache_namespace
+    sync_view = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method != 'GET' or not accepts_json(request):
+            return await sync_view(request, *args, **kwargs)
+
+        encoding = choose_encoding(request) if settings.API_CACHE_ENABLED else None
+        version, modified = await aget_namespace_state(namespace)
+        etag = etag_for_encoding(
+            build_etag(request, namespace, version, renderer_format=JSON_FORMAT), encoding,
+        )
+        conditional = get_conditional_response(request, etag=etag, last_modified=modified)
+        if conditional is not None:
+            return set_validators(set_read_headers(conditional), etag, modified)
+
+        if settings.API_CACHE_ENABLED:
+            snapshot = await aget_snapshot(build_cache_key(request, namespace, version))
+            if snapshot is not None:
+                response = set_read_headers(snapshot_response(snapshot, encoding))
+                set_media_base_header(request, response)
+                return set_validators(response, etag, modified)
+
+        return await sync_view(request, *args, **kwargs)
+
+    return async_view
+
+
+class AsyncReadMixin:
+    """
+    Миксин для вьюх с CachedResponseMixin: async путь чтения под ASGI
+
+    Включается настройкой API_ASYNC_READS.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        if settings.API_ASYNC_READS and cls.cache_namespace is not None:
+            return async_read_view(view, cls)
+        return view
@@ -0,0 +1,114 @@
+"""
+Бандлы страниц: несколько ответов публичного API в одном запросе
+
+GET /api/bundle/<page>/ возвращает {раздел: ответ эндпоинта} для всех
+запросов, которые SSR страницы иначе делал бы по отдельности. Разделы
+вызываются через URLconf теми же вьюхами, поэтому ответ раздела совпадает
+с ответом эндпоинта (включая кеш раздела). Singleton-объекты общие для
+всех разделов (SingletonCacheMiddleware). Бандл кешируется целиком
+в пространстве имен bundle-<page> (API_CACHE_BUNDLES).
+
+Параметры ?urls= и ?variants= передаются всем разделам. Снимок раздела
+(core.snapshots) используется как данные: бандл рендерится один раз.
+"""
+import copy
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.core.exceptions import ImproperlyConfigured
+from django.http import QueryDict
+from django.urls import resolve
+
+from .api_cache import API_CACHE_BUNDLES
+from .media_urls import RELATIVE_URLS_PARAM
+from .snapshots import SNAPSHOT_DATA, SNAPSHOT_MODE_ATTR
+from .sparse_fields import VARIANTS_PARAM
+
+PAGE_BUNDLES = {
+    'home': {
+        'hero': '/api/hero/',
+        'site_settings': '/api/site-settings/',
+        'statistics': '/api/statistics/',
+        'gallery': '/api/gallery/?ordering=order',
+        'lodge_types': '/api/lodges/types/',
+        'activities': '/api/activities/',
+        'events': '/api/events/',
+        'news': '/api/news/',
+    },
+    'lodges': {
+        'site_settings': '/api/site-settings/',
+        'lodge_types': '/api/lodges/types/',
+        'lodges': '/api/lodges/',
+    },
+    'restaurant': {
+        'site_settings': '/api/site-settings/',
+        'restaurant': '/api/restaurant/',
+        'images': '/api/restaurant/images/',
+        'meal_types': '/api/restaurant/meal-types/',
+        'benefits': '/api/restaurant/benefits/',
+    },
+}
+"""Страница -> {раздел: URL эндпоинта}"""
+
+SHARED_PARAMS = (RELATIVE_URLS_PARAM, VARIANTS_PARAM)
+"""Параметры запроса бандла, которые получают все разделы"""
+
+
+def _section_request(request, url, match):
+    """
+    Копия запроса бандла с путем и параметрами раздела
+
+    Условные заголовки не передаются: 304 относится к бандлу целиком.
+    """
+    path, _, query = url.partition('?')
+    params = QueryDict(query, mutable=True)
+    for name in SHARED_PARAMS:
+        if name in request.GET:
+            params[name] = request.GET[name]
+    query = params.urlencode()
+
+    section = copy.copy(request)
+    section.path = section.path_info = path
+    section.META = {
+        key: value for key, value in request.META.items()
+        if not key.startswith('HTTP_IF_')
+    }
+    section.META.update(PATH_INFO=path, QUERY_STRING=query)
+    section.GET = QueryDict(query)
+    section.resolver_match = match
+    setattr(section, SNAPSHOT_MODE_ATTR, SNAPSHOT_DATA)
+    return section
+
+
+def _get_sync_view(match):
+    view = match.func
+    # Под API_ASYNC_READS вьюха обернута в async view (core.async_reads)
+    if iscoroutinefunction(view):
+        view = view.__wrapped__
+    return view
+
+
+def build_bundle(page, request):
+    """
+    Данные бандла страницы
+
+    Args:
+        page: Ключ PAGE_BUNDLES
+        request: HttpRequest бандла
+
+    Returns:
+        dict: {раздел: данные ответа или None, если эндпоинт ответил не 200}
+    """
+    data = {}
+    for name, url in PAGE_BUNDLES[page].items():
+        match = resolve(urlsplit(url).path)
+        namespace = getattr(getattr(match.func, 'cls', None), 'cache_namespace', None)
+        if namespace not in API_CACHE_BUNDLES[page]:
+            raise ImproperlyConfigured(
+                f'Раздел {name} ({url}) не входит в API_CACHE_BUNDLES[{page!r}]'
+            )
+        section_request = _section_request(request, url, match)
+        response = _get_sync_view(match)(section_request, *match.args, **match.kwargs)
+        data[name] = response.data if response.status_code == 200 else None
+    return data
+
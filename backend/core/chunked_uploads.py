@@ -0,0 +1,292 @@
+"""
+Загрузка больших файлов частями для edit-mode
+
+Клиент создает загрузку (имя, размер, поле объекта), затем отправляет
+части сырым телом PATCH с заголовком Upload-Offset. Часть читается из
+потока запроса блоками и дописывается прямо в итоговый файл хранилища
+с обновлением SHA-256: файл не копируется через временные файлы Django
+и не держится в памяти целиком. Размер файла на диске - смещение для
+продолжения, поэтому прерванная загрузка продолжается с полученного
+байта (GET возвращает смещение). После последней части файл привязывается
+к полю объекта без копирования (с адресацией по содержимому, core.storage,
+файл лишь переименовывается по посчитанному SHA-256).
+
+Запись в файл загрузки защищена flock: параллельная часть той же
+загрузки получает 409. Последнюю часть завершает один запрос: статус
+меняется условным UPDATE на completing, проигравший запрос получает
+завершенную загрузку или 409.
+"""
+import fcntl
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .models import ChunkedUpload
+from .storage import ContentAddressedStorage
+
+UPLOAD_TARGETS = {
+    'hero.promo_video': ('core.HeroSection', 'promo_video'),
+    'hero.preview_image': ('core.HeroSection', 'preview_image'),
+    'activity.video': ('activities.Activity', 'video'),
+}
+"""Ключ загрузки -> (модель, поле файла)"""
+
+OFFSET_HEADER = 'Upload-Offset'
+READ_BLOCK_SIZE = 64 * 1024
+HASHER_CACHE_SIZE = 32
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Смещение части не совпадает с полученными данными.'
+    default_code = 'upload_conflict'
+
+
+class UploadRejected(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Часть или файл отклонены.'
+    default_code = 'upload_rejected'
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Часть больше CHUNKED_UPLOAD_CHUNK_SIZE.'
+    default_code = 'chunk_too_large'
+
+
+def get_target(target):
+    """Модель и поле файла для ключа UPLOAD_TARGETS"""
+    label, field_name = UPLOAD_TARGETS[target]
+    model = apps.get_model(label)
+    return model, model._meta.get_field(field_name)
+
+
+def get_upload_path(upload):
+    """Путь к файлу загрузки на диске (нужно хранилище с path())"""
+    _, field = get_target(upload.target)
+    try:
+        return field.storage.path(upload.name)
+    except NotImplementedError:
+        raise ImproperlyConfigured('Загрузка частями требует файлового хранилища')
+
+
+def start_upload(target, object_id, filename, size, checksum='', user=None):
+    """
+    Создает загрузку и пустой итоговый файл
+
+    Имя файла выбирается по upload_to поля и сразу занимается пустым
+    файлом, чтобы параллельная загрузка с тем же именем получила другое.
+
+    Returns:
+        ChunkedUpload
+    """
+    model, field = get_target(target)
+    instance = model._default_manager.filter(pk=object_id).first()
+    if instance is None:
+        raise NotFound(f'{model._meta.verbose_name} #{object_id} не найден.')
+
+    storage = field.storage
+    name = field.generate_filename(instance, filename)
+    while True:
+        name = storage.get_available_name(name, max_length=field.max_length)
+        path = storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            # O_EXCL: имя не займет параллельный запрос
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+            break
+        except FileExistsError:
+            continue
+
+    return ChunkedUpload.objects.create(
+        user=user,
+        target=target,
+        object_id=object_id,
+        filename=filename,
+        name=name,
+        size=size,
+        checksum=checksum,
+    )
+
+
+def _get_hasher(upload, offset, f):
+    """
+    SHA-256 первых offset байт файла
+
+    Хеш продолжается из памяти процесса; если часть принимал другой
+    процесс gunicorn, файл перечитывается блоками.
+    """
+    with _hashers_lock:
+        cached = _hashers.pop(upload.pk, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+
+    hasher = hashlib.sha256()
+    f.seek(0)
+    remaining = offset
+    while remaining:
+        block = f.read(min(READ_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        hasher.update(block)
+        remaining -= len(block)
+    return hasher
+
+
+def _store_hasher(upload, offset, hasher):
+    with _hashers_lock:
+        _hashers[upload.pk] = (offset, hasher)
+        while len(_hashers) > HASHER_CACHE_SIZE:
+            _hashers.popitem(last=False)
+
+
+def write_chunk(upload, stream, offset, length):
+    """
+    Дописывает часть из потока запроса в файл загрузки
+
+    Args:
+        upload: ChunkedUpload в статусе uploading
+        stream: Файлоподобный поток тела запроса
+        offset: Смещение части (заголовок Upload-Offset)
+        length: Длина части (Content-Length)
+
+    Returns:
+        ChunkedUpload: С обновленным offset (и статусом после последней части)
+    """
+    if upload.status != ChunkedUpload.STATUS_UPLOADING:
+        raise UploadConflict('Загрузка уже завершена.')
+    if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise ChunkTooLarge()
+    if offset + length > upload.size:
+        raise UploadRejected('Часть выходит за размер файла.')
+
+    try:
+        f = open(get_upload_path(upload), 'r+b')
+    except FileNotFoundError:
+        # Последнюю часть уже принял параллельный запрос
+        return _get_finished(upload)
+
+    with f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict('Часть этой загрузки уже принимается.')
+
+        received = os.fstat(f.fileno()).st_size
+        if offset != received:
+            raise UploadConflict(f'Ожидается смещение {received}.')
+
+        hasher = _get_hasher(upload, received, f)
+        f.seek(received)
+        remaining = length
+        try:
+            while remaining:
+                block = stream.read(min(READ_BLOCK_SIZE, remaining))
+                if not block:
+                    # Клиент оборвал соединение: полученное сохраняется
+                    break
+                f.write(block)
+                hasher.update(block)
+                remaining -= len(block)
+        finally:
+            f.flush()
+            received = f.tell()
+            _store_hasher(upload, received, hasher)
+
+        upload.offset = received
+        if received < upload.size:
+            upload.save(update_fields=['offset', 'updated_at'])
+            return upload
+
+        # Завершает загрузку только один запрос: статус меняется условным
+        # UPDATE, а файл остается заблокированным до привязки к объекту
+        claimed = ChunkedUpload.objects.filter(
+            pk=upload.pk, status=ChunkedUpload.STATUS_UPLOADING
+        ).update(status=ChunkedUpload.STATUS_COMPLETING, offset=received)
+        if not claimed:
+            return _get_finished(upload)
+        upload.status = ChunkedUpload.STATUS_COMPLETING
+        return complete_upload(upload, hasher.hexdigest())
+
+
+def _get_finished(upload):
+    """Загрузка, завершенная параллельным запросом, или UploadConflict"""
+    upload.refresh_from_db()
+    if upload.status == ChunkedUpload.STATUS_COMPLETE:
+        return upload
+    raise UploadConflict('Загрузка уже завершена.')
+
+
+def _fail(upload, error):
+    with _hashers_lock:
+        _hashers.pop(upload.pk, None)
+    upload.status = ChunkedUpload.STATUS_FAILED
+    upload.error = error
+    upload.save(update_fields=['offset', 'status', 'error', 'updated_at'])
+    try:
+        os.remove(get_upload_path(upload))
+    except FileNotFoundError:
+        pass
+    raise UploadRejected(error)
+
+
+def complete_upload(upload, sha256):
+    """
+    Проверяет файл и привязывает его к полю объекта
+
+    Вызывается для загрузки в статусе completing, под блокировкой файла.
+    """
+    with _hashers_lock:
+        _hashers.pop(upload.pk, None)
+    if upload.checksum and upload.checksum.lower() != sha256:
+        _fail(upload, 'SHA-256 файла не совпадает с переданным checksum.')
+
+    model, field = get_target(upload.target)
+    if isinstance(field, models.ImageField):
+        try:
+            with Image.open(get_upload_path(upload)) as img:
+                img.verify()
+        except Exception:
+            _fail(upload, 'Файл не является изображением.')
+
+    instance = model._default_manager.filter(pk=upload.object_id).first()
+    if instance is None:
+        _fail(upload, 'Объект удален во время загрузки.')
+
+    if isinstance(field.storage, ContentAddressedStorage):
+        # Хеш уже посчитан по частям: файл переименовывается, дубликат удаляется
+        upload.name = field.storage.adopt(upload.name, sha256)
+
+    with transaction.atomic():
+        # Файл уже на месте: присваивается имя, без storage.save()
+        setattr(instance, field.name, upload.name)
+        instance.save(update_fields=[field.name])
+
+        upload.sha256 = sha256
+        upload.status = ChunkedUpload.STATUS_COMPLETE
+        upload.save(update_fields=['name', 'offset', 'sha256', 'status', 'updated_at'])
+    return upload
+
+
+def delete_upload(upload):
+    """Удаляет незавершенную загрузку вместе с файлом"""
+    if upload.status != ChunkedUpload.STATUS_COMPLETE:
+        try:
+            os.remove(get_upload_path(upload))
+        except FileNotFoundError:
+            pass
+    with _hashers_lock:
+        _hashers.pop(upload.pk, None)
+    upload.delete()
@@ -0,0 +1,178 @@
+"""
+Фоновая генерация вариантов изображений (ImageSpecField)
+
+Варианты создаются в локальном пуле потоков сразу после сохранения модели,
+а не при первом обращении к URL внутри HTTP запроса. Состояние задачи
+(в очереди, выполняется, ошибка) хранится в кеше, готовность вариантов -
+в манифесте Rendition (см. get_rendition_status).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections, transaction
+
+from .image_registry import image_spec_registry
+from .image_renderer import render_renditions
+from .renditions import get_recorded_specs, record_renditions
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_PROCESSING = 'processing'
+JOB_READY = 'ready'
+JOB_FAILED = 'failed'
+
+JOB_STATE_TIMEOUT = 60 * 60
+"""Сколько хранится состояние задачи (задача, потерянная при рестарте, не висит вечно)"""
+
+_executor = None
+
+
+class DeferredStrategy:
+    """
+    Стратегия ImageKit для фоновой генерации
+
+    Обращение к url или проверка bool(file) не запускают генерацию:
+    bool(file) лишь сообщает, готов ли вариант. Файлы создаются
+    пайплайном после сохранения модели (см. enqueue_renditions).
+    """
+
+    def on_content_required(self, file):
+        """Содержимое файла нужно явно (чтение байтов) - генерируем"""
+        file.generate()
+
+    def should_verify_existence(self, file):
+        """bool(file) проверяет готовность варианта через cachefile backend"""
+        return True
+
+
+def _get_executor():
+    """Лениво создает пул потоков (отдельный в каждом процессе gunicorn)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_RENDITION_WORKERS,
+            thread_name_prefix='renditions',
+        )
+    return _executor
+
+
+def enqueue_renditions(instance, source_fields=None):
+    """
+    Ставит генерацию вариантов изображений объекта в очередь
+
+    Задача отправляется в пул после коммита транзакции, чтобы поток
+    увидел сохраненный объект.
+
+    Args:
+        instance: Объект модели с ImageSpecField
+        source_fields: Исходные поля, варианты которых нужно создать
+            (по умолчанию - все)
+    """
+    spec_names = [
+        spec.name
+        for spec in image_spec_registry.get_specs(type(instance)).values()
+        if source_fields is None or spec.source_field in source_fields
+    ]
+    if not spec_names or instance.pk is None:
+        return
+
+    model_label = instance._meta.label
+    pk = instance.pk
+
+    def submit():
+        set_job_state(model_label, pk, JOB_QUEUED)
+        if settings.IMAGE_RENDITION_WORKERS <= 0:
+            # Пул отключен (разработка, тесты) - генерируем синхронно
+            generate_renditions(model_label, pk, spec_names)
+        else:
+            _get_executor().submit(_run_in_worker, model_label, pk, spec_names)
+
+    transaction.on_commit(submit)
+
+
+def _job_key(model_label, pk):
+    return f'renditions-job:{model_label}:{pk}'
+
+
+def set_job_state(model_label, pk, state, error=''):
+    """Записывает состояние задачи генерации (JOB_READY удаляет запись)"""
+    key = _job_key(model_label, pk)
+    if state == JOB_READY:
+        cache.delete(key)
+    else:
+        cache.set(key, {'state': state, 'error': error}, JOB_STATE_TIMEOUT)
+
+
+def get_rendition_status(instance):
+    """
+    Прогресс генерации вариантов объекта
+
+    Returns:
+        dict: status (queued/processing/ready/failed), total, done,
+            pending (имена ожидаемых вариантов), error
+    """
+    ready, expected = get_recorded_specs(instance)
+    job = cache.get(_job_key(instance._meta.label, instance.pk)) or {}
+    state = job.get('state')
+    if state is None:
+        # Задачи нет: все готово или вариантов еще нет (задача потеряна)
+        state = JOB_READY if ready >= expected else JOB_QUEUED
+    elif state != JOB_FAILED and ready >= expected:
+        state = JOB_READY
+    return {
+        'status': state,
+        'total': len(expected),
+        'done': len(ready & expected),
+        'pending': sorted(expected - ready),
+        'error': job.get('error', ''),
+    }
+
+
+def _run_in_worker(model_label, pk, spec_names):
+    """Выполняет задачу в потоке пула с собственным соединением к БД"""
+    close_old_connections()
+    try:
+        generate_renditions(model_label, pk, spec_names)
+    except Exception:
+        logger.exception('Ошибка генерации вариантов %s #%s', model_label, pk)
+    finally:
+        connections.close_all()
+
+
+def generate_renditions(model_label, pk, spec_names):
+    """
+    Генерирует указанные варианты изображений объекта
+
+    Все варианты одного исходника создаются из одного декодирования
+    (core.image_renderer). Уже существующие варианты не пересоздаются
+    (проверка через cachefile backend). Для каждого готового варианта
+    записывается строка манифеста Rendition.
+
+    Args:
+        model_label: Метка модели (например, 'lodges.LodgeImage')
+        pk: Первичный ключ объекта
+        spec_names: Имена ImageSpecField
+
+    Returns:
+        int: Количество обработанных вариантов
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        set_job_state(model_label, pk, JOB_READY)
+        return 0
+
+    set_job_state(model_label, pk, JOB_PROCESSING)
+    try:
+        cachefiles = render_renditions(instance, spec_names)
+        record_renditions(instance, cachefiles)
+    except Exception as e:
+        logger.error(f'Ошибка генерации {model_label} #{pk}: {e}')
+        set_job_state(model_label, pk, JOB_FAILED, str(e))
+        return 0
+    set_job_state(model_label, pk, JOB_READY)
+    return len(cachefiles)
@@ -36,6 +36,21 @@ class NoOpProcessor:
         return img
 
 
+LQIP_SIZE = 32
+"""Размер превью LQIP по большей стороне (px)"""
+
+
+class LQIPProcessor(ResizeToFit):
+    """
+    Уменьшает изображение до крошечного превью (LQIP)
+
+    Превью встраивается в ответ API как data URI и BlurHash,
+    поэтому его размер - десятки пикселей, а не оригинальный.
+    """
+    def __init__(self, size=LQIP_SIZE):
+        super().__init__(size, size, upscale=False)
+
+
 class ResizeToFitWithPadding(ResizeToFit):
     """
     Изменяет размер с сохранением пропорций и добавлением padding
@@ -0,0 +1,83 @@
+"""
+Реестр ImageSpecField всех моделей проекта
+
+Строится один раз при старте приложения (CoreConfig.ready) и позволяет
+находить варианты изображений модели без dir() и getattr по экземплярам.
+"""
+from collections import namedtuple
+
+from django.apps import apps
+from imagekit.models.fields.utils import ImageSpecFileDescriptor
+
+
+SpecInfo = namedtuple(
+    'SpecInfo', ['name', 'source_field', 'spec_id', 'processors', 'format', 'options', 'autoconvert']
+)
+"""Описание одного ImageSpecField"""
+
+
+class ImageSpecRegistry:
+    """Соответствие модель -> {имя варианта: SpecInfo}"""
+
+    def __init__(self):
+        self._specs = {}
+        self._models_by_name = {}
+
+    def build(self):
+        """Собирает ImageSpecField всех установленных моделей"""
+        self._specs = {}
+        self._models_by_name = {}
+        for model in apps.get_models():
+            specs = self._collect(model)
+            if specs:
+                self._specs[model] = specs
+                self._models_by_name[model.__name__] = model
+                self._models_by_name[model._meta.label] = model
+
+    @staticmethod
+    def _collect(model):
+        specs = {}
+        for klass in reversed(model.__mro__):
+            for name, attr in vars(klass).items():
+                if not isinstance(attr, ImageSpecFileDescriptor):
+                    continue
+                # Экземпляр спецификации без исходника - только для чтения параметров
+                spec = attr.field.get_spec(source=None)
+                specs[name] = SpecInfo(
+                    name=name,
+                    source_field=attr.source_field_name,
+                    spec_id=attr.field.spec_id,
+                    processors=tuple(spec.processors),
+                    format=spec.format,
+                    options=dict(spec.options or {}),
+                    autoconvert=spec.autoconvert,
+                )
+        return specs
+
+    def get_models(self):
+        """Модели, у которых есть ImageSpecField"""
+        return list(self._specs)
+
+    def get_model(self, name):
+        """Модель по имени класса ('LodgeImage') или метке ('lodges.LodgeImage')"""
+        return self._models_by_name.get(name)
+
+    def get_specs(self, model):
+        """
+        Возвращает варианты модели
+
+        Returns:
+            dict: {имя варианта: SpecInfo} (пустой, если вариантов нет)
+        """
+        return self._specs.get(model, {})
+
+    def get_spec(self, model, spec_name):
+        """Возвращает SpecInfo варианта или None"""
+        return self._specs.get(model, {}).get(spec_name)
+
+    def get_source_fields(self, model):
+        """Исходные поля изображений, для которых объявлены варианты"""
+        return {spec.source_field for spec in self.get_specs(model).values()}
+
+
+image_spec_registry = ImageSpecRegistry()
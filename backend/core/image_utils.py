@@ -2,20 +2,70 @@
 Утилиты для работы с изображениями
 """
 import base64
+import hashlib
 from io import BytesIO
 from PIL import Image
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 
+from .image_processors import LQIP_SIZE
+from .storage import get_content_hash
 
-def generate_placeholder_base64(image_field, quality=50):
+
+def content_to_data_uri(content, image_format='WEBP'):
+    """
+    Кодирует байты изображения в data URI
+
+    Args:
+        content: Байты закодированного изображения
+        image_format: Формат изображения (WEBP, JPEG, PNG)
+
+    Returns:
+        str: Строка data URI
+    """
+    base64_str = base64.b64encode(content).decode('ascii')
+    return f"data:image/{image_format.lower()};base64,{base64_str}"
+
+
+def _encode_placeholder(image_field, quality, size):
+    """
+    Уменьшает изображение до превью LQIP и кодирует в WebP
+
+    Returns:
+        bytes: Содержимое WebP файла
+    """
+    img = Image.open(image_field)
+    # JPEG декодируется сразу в уменьшенном масштабе
+    img.draft('RGB', (size, size))
+
+    # Конвертируем в RGB если нужно (для JPEG совместимости)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[-1])
+        img = rgb_img
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+    buffer = BytesIO()
+    img.save(buffer, format='WEBP', quality=quality)
+    return buffer.getvalue()
+
+
+def generate_placeholder_base64(image_field, quality=50, size=LQIP_SIZE):
     """
-    Генерирует base64 placeholder из изображения с низким качеством
-    Сохраняет оригинальный размер изображения, но сжимает качество
+    Генерирует base64 placeholder (LQIP) из изображения
+
+    Изображение уменьшается до size px по большей стороне: такое превью
+    весит сотни байт и встраивается в ответ API без отдельного запроса.
 
     Args:
         image_field: Поле ImageField модели
-        quality: Качество WebP (по умолчанию 50, как в compress_image.py)
+        quality: Качество WebP (по умолчанию 50)
+        size: Размер превью по большей стороне (по умолчанию 32px)
 
     Returns:
         str: Base64 строка для data URI или None
@@ -24,27 +74,7 @@ def generate_placeholder_base64(image_field, quality=50):
         return None
 
     try:
-        # Открываем изображение
-        img = Image.open(image_field)
-
-        # Конвертируем в RGB если нужно (для JPEG совместимости)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = rgb_img
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        # Сохраняем с низким качеством (как в compress_image.py)
-        buffer = BytesIO()
-        img.save(buffer, format='WEBP', quality=quality, method=6)
-        buffer.seek(0)
-
-        # Кодируем в base64
-        base64_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        return f"data:image/webp;base64,{base64_str}"
+        return content_to_data_uri(_encode_placeholder(image_field, quality, size))
 
     except Exception as e:
         # Логируем ошибку, но не прерываем выполнение
@@ -54,15 +84,15 @@ def generate_placeholder_base64(image_field, quality=50):
         return None
 
 
-def generate_placeholder_file(image_field, upload_to, quality=50):
+def generate_placeholder_file(image_field, upload_to, quality=50, size=LQIP_SIZE):
     """
-    Генерирует файл placeholder с низким качеством
-    Сохраняет оригинальный размер изображения, но сжимает качество
+    Генерирует файл placeholder (LQIP)
 
     Args:
         image_field: Поле ImageField модели
         upload_to: Путь для сохранения (например, 'placeholders/hero/')
-        quality: Качество WebP (по умолчанию 50, как в compress_image.py)
+        quality: Качество WebP (по умолчанию 50)
+        size: Размер превью по большей стороне (по умолчанию 32px)
 
     Returns:
         str: Путь к сохраненному файлу или None
@@ -71,23 +101,7 @@ def generate_placeholder_file(image_field, upload_to, quality=50):
         return None
 
     try:
-        # Открываем изображение
-        img = Image.open(image_field)
-
-        # Конвертируем в RGB если нужно (для JPEG совместимости)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = rgb_img
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        # Сохраняем с низким качеством (как в compress_image.py)
-        buffer = BytesIO()
-        img.save(buffer, format='WEBP', quality=quality, method=6)
-        buffer.seek(0)
+        content = _encode_placeholder(image_field, quality, size)
 
         # Генерируем имя файла
         original_name = image_field.name
@@ -96,8 +110,7 @@ def generate_placeholder_file(image_field, upload_to, quality=50):
         filepath = f"{upload_to}{filename}"
 
         # Сохраняем файл
-        file_content = ContentFile(buffer.getvalue())
-        saved_path = default_storage.save(filepath, file_content)
+        saved_path = default_storage.save(filepath, ContentFile(content))
 
         return saved_path
 
@@ -108,3 +121,28 @@ def generate_placeholder_file(image_field, upload_to, quality=50):
         logger.error(f"Ошибка генерации placeholder файла: {e}")
         return None
 
+
+def compute_file_hash(image_field, chunk_size=64 * 1024):
+    """
+    Считает SHA-256 файла из FileField/ImageField
+
+    Args:
+        image_field: Поле файла модели
+        chunk_size: Размер блока чтения
+
+    Для файлов с адресацией по содержимому хеш берется из имени.
+
+    Returns:
+        str: Hex-строка хеша или пустая строка, если файла нет
+    """
+    if not image_field or not image_field.name:
+        return ''
+    content_hash = get_content_hash(image_field.name)
+    if content_hash:
+        return content_hash
+
+    digest = hashlib.sha256()
+    with image_field.storage.open(image_field.name, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,102 @@
+"""
+Базовый класс management commands для пакетной генерации вариантов изображений
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.rendition_jobs import (
+    Checkpoint, run_jobs, job_status, STATUS_MISSING, STATUS_STALE
+)
+
+
+class BaseRenditionCommand(BaseCommand):
+    """
+    Общие опции --workers, --dry-run и --checkpoint
+
+    Подклассы формируют список задач (core.rendition_jobs.plan_jobs)
+    и передают его в execute_jobs.
+    """
+    force = False
+    """Пересоздавать существующие варианты"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для генерации (по умолчанию 1)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Показать отсутствующие и устаревшие варианты без генерации',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            help='Файл прогресса: при повторном запуске выполненные задачи пропускаются',
+        )
+
+    def execute_jobs(self, jobs, options):
+        """Выполняет задачи с выводом времени каждой задачи"""
+        if options['dry_run']:
+            self._print_plan(jobs)
+            return
+
+        checkpoint = Checkpoint(options['checkpoint'])
+        pending = [job for job in jobs if not checkpoint.is_done(job)]
+        if len(pending) < len(jobs):
+            self.stdout.write(
+                f'Пропущено по checkpoint: {len(jobs) - len(pending)}'
+            )
+
+        workers = max(1, options['workers'])
+        self.stdout.write(f'Задач: {len(pending)}, процессов: {workers}')
+
+        started = time.perf_counter()
+        jobs_time = 0.0
+        failed = 0
+        completed = False
+        try:
+            for result in run_jobs(pending, workers=workers, force=self.force):
+                job = result.job
+                label = f'{job.model_label} #{job.pk} {job.spec_name}'
+                jobs_time += result.seconds
+                if result.ok:
+                    checkpoint.mark(job)
+                    self.stdout.write(f'  ✓ {label} ({result.seconds:.2f} с)')
+                else:
+                    failed += 1
+                    self.stdout.write(
+                        self.style.ERROR(f'  ✗ {label}: {result.error}')
+                    )
+            completed = failed == 0
+        finally:
+            checkpoint.close(completed=completed)
+
+        elapsed = time.perf_counter() - started
+        summary = (
+            f'Готово: {len(pending) - failed}, ошибок: {failed}. '
+            f'Время: {elapsed:.1f} с (сумма по задачам {jobs_time:.1f} с)'
+        )
+        self.stdout.write(
+            self.style.ERROR(summary) if failed else self.style.SUCCESS(summary)
+        )
+
+    def _print_plan(self, jobs):
+        """Выводит варианты, которые отсутствуют или устарели"""
+        counts = {STATUS_MISSING: 0, STATUS_STALE: 0}
+        for job in jobs:
+            status = job_status(job)
+            if status in counts:
+                counts[status] += 1
+                self.stdout.write(
+                    f'  {status}: {job.model_label} #{job.pk} {job.spec_name}'
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Всего задач: {len(jobs)}, отсутствует: {counts[STATUS_MISSING]}, '
+                f'устарело: {counts[STATUS_STALE]}'
+            )
+        )
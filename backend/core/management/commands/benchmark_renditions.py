@@ -0,0 +1,136 @@
+"""
+Management command для сравнения генерации вариантов изображений
+
+Сравнивает текущий путь ImageKit (каждый ImageSpecField декодирует
+и масштабирует исходник отдельно) с пакетным рендером из одного
+декодирования (core.image_renderer). Каждый путь запускается в отдельном
+процессе, чтобы пиковый RSS одного не влиял на другой. Файлы в хранилище
+не записываются.
+"""
+import json
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.image_registry import image_spec_registry
+from core.image_renderer import render_specs
+
+PATH_SPEC = 'spec'
+PATH_BATCH = 'batch'
+
+
+def _peak_rss_kb():
+    """Пиковый RSS текущего процесса (КБ, Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _content_size(content):
+    content.seek(0, 2)
+    return content.tell()
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время и пиковую память генерации вариантов: по спецификациям и пакетно'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            default='LodgeImage',
+            help='Модель с ImageSpecField (по умолчанию LodgeImage)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Количество объектов (по умолчанию 10)',
+        )
+        parser.add_argument(
+            '--path',
+            choices=[PATH_SPEC, PATH_BATCH],
+            help='Выполнить только один путь в текущем процессе и вывести JSON',
+        )
+
+    def handle(self, *args, **options):
+        model = image_spec_registry.get_model(options['model'])
+        if model is None:
+            raise CommandError(f'Неизвестная модель: {options["model"]}')
+
+        if options['path']:
+            result = self._measure(model, options['limit'], options['path'])
+            self.stdout.write(json.dumps(result))
+            return
+
+        results = {
+            path: self._run_subprocess(options['model'], options['limit'], path)
+            for path in (PATH_SPEC, PATH_BATCH)
+        }
+        self._print_report(results)
+
+    def _measure(self, model, limit, path):
+        specs = image_spec_registry.get_specs(model)
+        instances = list(model.objects.order_by('pk')[:limit])
+        baseline_kb = _peak_rss_kb()
+
+        renditions = 0
+        total_bytes = 0
+        started = time.perf_counter()
+        for instance in instances:
+            by_source = defaultdict(dict)
+            for name, spec in specs.items():
+                if getattr(instance, spec.source_field):
+                    by_source[spec.source_field][name] = getattr(instance, name).generator
+
+            for source_field, generators in by_source.items():
+                if path == PATH_SPEC:
+                    contents = [generator.generate() for generator in generators.values()]
+                else:
+                    contents = render_specs(
+                        getattr(instance, source_field), generators
+                    ).values()
+                for content in contents:
+                    renditions += 1
+                    total_bytes += _content_size(content)
+
+        return {
+            'objects': len(instances),
+            'renditions': renditions,
+            'bytes': total_bytes,
+            'seconds': time.perf_counter() - started,
+            'peak_rss_kb': _peak_rss_kb(),
+            'baseline_rss_kb': baseline_kb,
+        }
+
+    def _run_subprocess(self, model_name, limit, path):
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'),
+            'benchmark_renditions',
+            '--model', model_name, '--limit', str(limit), '--path', path,
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise CommandError(completed.stderr.strip())
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def _print_report(self, results):
+        spec, batch = results[PATH_SPEC], results[PATH_BATCH]
+        self.stdout.write(
+            f'Объектов: {spec["objects"]}, вариантов: {spec["renditions"]}'
+        )
+        for title, path in (('По спецификациям', PATH_SPEC), ('Пакетно', PATH_BATCH)):
+            result = results[path]
+            self.stdout.write(
+                f'  {title}: {result["seconds"]:.2f} с, '
+                f'пиковый RSS {result["peak_rss_kb"] / 1024:.1f} МБ '
+                f'(+{(result["peak_rss_kb"] - result["baseline_rss_kb"]) / 1024:.1f} МБ), '
+                f'{result["bytes"] / 1024:.0f} КБ'
+            )
+        if batch['seconds']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Ускорение: x{spec["seconds"] / batch["seconds"]:.2f}'
+            ))
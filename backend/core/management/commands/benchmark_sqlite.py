@@ -0,0 +1,190 @@
+"""
+Management command для сравнения профилей SQLite под конкурентной нагрузкой
+
+Для каждого профиля из settings.SQLITE_PROFILES копирует базу во временный
+каталог и запускает процессы-читатели (публичные списки API, как воркеры
+gunicorn) и процессы-редакторы (транзакция с select_for_update
+и bulk_update, как применение раскладки галереи). Сравниваются задержки
+чтения и записи и число ошибок "database is locked". Рабочая база
+не изменяется.
+"""
+import itertools
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.management.commands.explain_querysets import get_public_list_querysets
+from core.models import GalleryImage
+
+ROLE_READ = 'read'
+ROLE_WRITE = 'write'
+
+
+def _copy_database(source, target):
+    """Копия базы через backup API (согласованная и при открытом WAL)"""
+    source_conn = sqlite3.connect(source)
+    target_conn = sqlite3.connect(target)
+    try:
+        source_conn.backup(target_conn)
+        # Режим журнала задает профиль, копия начинает с журнала по умолчанию
+        target_conn.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        source_conn.close()
+        target_conn.close()
+
+
+def _read_public_lists(querysets):
+    """Операция чтения: следующий публичный список по кругу"""
+    queryset = next(querysets)
+    list(queryset.all())
+
+
+def _apply_gallery_layout():
+    with transaction.atomic():
+        rows = list(GalleryImage.objects.select_for_update().order_by('id'))
+        GalleryImage.objects.bulk_update(rows, ['position', 'column', 'order'])
+
+
+def _run_worker(role, database, options, deadline, write_interval, queue):
+    """Процесс нагрузки: выполняет операции до deadline и отдает задержки"""
+    connection = connections['default']
+    connection.settings_dict['NAME'] = database
+    connection.settings_dict['OPTIONS'] = options
+
+    if role == ROLE_READ:
+        querysets = itertools.cycle(get_public_list_querysets().values())
+        operation = lambda: _read_public_lists(querysets)  # noqa: E731
+    else:
+        operation = _apply_gallery_layout
+
+    latencies = []
+    errors = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            operation()
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - started)
+        if role == ROLE_WRITE:
+            time.sleep(write_interval)
+
+    connection.close()
+    queue.put((role, latencies, errors))
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает задержки чтения и записи для профилей SQLite (WAL и по умолчанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=3,
+            help='Количество процессов-читателей (по умолчанию 3, как воркеров gunicorn)',
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=1,
+            help='Количество процессов-редакторов (по умолчанию 1)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Длительность нагрузки на профиль, секунд (по умолчанию 10)',
+        )
+        parser.add_argument(
+            '--write-interval',
+            type=float,
+            default=0.01,
+            help='Пауза редактора между транзакциями, секунд (по умолчанию 0.01)',
+        )
+        parser.add_argument(
+            '--profile',
+            action='append',
+            choices=sorted(settings.SQLITE_PROFILES),
+            help='Профиль для сравнения (можно несколько, по умолчанию все)',
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Команда сравнивает профили SQLite')
+        if not GalleryImage.objects.exists():
+            raise CommandError('Для нагрузки записи нужны изображения галереи')
+
+        profiles = options['profile'] or list(settings.SQLITE_PROFILES)
+        connections.close_all()
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in profiles:
+                copy = str(Path(tmp_dir) / f'{name}.sqlite3')
+                _copy_database(str(database['NAME']), copy)
+                self.stdout.write(f'Профиль {name}: нагрузка {options["duration"]:g} с...')
+                results[name] = self._run_profile(copy, settings.SQLITE_PROFILES[name], options)
+
+        self._print_report(results, options['duration'])
+
+    def _run_profile(self, database, profile_options, options):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        deadline = time.monotonic() + options['duration']
+        roles = [ROLE_READ] * options['readers'] + [ROLE_WRITE] * options['writers']
+        processes = [
+            context.Process(
+                target=_run_worker,
+                args=(role, database, profile_options, deadline, options['write_interval'], queue),
+            )
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+
+        result = {
+            role: {'latencies': [], 'errors': 0}
+            for role in (ROLE_READ, ROLE_WRITE)
+        }
+        for _ in processes:
+            role, latencies, errors = queue.get()
+            result[role]['latencies'].extend(latencies)
+            result[role]['errors'] += errors
+        for process in processes:
+            process.join()
+        return result
+
+    def _print_report(self, results, duration):
+        header = (
+            f'{"Профиль":<12}{"Операция":<10}{"Всего":>8}{"В сек":>9}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"max, мс":>10}{"Ошибок":>8}'
+        )
+        self.stdout.write('')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, result in results.items():
+            for role in (ROLE_READ, ROLE_WRITE):
+                latencies = result[role]['latencies']
+                self.stdout.write(
+                    f'{name:<12}{role:<10}{len(latencies):>8}{len(latencies) / duration:>9.1f}'
+                    f'{_percentile(latencies, 50) * 1000:>10.1f}'
+                    f'{_percentile(latencies, 95) * 1000:>10.1f}'
+                    f'{_percentile(latencies, 99) * 1000:>10.1f}'
+                    f'{max(latencies, default=0) * 1000:>10.1f}'
+                    f'{result[role]["errors"]:>8}'
+                )
@@ -0,0 +1,143 @@
+"""
+Management command для проверки снимков JSON ответов
+
+Для каждого адреса SNAPSHOT_URLS и каждого адреса сайта рендерит ответ
+заново (без снимков) и сравнивает с сохраненным снимком текущей версии,
+включая сжатые копии. Расхождение означает, что изменение данных
+не сбросило пространство имен (не хватает модели в API_CACHE_DEPENDENCIES
+или сохранение прошло мимо сигналов, например через update()).
+
+С --rebuild пространства имен с расхождениями сбрасываются (меняются
+и ETag), после чего недостающие снимки строятся заново и проверяются.
+Команда завершается ошибкой, если проверить не удалось ни одного
+снимка. Версии пространств имен читаются из общего кеша (Redis).
+"""
+import gzip
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from core.api_cache import build_cache_key, bump_namespace, get_namespace_state
+from core.snapshots import (
+    ENCODING_BROTLI, ENCODING_GZIP, SNAPSHOT_BYPASS, SNAPSHOT_URLS,
+    brotli, build_request, get_snapshot, render_url, warm_snapshots,
+)
+
+
+def _decompress(encoding, data):
+    if encoding == ENCODING_GZIP:
+        return gzip.decompress(data)
+    if encoding == ENCODING_BROTLI and brotli is not None:
+        return brotli.decompress(data)
+    return None
+
+
+def find_drift(snapshot, content):
+    """
+    Список расхождений снимка со свежим рендером
+
+    Returns:
+        list: Пустой, если снимок и все его сжатые копии совпадают с content
+    """
+    problems = []
+    if snapshot['content'] != content:
+        problems.append('тело ответа')
+    for encoding, data in snapshot['encodings'].items():
+        if _decompress(encoding, data) != snapshot['content']:
+            problems.append(f'копия {encoding}')
+    return problems
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает снимки JSON ответов API со свежим рендером'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--origin',
+            action='append',
+            help='Адрес сайта (можно несколько, по умолчанию API_SNAPSHOT_ORIGINS)',
+        )
+        parser.add_argument(
+            '--namespace',
+            action='append',
+            choices=sorted(SNAPSHOT_URLS),
+            help='Пространство имен (можно несколько, по умолчанию все)',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Перестроить расходящиеся и отсутствующие снимки',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.API_CACHE_ENABLED:
+            raise CommandError('Снимки выключены: API_CACHE_ENABLED=False')
+        if isinstance(caches['default'], LocMemCache):
+            # Версии пространств имен хранятся в кеше: у нового процесса
+            # они свои, и снимки работающих процессов gunicorn не видны
+            raise CommandError('Кеш в памяти процесса: проверка снимков требует REDIS_URL')
+        origins = [origin.rstrip('/') for origin in options['origin'] or settings.API_SNAPSHOT_ORIGINS]
+        if not origins:
+            raise CommandError('Укажите --origin или API_SNAPSHOT_ORIGINS')
+
+        namespaces = options['namespace'] or list(SNAPSHOT_URLS)
+        checked, missing, drifted, stale = self.check_snapshots(namespaces, origins)
+        self.stdout.write(f'Проверено: {checked}, нет снимка: {missing}, расхождений: {drifted}')
+
+        if options['rebuild'] and stale:
+            for namespace, bump in stale.items():
+                if bump:
+                    bump_namespace(namespace)
+            built = warm_snapshots(stale, origins)
+            self.stdout.write(f'Построено снимков: {built}')
+            # Построенные снимки проверяются так же, как сохраненные
+            rechecked, missing, drifted, _ = self.check_snapshots(list(stale), origins)
+            checked += rechecked
+            self.stdout.write(f'Повторно проверено: {rechecked}, нет снимка: {missing}, расхождений: {drifted}')
+            if missing:
+                raise CommandError(f'Снимки не построены: {missing}')
+
+        if drifted:
+            raise CommandError(f'Снимки расходятся с данными: {drifted}')
+        if not checked:
+            raise CommandError('Нет снимков для проверки (запустите с --rebuild)')
+        self.stdout.write(self.style.SUCCESS('Снимки актуальны'))
+
+    def check_snapshots(self, namespaces, origins):
+        """
+        Сравнивает сохраненные снимки со свежим рендером
+
+        Returns:
+            tuple: (проверено, нет снимка, расхождений,
+                {пространство имен: есть ли расхождения})
+        """
+        checked = missing = drifted = 0
+        stale = {}
+        for namespace in namespaces:
+            for url in SNAPSHOT_URLS[namespace]:
+                for origin in origins:
+                    version, _ = get_namespace_state(namespace)
+                    key = build_cache_key(build_request(origin, url), namespace, version)
+                    snapshot = get_snapshot(key)
+                    label = f'{origin}{url}'
+
+                    if snapshot is None:
+                        missing += 1
+                        stale.setdefault(namespace, False)
+                        self.stdout.write(f'Нет снимка: {label}')
+                        continue
+
+                    response = render_url(origin, url, SNAPSHOT_BYPASS)
+                    if response.status_code != 200:
+                        raise CommandError(f'{label}: ответ {response.status_code}')
+                    checked += 1
+                    problems = find_drift(snapshot, response.content)
+                    if problems:
+                        drifted += 1
+                        stale[namespace] = True
+                        self.stdout.write(self.style.ERROR(
+                            f'Расхождение: {label} ({", ".join(problems)})'
+                        ))
+        return checked, missing, drifted, stale
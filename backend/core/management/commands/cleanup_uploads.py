@@ -0,0 +1,35 @@
+"""
+Management command для удаления брошенных загрузок частями
+
+Незавершенные загрузки, которые не обновлялись дольше заданного
+времени, удаляются вместе с недописанными файлами. Записи завершенных
+загрузок удаляются без файлов (файл принадлежит объекту).
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.chunked_uploads import delete_upload
+from core.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    help = 'Удаляет брошенные загрузки частями и их недописанные файлы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Возраст последнего обновления, часов (по умолчанию 24)',
+        )
+
+    def handle(self, *args, **options):
+        threshold = timezone.now() - timedelta(hours=options['hours'])
+        uploads = ChunkedUpload.objects.filter(updated_at__lt=threshold)
+        count = 0
+        for upload in uploads.iterator():
+            delete_upload(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Удалено загрузок: {count}'))
@@ -0,0 +1,147 @@
+"""
+Management command для переноса данных из SQLite в текущую базу (PostgreSQL)
+
+Целевая база должна быть создана и смигрирована (migrate). Таблицы всех
+моделей в ней очищаются, затем строки копируются из файла SQLite пакетами
+с исходными первичными ключами (включая contenttypes, пользователей
+и промежуточные таблицы many-to-many), после чего сбрасываются
+последовательности. Всё выполняется в одной транзакции, сигналы
+моделей не вызываются.
+"""
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from core.search import SEARCH_INDEXES, rebuild_index, uses_fts_table
+
+SOURCE_ALIAS = 'sqlite_source'
+
+
+def get_copied_models():
+    """Модели с собственными таблицами (без proxy и unmanaged)"""
+    return [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    ]
+
+
+def register_source(path):
+    """Подключение к файлу SQLite под отдельным alias"""
+    connections.settings[SOURCE_ALIAS] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {},
+        SOURCE_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)},
+    })[SOURCE_ALIAS]
+    return connections[SOURCE_ALIAS]
+
+
+def copy_model(model, batch_size):
+    """
+    Копирует строки модели пакетами
+
+    Вставка идет в режиме raw (как loaddata), поэтому auto_now
+    и auto_now_add сохраняют исходные значения.
+
+    Returns:
+        int: Количество скопированных строк
+    """
+    fields = model._meta.concrete_fields
+    target = connections[DEFAULT_DB_ALIAS]
+    manager = model._base_manager
+    rows = manager.using(SOURCE_ALIAS).order_by('pk').iterator(chunk_size=batch_size)
+
+    count = 0
+    batch = []
+    for obj in rows:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            count += _insert(manager, fields, batch, target)
+            batch = []
+    if batch:
+        count += _insert(manager, fields, batch, target)
+    return count
+
+
+def _insert(manager, fields, objs, target):
+    size = max(1, target.ops.bulk_batch_size(fields, objs))
+    for start in range(0, len(objs), size):
+        manager.using(target.alias)._insert(objs[start:start + size], fields=fields, raw=True)
+    return len(objs)
+
+
+class Command(BaseCommand):
+    help = 'Копирует данные всех приложений из файла SQLite в текущую базу (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            type=str,
+            default=str(settings.BASE_DIR / 'db.sqlite3'),
+            help='Путь к файлу SQLite (по умолчанию backend/db.sqlite3)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета чтения и вставки (по умолчанию 1000)',
+        )
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Не спрашивать подтверждение очистки целевой базы',
+        )
+
+    def handle(self, *args, **options):
+        source_path = Path(options['source']).resolve()
+        if not source_path.exists():
+            raise CommandError(f'Файл SQLite не найден: {source_path}')
+
+        target = connections[DEFAULT_DB_ALIAS]
+        if target.vendor == 'sqlite' and Path(target.settings_dict['NAME']).resolve() == source_path:
+            raise CommandError('Источник совпадает с текущей базой: укажите DB_ENGINE=postgresql')
+
+        source = register_source(source_path)
+        source_tables = set(source.introspection.table_names())
+        target_tables = set(target.introspection.table_names())
+
+        models = []
+        for model in get_copied_models():
+            table = model._meta.db_table
+            if table not in target_tables:
+                raise CommandError(f'В целевой базе нет таблицы {table}: выполните migrate')
+            if table not in source_tables:
+                self.stdout.write(self.style.WARNING(f'Пропуск {model._meta.label}: нет таблицы в источнике'))
+                continue
+            models.append(model)
+
+        if options['interactive']:
+            answer = input(
+                f'Все данные в базе {target.settings_dict["NAME"]} будут заменены данными '
+                f'из {source_path}. Продолжить? [yes/no]: '
+            )
+            if answer != 'yes':
+                raise CommandError('Перенос отменен')
+
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            tables = [model._meta.db_table for model in models]
+            target.ops.execute_sql_flush(
+                target.ops.sql_flush(no_style(), tables, allow_cascade=True)
+            )
+            for model in models:
+                count = copy_model(model, options['batch_size'])
+                self.stdout.write(f'{model._meta.label}: {count}')
+
+            with target.cursor() as cursor:
+                for sql in target.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+            if uses_fts_table():
+                for label in SEARCH_INDEXES:
+                    rebuild_index(label)
+
+        source.close()
+        self.stdout.write(self.style.SUCCESS(f'Скопировано моделей: {len(models)}'))
@@ -0,0 +1,125 @@
+"""
+Management command для переноса медиафайлов на адресацию по содержимому
+
+Файлы полей FileField/ImageField со старыми именами (по upload_to)
+переименовываются в content/<2 символа>/<sha256>.<ext> (core.storage).
+Одинаковые файлы сливаются в один, строки моделей обновляются через
+update() без сигналов. Затем для объектов с ImageSpecField создаются
+варианты с новыми именами (одинаковые оригиналы - один набор вариантов),
+а файлы старых вариантов, на которые больше не ссылается манифест,
+удаляются.
+"""
+import hashlib
+import os
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from core.api_cache import invalidate_model
+from core.image_pipeline import generate_renditions
+from core.image_registry import image_spec_registry
+from core.models import Rendition
+from core.renditions import delete_unused_renditions
+from core.storage import (
+    HASH_BLOCK_SIZE, ContentAddressedStorage, get_content_hash, get_content_name,
+)
+
+
+def get_file_fields():
+    """(модель, поле) всех FileField/ImageField с хранилищем по умолчанию"""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def hash_file(name):
+    digest = hashlib.sha256()
+    with default_storage.open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Переносит медиафайлы на адресацию по SHA-256 и удаляет дубликаты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать файлы и дубликаты, ничего не менять',
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('Адресация по содержимому выключена: MEDIA_CONTENT_ADDRESSED=False')
+        dry_run = options['dry_run']
+
+        renamed = {}
+        freed = 0
+        duplicates = 0
+        changed = defaultdict(set)
+        for model, field in get_file_fields():
+            rows = (
+                model._default_manager.exclude(**{field.name: ''})
+                .exclude(**{f'{field.name}__isnull': True})
+                .values_list('pk', field.name)
+            )
+            for pk, name in rows.iterator():
+                if get_content_hash(name):
+                    continue
+                if name not in renamed:
+                    if not default_storage.exists(name):
+                        self.stdout.write(self.style.WARNING(f'Нет файла: {name}'))
+                        continue
+                    content_name = get_content_name(hash_file(name), name)
+                    if content_name in renamed.values() or default_storage.exists(content_name):
+                        duplicates += 1
+                        freed += default_storage.size(name)
+                    if not dry_run:
+                        content_name = default_storage.adopt(name, get_content_hash(content_name))
+                    renamed[name] = content_name
+                changed[model].add(pk)
+                if not dry_run:
+                    model._default_manager.filter(pk=pk).update(**{field.name: renamed[name]})
+
+        self.stdout.write(
+            f'Файлов: {len(renamed)}, дубликатов: {duplicates}, '
+            f'освобождается: {freed / 1024 / 1024:.1f} МБ'
+        )
+        if dry_run:
+            return
+
+        for model, pks in changed.items():
+            invalidate_model(model)
+            specs = image_spec_registry.get_specs(model)
+            if specs:
+                self._regenerate(model, pks, list(specs))
+        self.stdout.write(self.style.SUCCESS(f'Обновлено объектов: {sum(map(len, changed.values()))}'))
+
+    def _regenerate(self, model, pks, spec_names):
+        old_names = set(
+            Rendition.objects.filter(
+                content_type__app_label=model._meta.app_label,
+                content_type__model=model._meta.model_name,
+                object_id__in=pks,
+            ).values_list('name', flat=True)
+        )
+        for pk in sorted(pks):
+            generate_renditions(model._meta.label, pk, spec_names)
+
+        # Старые варианты, на которые больше не ссылается ни один объект
+        orphaned = delete_unused_renditions(default_storage, old_names)
+        # Каталоги старых вариантов (CACHE/images/<путь оригинала>/)
+        for directory in {os.path.dirname(name) for name in orphaned}:
+            try:
+                os.rmdir(default_storage.path(directory))
+            except OSError:
+                pass
+        self.stdout.write(f'{model._meta.label}: вариантов удалено {len(orphaned)}')
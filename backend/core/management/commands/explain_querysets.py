@@ -0,0 +1,120 @@
+"""
+Management command для проверки планов запросов публичного API
+
+Выполняет EXPLAIN QUERY PLAN для queryset каждого публичного списка
+(вьюхи с action list и AllowAny из URLconf) и для запросов, которые
+вьюхи строят сами. Завершается с ошибкой, если план содержит полный
+проход по таблице или сортировку во временном B-дереве: значит,
+для фильтра и порядка queryset не хватает индекса.
+"""
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import GalleryImage, HeroSection, HeroImage
+from lodges.models import LodgeImage, LodgePrice, LodgeAvailability
+from restaurant.models import RestaurantImage
+
+FULL_SCAN_RE = re.compile(r'\bSCAN (?!CONSTANT ROW)\S+$')
+TEMP_SORT_RE = re.compile(r'\bUSE TEMP B-TREE\b')
+
+
+def get_extra_querysets():
+    """Запросы, которые вьюхи строят вне get_queryset()"""
+    return {
+        'hero: активная секция': HeroSection.objects.filter(is_active=True)[:1],
+        'hero: изображения секции': HeroImage.objects.filter(hero_section_id=1),
+        'gallery: раскладка': GalleryImage.objects.filter(
+            is_active=True, position='main'
+        ).order_by('position', 'column', 'order', 'id'),
+        'gallery: список edit-mode': GalleryImage.objects.order_by(
+            'position', 'column', 'order', 'id'
+        ),
+        'lodges: изображения размещения': LodgeImage.objects.filter(lodge_id=1),
+        'lodges: активные цены размещения': LodgePrice.objects.filter(lodge_id=1, is_active=True),
+        'lodges: доступность размещения': LodgeAvailability.objects.filter(lodge_id=1),
+        'restaurant: изображения ресторана': RestaurantImage.objects.filter(restaurant_id=1),
+    }
+
+
+def _iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern.callback
+
+
+def get_public_list_querysets():
+    """
+    Querysets публичных списков из URLconf
+
+    Returns:
+        dict: {route: queryset} - с фильтрами и порядком по умолчанию
+    """
+    factory = APIRequestFactory()
+    querysets = {}
+    seen = set()
+    for route, callback in _iter_patterns(get_resolver().url_patterns):
+        view_class = getattr(callback, 'cls', None)
+        actions = getattr(callback, 'actions', None) or {}
+        if view_class is None or actions.get('get') != 'list' or view_class in seen:
+            continue
+        if any(permission is not AllowAny for permission in view_class.permission_classes):
+            continue
+        seen.add(view_class)
+
+        view = view_class()
+        view.action = 'list'
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+        view.request = Request(factory.get('/'))
+        queryset = view.filter_queryset(view.get_queryset())
+        page_size = getattr(view.paginator, 'page_size', None)
+        querysets[route] = queryset[:page_size] if page_size else queryset
+    return querysets
+
+
+def get_problems(plan):
+    """Строки плана с полным проходом или временной сортировкой"""
+    return [
+        line for line in plan.splitlines()
+        if FULL_SCAN_RE.search(line.strip()) or TEMP_SORT_RE.search(line)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Проверяет EXPLAIN QUERY PLAN публичных querysets (без полных проходов и временных сортировок)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plan',
+            action='store_true',
+            help='Выводить полный план каждого запроса',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда разбирает EXPLAIN QUERY PLAN SQLite')
+
+        querysets = get_public_list_querysets()
+        querysets.update(get_extra_querysets())
+
+        failed = []
+        for name, queryset in querysets.items():
+            plan = queryset.explain()
+            problems = get_problems(plan)
+            style = self.style.ERROR if problems else self.style.SUCCESS
+            self.stdout.write(style(f'{"FAIL" if problems else "OK"}  {name}'))
+            for line in (plan.splitlines() if options['verbose_plan'] else problems):
+                self.stdout.write(f'        {line}')
+            if problems:
+                failed.append(name)
+
+        if failed:
+            raise CommandError(f'Запросы без подходящего индекса: {len(failed)} из {len(querysets)}')
+        self.stdout.write(self.style.SUCCESS(f'Проверено запросов: {len(querysets)}'))
@@ -0,0 +1,150 @@
+"""
+Management command для нагрузочного теста публичного API
+
+Открывает заданное число keep-alive соединений к запущенному серверу
+(gunicorn sync или ASGI) и по кругу запрашивает пути, как SSR Nuxt
+при рендере страницы. Выводит запросы в секунду, перцентили задержки
+и число ошибок. HTTP-клиент - asyncio из стандартной библиотеки.
+
+Пример сравнения:
+    gunicorn --workers 3 config.wsgi:application
+    API_ASYNC_READS=True gunicorn --workers 3 -k uvicorn_worker.UvicornWorker config.asgi:application
+    python manage.py loadtest_api --base-url http://127.0.0.1:8000 --concurrency 64
+"""
+import asyncio
+import itertools
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    '/api/hero/',
+    '/api/site-settings/',
+    '/api/gallery/',
+    '/api/lodges/',
+    '/api/lodges/types/',
+    '/api/news/',
+)
+
+
+class HTTPConnection:
+    """Минимальный HTTP/1.1 клиент с keep-alive для GET"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept: application/json\r\n\r\n'
+            .encode('ascii')
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Соединение закрыто сервером')
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            while size := int((await self.reader.readline()).strip(), 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        else:
+            await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection') == 'close':
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест публичного API: запросы в секунду и перцентили задержки'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            default='http://127.0.0.1:8000',
+            help='Адрес запущенного сервера (по умолчанию http://127.0.0.1:8000)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=64,
+            help='Число одновременных соединений (по умолчанию 64)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Длительность теста, секунд (по умолчанию 10)',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            help='Путь для запросов (можно несколько, по умолчанию - публичные списки)',
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['base_url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Поддерживается только http://host:port')
+
+        paths = options['path'] or DEFAULT_PATHS
+        latencies, errors = asyncio.run(self._run(
+            url.hostname, url.port or 80, paths, options['concurrency'], options['duration'],
+        ))
+        latencies.sort()
+        duration = options['duration']
+        self.stdout.write(f'Запросов:      {len(latencies)} за {duration:g} с, ошибок: {errors}')
+        self.stdout.write(f'Запросов/с:    {len(latencies) / duration:.1f}')
+        for percent in (50, 95, 99):
+            self.stdout.write(f'p{percent}, мс:{"":<6}{_percentile(latencies, percent) * 1000:.1f}')
+        self.stdout.write(f'max, мс:{"":<6}{(latencies[-1] if latencies else 0) * 1000:.1f}')
+
+    async def _run(self, host, port, paths, concurrency, duration):
+        deadline = time.monotonic() + duration
+        latencies = []
+        errors = 0
+
+        async def client(offset):
+            nonlocal errors
+            connection = HTTPConnection(host, port)
+            for path in itertools.islice(itertools.cycle(paths), offset, None):
+                if time.monotonic() >= deadline:
+                    break
+                started = time.perf_counter()
+                try:
+                    status = await connection.get(path)
+                except (OSError, ValueError, asyncio.IncompleteReadError):
+                    errors += 1
+                    connection.close()
+                    continue
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+            connection.close()
+
+        await asyncio.gather(*(client(index % len(paths)) for index in range(concurrency)))
+        return latencies, errors
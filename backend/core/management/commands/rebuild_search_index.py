@@ -0,0 +1,28 @@
+"""
+Management command для перестроения полнотекстового индекса
+Нужна после массовых изменений в обход сигналов (QuerySet.update, loaddata)
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import SEARCH_INDEXES, rebuild_index, uses_fts_table
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс новостей и размещений (SQLite FTS5)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            choices=sorted(SEARCH_INDEXES),
+            help='Перестроить индекс только указанной модели (например, news.News)',
+        )
+
+    def handle(self, *args, **options):
+        if not uses_fts_table():
+            raise CommandError('Индекс FTS5 используется только с SQLite, PostgreSQL ищет по столбцу search_vector')
+
+        labels = [options['model']] if options['model'] else list(SEARCH_INDEXES)
+        for label in labels:
+            count = rebuild_index(label)
+            self.stdout.write(self.style.SUCCESS(f'{label}: проиндексировано {count}'))
@@ -0,0 +1,101 @@
+"""
+Построение URL медиафайлов в ответах API
+
+Префикс (схема и хост или CDN из MEDIA_BASE_URL) вычисляется один раз
+на запрос, а не в каждом get_*_url через request.build_absolute_uri.
+
+С параметром ?urls=relative ответ содержит относительные URL, а префикс
+передается заголовком X-Media-Base и ключом media_base верхнего уровня
+(только у ответов-объектов: у списка ключа нет): клиент сам добавляет префикс.
+"""
+from django.conf import settings
+
+RELATIVE_URLS_PARAM = 'urls'
+RELATIVE_URLS_VALUE = 'relative'
+MEDIA_BASE_HEADER = 'X-Media-Base'
+
+
+def _is_absolute(url):
+    return url.startswith(('http://', 'https://', '//'))
+
+
+def wants_relative_urls(request):
+    """Запрошены ли относительные URL (?urls=relative)"""
+    if request is None:
+        return False
+    params = getattr(request, 'query_params', request.GET)
+    return params.get(RELATIVE_URLS_PARAM) == RELATIVE_URLS_VALUE
+
+
+def get_media_base(request):
+    """Префикс медиа URL: MEDIA_BASE_URL или схема и хост запроса"""
+    if settings.MEDIA_BASE_URL:
+        return settings.MEDIA_BASE_URL.rstrip('/')
+    if request is None:
+        return ''
+    return request.build_absolute_uri('/').rstrip('/')
+
+
+class MediaURLBuilder:
+    """Строит URL медиафайлов с префиксом, вычисленным один раз"""
+
+    def __init__(self, request=None):
+        self.relative = wants_relative_urls(request)
+        self.base = get_media_base(request)
+
+    def build(self, url):
+        """
+        Возвращает URL для ответа API
+
+        Args:
+            url: URL из хранилища (например, '/media/lodges/1.jpg')
+
+        Returns:
+            str: Абсолютный URL, либо исходный в режиме relative
+        """
+        if not url or self.relative or _is_absolute(url):
+            return url
+        if not url.startswith('/'):
+            url = f'/{url}'
+        return f'{self.base}{url}'
+
+
+def get_media_url_builder(context):
+    """
+    Возвращает MediaURLBuilder запроса
+
+    Контекст общий для корневого и вложенных сериализаторов,
+    поэтому построитель создается один раз на ответ.
+    """
+    builder = context.get('media_url_builder')
+    if builder is None:
+        builder = MediaURLBuilder(context.get('request'))
+        context['media_url_builder'] = builder
+    return builder
+
+
+def set_media_base_header(request, response):
+    """Заголовок X-Media-Base для ответа с относительными URL"""
+    if wants_relative_urls(request) and response.status_code == 200:
+        response[MEDIA_BASE_HEADER] = get_media_base(request)
+    return response
+
+
+class MediaBaseMixin:
+    """
+    Добавляет префикс медиа в ответ, если запрошены относительные URL
+
+    Заголовок X-Media-Base есть у любого ответа, ключ media_base - только
+    у ответа-объекта.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        set_media_base_header(request, response)
+        if (
+            wants_relative_urls(request)
+            and response.status_code == 200
+            and isinstance(getattr(response, 'data', None), dict)
+        ):
+            response.data['media_base'] = get_media_base(request)
+        return response
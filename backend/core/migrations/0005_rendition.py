@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0004_galleryimage_active_unique_order'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('source_field', models.CharField(max_length=100, verbose_name='Исходное поле')),
+                ('source_name', models.CharField(help_text='Имя исходного файла, из которого создан вариант', max_length=255, verbose_name='Исходный файл')),
+                ('source_hash', models.CharField(max_length=64, verbose_name='SHA-256 исходного файла')),
+                ('spec_name', models.CharField(help_text='Имя ImageSpecField (например, lodge_card_webp)', max_length=100, verbose_name='Вариант')),
+                ('name', models.CharField(help_text='Путь к файлу варианта в хранилище', max_length=255, verbose_name='Файл варианта')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('size', models.PositiveIntegerField(verbose_name='Размер (байт)')),
+                ('format', models.CharField(max_length=10, verbose_name='Формат')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Тип объекта')),
+            ],
+            options={
+                'verbose_name': 'Вариант изображения',
+                'verbose_name_plural': 'Варианты изображений',
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id', 'spec_name'), name='uniq_rendition_object_spec')],
+            },
+        ),
+    ]
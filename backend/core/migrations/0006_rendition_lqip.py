@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_rendition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rendition',
+            name='blurhash',
+            field=models.CharField(blank=True, help_text='BlurHash превью (только для LQIP-вариантов)', max_length=64, verbose_name='BlurHash'),
+        ),
+        migrations.AddField(
+            model_name='rendition',
+            name='data_uri',
+            field=models.TextField(blank=True, help_text='Встроенное превью (только для LQIP-вариантов)', verbose_name='Data URI'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_rendition_lqip'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['position', 'order', 'id'], name='gallery_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(fields=['position', 'column', 'order', 'id'], name='gallery_layout_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='heroimage',
+            index=models.Index(fields=['hero_section', 'order', 'id'], name='heroimage_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='herosection',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='hero_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statistic',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='statistic_active_order_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Таблица FTS5 (только SQLite)
+
+    Заполняется после migrate (core.signals.fill_search_index): документы
+    индекса строит стеммер, а миграция не зависит от его текущего кода.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS core_search_index USING fts5('
+        "label UNINDEXED, object_id UNINDEXED, title, body, "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS core_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_public_queryset_indexes'),
+        ('lodges', '0004_public_queryset_indexes'),
+        ('news', '0003_public_queryset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:47
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(help_text='Ключ UPLOAD_TARGETS (например, hero.promo_video)', max_length=50, verbose_name='Поле')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('filename', models.CharField(max_length=255, verbose_name='Исходное имя файла')),
+                ('name', models.CharField(help_text='Путь к файлу в хранилище', max_length=255, verbose_name='Файл')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер (байт)')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Получено (байт)')),
+                ('checksum', models.CharField(blank=True, help_text='Передается клиентом для проверки целостности', max_length=64, verbose_name='Ожидаемый SHA-256')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 файла')),
+                ('status', models.CharField(choices=[('uploading', 'Загружается'), ('complete', 'Завершена'), ('failed', 'Ошибка')], default='uploading', max_length=20, verbose_name='Статус')),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Загрузка частями',
+                'verbose_name_plural': 'Загрузки частями',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
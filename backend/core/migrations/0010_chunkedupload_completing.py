@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='status',
+            field=models.CharField(choices=[('uploading', 'Загружается'), ('completing', 'Завершается'), ('complete', 'Завершена'), ('failed', 'Ошибка')], default='uploading', max_length=20, verbose_name='Статус'),
+        ),
+    ]
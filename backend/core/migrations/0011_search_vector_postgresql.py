@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# Таблица -> (поле заголовка, поля текста), как SEARCH_INDEXES в core.search
+# на момент миграции. Изменение полей поиска требует новой миграции.
+SEARCH_VECTORS = {
+    'news_news': ('title', ('short_description', 'content')),
+    'lodges_lodge': ('name', ('short_description', 'description')),
+}
+
+
+def vector_sql(title, body):
+    body_sql = " || ' ' || ".join(f"coalesce({field}, '')" for field in body)
+    return (
+        f"setweight(to_tsvector('russian', coalesce({title}, '')), 'A') || "
+        f"setweight(to_tsvector('russian', {body_sql}), 'B')"
+    )
+
+
+def add_search_vectors(apps, schema_editor):
+    """
+    Хранимый столбец search_vector и индекс GIN (только PostgreSQL)
+
+    Столбец вычисляется СУБД при INSERT/UPDATE, поиск (core.search)
+    идет по индексу без вычисления to_tsvector для каждой строки.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, (title, body) in SEARCH_VECTORS.items():
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS ({vector_sql(title, body)}) STORED'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {table}_search_vector_idx ON {table} USING GIN (search_vector)'
+        )
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_VECTORS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_idx')
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_chunkedupload_completing'),
+        ('lodges', '0004_public_queryset_indexes'),
+        ('news', '0003_public_queryset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+    ]
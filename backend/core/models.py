@@ -1,9 +1,17 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from solo.models import SingletonModel
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
-from .image_processors import SmartCropProcessor, NoOpProcessor, ResizeToFitWithPadding
+from .image_processors import (
+    SmartCropProcessor, NoOpProcessor, LQIPProcessor, ResizeToFitWithPadding
+)
 
 
 class SEOMixin(models.Model):
@@ -152,7 +160,7 @@ class SiteSettings(SingletonModel, SEOMixin):
     )
     hero_image_placeholder_webp = ImageSpecField(
         source='hero_image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
@@ -188,10 +196,11 @@ class SiteSettings(SingletonModel, SEOMixin):
     )
     plan_placeholder_webp = ImageSpecField(
         source='base_plan_image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     base_plan_description = models.TextField(
         blank=True,
         null=True,
@@ -237,6 +246,13 @@ class Statistic(models.Model):
         verbose_name = 'Статистика'
         verbose_name_plural = 'Статистика'
         ordering = ['order', 'id']
+        indexes = [
+            # /api/statistics/: активные по порядку
+            models.Index(
+                fields=['order', 'id'], condition=models.Q(is_active=True),
+                name='statistic_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.number} - {self.label}'
@@ -288,10 +304,11 @@ class GalleryImage(models.Model):
     )
     gallery_placeholder_webp = ImageSpecField(
         source='image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     alt_text = models.CharField(
         max_length=255,
         blank=True,
@@ -327,6 +344,15 @@ class GalleryImage(models.Model):
         verbose_name = 'Изображение галереи'
         verbose_name_plural = 'Изображения галереи'
         ordering = ['position', 'column', 'order', 'id']
+        indexes = [
+            # /api/gallery/: активные по позиции и порядку
+            models.Index(
+                fields=['position', 'order', 'id'], condition=models.Q(is_active=True),
+                name='gallery_active_order_idx',
+            ),
+            # Раскладка галереи (GalleryLayoutApplyView) и список для edit-mode
+            models.Index(fields=['position', 'column', 'order', 'id'], name='gallery_layout_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['position', 'column', 'order'],
@@ -388,10 +414,11 @@ class HeroSection(SEOMixin):
     )
     preview_image_hero_placeholder_webp = ImageSpecField(
         source='preview_image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     promo_video = models.FileField(
         upload_to='hero/videos/',
         blank=True,
@@ -442,6 +469,13 @@ class HeroSection(SEOMixin):
         verbose_name = 'Hero секция'
         verbose_name_plural = 'Hero секции'
         ordering = ['order', 'id']
+        indexes = [
+            # HeroSection.get_active_hero()
+            models.Index(
+                fields=['order', 'id'], condition=models.Q(is_active=True),
+                name='hero_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title or f'Hero секция #{self.id}'
@@ -504,10 +538,11 @@ class HeroImage(models.Model):
     )
     hero_placeholder_webp = ImageSpecField(
         source='image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     alt_text = models.CharField(
         max_length=255,
         blank=True,
@@ -533,6 +568,153 @@ class HeroImage(models.Model):
         verbose_name = 'Изображение Hero секции'
         verbose_name_plural = 'Изображения Hero секции'
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['hero_section', 'order', 'id'], name='heroimage_order_idx'),
+        ]
 
     def __str__(self):
         return f'{self.hero_section} - Изображение {self.order}'
+
+
+class Rendition(models.Model):
+    """
+    Манифест готовых вариантов изображений
+
+    Запись создается фоновым пайплайном после генерации варианта.
+    Сериализаторы строят URL вариантов по предзагруженным записям,
+    не обращаясь к хранилищу.
+    """
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name='Тип объекта'
+    )
+    object_id = models.PositiveIntegerField(verbose_name='ID объекта')
+    content_object = GenericForeignKey('content_type', 'object_id')
+    source_field = models.CharField(
+        max_length=100,
+        verbose_name='Исходное поле'
+    )
+    source_name = models.CharField(
+        max_length=255,
+        verbose_name='Исходный файл',
+        help_text='Имя исходного файла, из которого создан вариант'
+    )
+    source_hash = models.CharField(
+        max_length=64,
+        verbose_name='SHA-256 исходного файла'
+    )
+    spec_name = models.CharField(
+        max_length=100,
+        verbose_name='Вариант',
+        help_text='Имя ImageSpecField (например, lodge_card_webp)'
+    )
+    name = models.CharField(
+        max_length=255,
+        verbose_name='Файл варианта',
+        help_text='Путь к файлу варианта в хранилище'
+    )
+    width = models.PositiveIntegerField(verbose_name='Ширина')
+    height = models.PositiveIntegerField(verbose_name='Высота')
+    size = models.PositiveIntegerField(verbose_name='Размер (байт)')
+    format = models.CharField(max_length=10, verbose_name='Формат')
+    data_uri = models.TextField(
+        blank=True,
+        verbose_name='Data URI',
+        help_text='Встроенное превью (только для LQIP-вариантов)'
+    )
+    blurhash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='BlurHash',
+        help_text='BlurHash превью (только для LQIP-вариантов)'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления'
+    )
+
+    class Meta:
+        verbose_name = 'Вариант изображения'
+        verbose_name_plural = 'Варианты изображений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id', 'spec_name'],
+                name='uniq_rendition_object_spec'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.content_type.model} #{self.object_id} - {self.spec_name}'
+
+    @property
+    def url(self):
+        """URL файла варианта (без обращения к файловой системе)"""
+        return default_storage.url(self.name)
+
+
+class ChunkedUpload(models.Model):
+    """
+    Загрузка файла частями (edit-mode, core.chunked_uploads)
+
+    Части дописываются прямо в итоговый файл хранилища (name). После
+    последней части файл привязывается к полю объекта, указанного target
+    и object_id.
+    """
+    STATUS_UPLOADING = 'uploading'
+    STATUS_COMPLETING = 'completing'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, 'Загружается'),
+        (STATUS_COMPLETING, 'Завершается'),
+        (STATUS_COMPLETE, 'Завершена'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Пользователь'
+    )
+    target = models.CharField(
+        max_length=50,
+        verbose_name='Поле',
+        help_text='Ключ UPLOAD_TARGETS (например, hero.promo_video)'
+    )
+    object_id = models.PositiveIntegerField(verbose_name='ID объекта')
+    filename = models.CharField(max_length=255, verbose_name='Исходное имя файла')
+    name = models.CharField(
+        max_length=255,
+        verbose_name='Файл',
+        help_text='Путь к файлу в хранилище'
+    )
+    size = models.PositiveBigIntegerField(verbose_name='Размер (байт)')
+    offset = models.PositiveBigIntegerField(default=0, verbose_name='Получено (байт)')
+    checksum = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Ожидаемый SHA-256',
+        help_text='Передается клиентом для проверки целостности'
+    )
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='SHA-256 файла')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_UPLOADING,
+        verbose_name='Статус'
+    )
+    error = models.CharField(max_length=255, blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+
+    class Meta:
+        verbose_name = 'Загрузка частями'
+        verbose_name_plural = 'Загрузки частями'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
@@ -0,0 +1,186 @@
+"""
+Пагинация публичного API
+
+По умолчанию используется постраничная пагинация (REST_FRAMEWORK).
+Для длинных лент доступна курсорная (keyset): ?pagination=cursor
+на первой странице, дальше - ссылки next/previous с параметром cursor.
+Она не выполняет COUNT(*) и OFFSET: страница выбирается условием
+по значениям ordering последней записи, поэтому время запроса
+не зависит от номера страницы.
+"""
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+PAGINATION_PARAM = 'pagination'
+PAGINATION_CURSOR = 'cursor'
+CURSOR_PARAM = 'cursor'
+
+
+def uses_cursor_pagination(request):
+    """Запрошена ли курсорная пагинация"""
+    params = request.query_params
+    return params.get(PAGINATION_PARAM) == PAGINATION_CURSOR or CURSOR_PARAM in params
+
+
+def _invert(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+def keyset_filter(ordering, position):
+    """
+    Условие "после позиции" для порядка из нескольких полей
+
+    Для ('-published_at', 'id') и позиции (p, i):
+    published_at <= p AND (published_at < p OR (published_at = p AND id > i)).
+    Первое условие дублирует ведущее поле, чтобы БД ограничила
+    диапазон составного индекса.
+    """
+    clauses = []
+    for index, name in enumerate(ordering):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        equal = {prefix.lstrip('-'): value for prefix, value in zip(ordering[:index], position)}
+        clauses.append(Q(**equal, **{f'{field}__{lookup}': position[index]}))
+
+    leading = ordering[0].lstrip('-')
+    bound = 'lte' if ordering[0].startswith('-') else 'gte'
+    return Q(**{f'{leading}__{bound}': position[0]}) & reduce(or_, clauses)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset-пагинация по ordering вьюхи
+
+    Порядок должен заканчиваться уникальным полем (id), не содержать
+    NULL и совпадать с составным индексом модели. Параметр ?ordering=
+    в этом режиме не учитывается.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = CURSOR_PARAM
+    invalid_cursor_message = 'Некорректный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.ordering = list(view.ordering)
+        self.model = queryset.model
+
+        reverse, position = self.decode_cursor(request)
+        ordering = _invert(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, self.page[0])
+
+    def get_position(self, obj):
+        """Значения полей ordering объекта (строками, как их принимает filter)"""
+        return [
+            self.model._meta.get_field(name.lstrip('-')).value_to_string(obj)
+            for name in self.ordering
+        ]
+
+    def encode_cursor(self, reverse, obj):
+        payload = json.dumps({'r': int(reverse), 'p': self.get_position(obj)})
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """
+        Returns:
+            tuple: (reverse, position) - position None для первой страницы
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            reverse, position = bool(payload['r']), payload['p']
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, self.parse_position(position)
+
+    def parse_position(self, position):
+        """Значения курсора, приведенные к типам полей ordering"""
+        values = []
+        for name, value in zip(self.ordering, position):
+            field = self.model._meta.get_field(name.lstrip('-'))
+            try:
+                value = field.to_python(value)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                # Поля ordering не содержат NULL
+                raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+        return values
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Курсор страницы (из ссылок next/previous)',
+            'schema': {'type': 'string'},
+        }]
+
+
+class SelectablePaginationMixin:
+    """Миксин для вьюх: keyset-пагинация по запросу клиента (?pagination=cursor)"""
+    cursor_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and uses_cursor_pagination(self.request):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
@@ -0,0 +1,246 @@
+"""
+Пакетная генерация вариантов изображений для management commands
+
+Работа разбивается на задачи (модель, pk, вариант), которые выполняются
+последовательно или в пуле процессов. Выполненные задачи записываются
+в checkpoint-файл, чтобы прерванный запуск можно было продолжить.
+"""
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.db import connections
+
+from .image_registry import image_spec_registry
+from .image_renderer import render_renditions
+from .renditions import is_recorded, record_renditions
+from .storage import get_content_hash, get_spec_hash
+
+
+RenditionJob = namedtuple(
+    'RenditionJob', ['model_label', 'pk', 'spec_name', 'shared'], defaults=(False,)
+)
+"""
+Задача генерации одного варианта одного объекта
+
+shared - файл варианта общий с более ранней задачей (одинаковые
+оригиналы с адресацией по содержимому, core.storage): задача только
+записывает манифест после того, как файл создан.
+"""
+
+JobResult = namedtuple('JobResult', ['job', 'ok', 'seconds', 'error'])
+"""Результат выполнения задачи"""
+
+STATUS_MISSING = 'missing'
+STATUS_STALE = 'stale'
+STATUS_OK = 'ok'
+
+
+def job_key(job):
+    """Строковый ключ задачи для checkpoint-файла"""
+    return f'{job.model_label}:{job.pk}:{job.spec_name}'
+
+
+def plan_jobs(models, spec_name=None):
+    """
+    Формирует список задач для моделей
+
+    Задачи, файл варианта которых совпадает с файлом более ранней задачи
+    (тот же хеш оригинала и те же параметры), помечаются shared: общий
+    файл генерируется один раз.
+
+    Args:
+        models: Классы моделей с ImageSpecField
+        spec_name: Имя варианта (по умолчанию - все варианты)
+
+    Returns:
+        list[RenditionJob]: Задачи для объектов с загруженным исходником
+    """
+    jobs = []
+    planned = set()
+    for model in models:
+        specs = image_spec_registry.get_specs(model)
+        if spec_name:
+            specs = {name: spec for name, spec in specs.items() if name == spec_name}
+        if not specs:
+            continue
+        spec_hashes = {name: get_spec_hash(spec) for name, spec in specs.items()}
+
+        source_fields = sorted({spec.source_field for spec in specs.values()})
+        rows = model.objects.order_by('pk').values_list('pk', *source_fields)
+        for pk, *sources in rows:
+            filled = {
+                field_name: value for field_name, value in zip(source_fields, sources)
+                if value
+            }
+            for name, spec in specs.items():
+                if spec.source_field not in filled:
+                    continue
+                source_hash = get_content_hash(filled[spec.source_field])
+                shared = False
+                if source_hash is not None:
+                    key = (source_hash, spec_hashes[name])
+                    shared = key in planned
+                    planned.add(key)
+                jobs.append(RenditionJob(model._meta.label, pk, name, shared))
+    return jobs
+
+
+def _get_cachefile(job):
+    instance = apps.get_model(job.model_label).objects.get(pk=job.pk)
+    return instance, getattr(instance, job.spec_name)
+
+
+def job_status(job):
+    """
+    Проверяет состояние варианта в хранилище (для --dry-run)
+
+    Returns:
+        str: STATUS_MISSING - файла нет (например, изменились процессоры),
+             STATUS_STALE - файл старше исходного изображения
+                 или отсутствует в манифесте,
+             STATUS_OK - вариант актуален
+    """
+    instance, cachefile = _get_cachefile(job)
+    storage = cachefile.storage
+    if not storage.exists(cachefile.name):
+        return STATUS_MISSING
+
+    if not is_recorded(instance, job.spec_name, cachefile):
+        return STATUS_STALE
+
+    spec = image_spec_registry.get_spec(type(instance), job.spec_name)
+    source = getattr(instance, spec.source_field)
+    try:
+        if storage.get_modified_time(cachefile.name) < source.storage.get_modified_time(source.name):
+            return STATUS_STALE
+    except (NotImplementedError, OSError):
+        pass
+    return STATUS_OK
+
+
+def group_jobs(jobs):
+    """
+    Группирует задачи по объектам с сохранением порядка
+
+    Returns:
+        list[list[RenditionJob]]: Задачи каждого объекта
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault((job.model_label, job.pk), []).append(job)
+    return list(groups.values())
+
+
+def run_object_jobs(jobs, force=False):
+    """
+    Генерирует варианты одного объекта из одного декодирования исходника
+
+    Функция верхнего уровня, чтобы ее можно было передать в пул процессов.
+
+    Args:
+        jobs: Задачи RenditionJob одного объекта
+        force: Удалить существующие файлы и создать варианты заново
+
+    Returns:
+        list[JobResult]: Время объекта делится поровну между его задачами
+    """
+    started = time.perf_counter()
+    first = jobs[0]
+    cachefiles = {}
+    error = None
+    try:
+        instance = apps.get_model(first.model_label).objects.get(pk=first.pk)
+        cachefiles = render_renditions(
+            instance, [job.spec_name for job in jobs], force=force
+        )
+        record_renditions(instance, cachefiles, force=force)
+    except Exception as e:
+        error = str(e)
+
+    seconds = (time.perf_counter() - started) / len(jobs)
+    results = []
+    for job in jobs:
+        if error is None and job.spec_name not in cachefiles:
+            results.append(JobResult(job, False, seconds, 'Нет исходного изображения'))
+        else:
+            results.append(JobResult(job, error is None, seconds, error))
+    return results
+
+
+def _init_worker():
+    """Инициализация процесса пула: Django и собственные соединения к БД"""
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def run_jobs(jobs, workers=1, force=False):
+    """
+    Выполняет задачи последовательно или в пуле процессов
+
+    Задачи одного объекта выполняются вместе, чтобы исходник
+    декодировался один раз. Задачи с общим файлом варианта (shared)
+    выполняются последними в текущем процессе и без force: файл уже
+    создан, записывается только манифест, и несколько процессов
+    не пересоздают один файл одновременно.
+
+    Args:
+        jobs: Список RenditionJob
+        workers: Количество процессов (1 - в текущем процессе)
+        force: Пересоздавать существующие варианты
+
+    Yields:
+        JobResult по мере завершения задач
+    """
+    groups = group_jobs([job for job in jobs if not job.shared])
+    if workers <= 1:
+        for group in groups:
+            yield from run_object_jobs(group, force)
+    else:
+        # Дочерние процессы не должны наследовать открытые соединения
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(run_object_jobs, group, force) for group in groups]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    for group in group_jobs([job for job in jobs if job.shared]):
+        yield from run_object_jobs(group, force=False)
+
+
+class Checkpoint:
+    """
+    Файл с ключами выполненных задач
+
+    Каждая успешно выполненная задача дописывается отдельной строкой,
+    поэтому после прерывания повторный запуск пропускает готовые задачи.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = {line.strip() for line in f if line.strip()}
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def is_done(self, job):
+        return job_key(job) in self.done
+
+    def mark(self, job):
+        key = job_key(job)
+        self.done.add(key)
+        if self._file:
+            self._file.write(key + '\n')
+            self._file.flush()
+
+    def close(self, completed=False):
+        """Закрывает файл; после успешного завершения всех задач удаляет его"""
+        if self._file:
+            self._file.close()
+            self._file = None
+            if completed:
+                os.remove(self.path)
@@ -0,0 +1,198 @@
+"""
+Манифест вариантов изображений (модель Rendition)
+
+После генерации варианта пайплайн записывает его параметры в БД.
+Сериализаторы читают манифест одним prefetch-запросом и не обращаются
+к хранилищу для построения URL вариантов.
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import File
+from django.db import IntegrityError
+from django.utils import timezone
+from imagekit.cachefiles.backends import CacheFileState
+from imagekit.utils import get_singleton
+from PIL import Image
+
+from .api_cache import invalidate_model
+from .blurhash import encode as encode_blurhash
+from .image_processors import LQIPProcessor
+from .image_registry import image_spec_registry
+from .image_utils import compute_file_hash, content_to_data_uri
+from .models import Rendition
+from .storage import is_content_addressed_rendition
+
+
+def is_placeholder_spec(spec):
+    """Является ли вариант LQIP-превью (встраивается в ответ API)"""
+    return any(isinstance(processor, LQIPProcessor) for processor in spec.processors)
+
+
+METADATA_FIELDS = ('width', 'height', 'size', 'format', 'data_uri', 'blurhash')
+
+
+def get_file_metadata(spec, cachefile):
+    """
+    Размеры, формат и превью файла варианта
+
+    Файл с адресацией по содержимому (core.storage) может быть уже описан
+    в манифесте другого объекта с тем же оригиналом - тогда данные
+    копируются без чтения файла.
+    """
+    if is_content_addressed_rendition(cachefile.name):
+        existing = Rendition.objects.filter(name=cachefile.name).values(*METADATA_FIELDS).first()
+        if existing is not None:
+            return existing
+
+    storage = cachefile.storage
+    placeholder = is_placeholder_spec(spec)
+    data_uri = blurhash = ''
+    with storage.open(cachefile.name, 'rb') as f:
+        # Превью крошечное: читаем его целиком, чтобы встроить в ответ API
+        content = BytesIO(f.read()) if placeholder else f
+        with Image.open(content) as img:
+            width, height = img.size
+            image_format = (img.format or spec.format or '').upper()
+            if placeholder:
+                data_uri = content_to_data_uri(content.getvalue(), image_format)
+                blurhash = encode_blurhash(img)
+    return {
+        'width': width,
+        'height': height,
+        'size': storage.size(cachefile.name),
+        'format': image_format,
+        'data_uri': data_uri,
+        'blurhash': blurhash,
+    }
+
+
+def record_rendition(instance, spec_name, cachefile, source_hash=None):
+    """
+    Записывает (или обновляет) запись манифеста для готового варианта
+
+    Args:
+        instance: Объект модели с ImageSpecField
+        spec_name: Имя ImageSpecField
+        cachefile: Сгенерированный ImageCacheFile
+        source_hash: SHA-256 исходного файла (если уже посчитан)
+    """
+    spec = image_spec_registry.get_spec(type(instance), spec_name)
+    source = getattr(instance, spec.source_field)
+    if source_hash is None:
+        source_hash = compute_file_hash(source)
+
+    lookup = {
+        'content_type': ContentType.objects.get_for_model(instance, for_concrete_model=False),
+        'object_id': instance.pk,
+        'spec_name': spec_name,
+    }
+    previous = Rendition.objects.filter(**lookup).values_list('name', flat=True).first()
+    values = {
+        'source_field': spec.source_field,
+        'source_name': source.name,
+        'source_hash': source_hash,
+        'name': cachefile.name,
+        **get_file_metadata(spec, cachefile),
+    }
+    # Отдельные UPDATE/INSERT вместо update_or_create: запись идет из нескольких
+    # процессов, а чтение и запись в одной транзакции SQLite не может повысить
+    # до блокировки на запись без ошибки "database is locked"
+    if not Rendition.objects.filter(**lookup).update(updated_at=timezone.now(), **values):
+        try:
+            Rendition.objects.create(**lookup, **values)
+        except IntegrityError:
+            # Запись успел создать другой процесс
+            Rendition.objects.filter(**lookup).update(updated_at=timezone.now(), **values)
+
+    if previous and previous != cachefile.name:
+        # Вариант получил новое имя (новые процессоры или исходник):
+        # прежний файл удаляется, если на него не ссылаются другие объекты
+        delete_unused_renditions(cachefile.storage, [previous])
+
+
+def delete_unused_renditions(storage, names):
+    """
+    Удаляет файлы вариантов, на которые не ссылается манифест
+
+    Returns:
+        set: Имена удаленных файлов
+    """
+    names = set(names)
+    unused = names - set(
+        Rendition.objects.filter(name__in=names).values_list('name', flat=True)
+    )
+    # Состояние файла в кеше ImageKit: без сброса тот же вариант (такой же
+    # оригинал с адресацией по содержимому) считался бы готовым и не создавался
+    backend = get_singleton(settings.IMAGEKIT_DEFAULT_CACHEFILE_BACKEND, 'file backend')
+    for name in unused:
+        storage.delete(name)
+        backend.set_state(File(None, name), CacheFileState.DOES_NOT_EXIST)
+    return unused
+
+
+def is_recorded(instance, spec_name, cachefile):
+    """Есть ли в манифесте актуальная запись для варианта"""
+    spec = image_spec_registry.get_spec(type(instance), spec_name)
+    source = getattr(instance, spec.source_field)
+    return Rendition.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance, for_concrete_model=False),
+        object_id=instance.pk,
+        spec_name=spec_name,
+        source_name=source.name,
+        name=cachefile.name,
+    ).exists()
+
+
+def get_recorded_specs(instance):
+    """
+    Варианты объекта, готовые для текущих исходных файлов
+
+    Returns:
+        tuple: (готовые имена вариантов, все ожидаемые имена вариантов) - множества
+    """
+    sources = {}
+    for spec_name, spec in image_spec_registry.get_specs(type(instance)).items():
+        source = getattr(instance, spec.source_field)
+        if source:
+            sources[spec_name] = source.name
+    recorded = Rendition.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance, for_concrete_model=False),
+        object_id=instance.pk,
+        spec_name__in=sources,
+    ).values_list('spec_name', 'source_name')
+    ready = {
+        spec_name for spec_name, source_name in recorded
+        if sources[spec_name] == source_name
+    }
+    return ready, set(sources)
+
+
+def record_renditions(instance, cachefiles, force=False):
+    """
+    Записывает в манифест готовые варианты объекта
+
+    Хеш исходника считается один раз на поле, а не на каждый вариант.
+
+    Args:
+        instance: Объект модели с ImageSpecField
+        cachefiles: dict {spec_name: ImageCacheFile}
+        force: Перезаписать существующие записи
+    """
+    source_hashes = {}
+    recorded = False
+    for spec_name, cachefile in cachefiles.items():
+        if not force and is_recorded(instance, spec_name, cachefile):
+            continue
+        source_field = image_spec_registry.get_spec(type(instance), spec_name).source_field
+        if source_field not in source_hashes:
+            source_hashes[source_field] = compute_file_hash(
+                getattr(instance, source_field)
+            )
+        record_rendition(instance, spec_name, cachefile, source_hashes[source_field])
+        recorded = True
+
+    if recorded:
+        # Записи пишутся через update(), сигналы не срабатывают
+        invalidate_model(type(instance))
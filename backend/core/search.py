@@ -0,0 +1,223 @@
+"""
+Полнотекстовый поиск по новостям и размещениям
+
+SQLite: таблица FTS5 core_search_index с основами слов (core.stemmer),
+обновляется сигналами post_save/post_delete. Запрос тоже приводится
+к основам и ищется по префиксу, результаты ранжируются bm25
+(совпадение в заголовке весит больше).
+
+PostgreSQL: хранимый столбец search_vector (to_tsvector с конфигурацией
+'russian', миграция core 0011) с индексом GIN, websearch_to_tsquery
+и ранжирование ts_rank, отдельная таблица не нужна.
+
+FullTextSearchFilter - замена rest_framework.filters.SearchFilter
+с тем же параметром ?search=.
+"""
+import re
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Case, IntegerField, When
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .stemmer import stem
+
+SEARCH_TABLE = 'core_search_index'
+
+SEARCH_INDEXES = {
+    'news.News': {
+        'title': ('title',),
+        'body': ('short_description', 'content'),
+    },
+    'lodges.Lodge': {
+        'title': ('name',),
+        'body': ('short_description', 'description'),
+    },
+}
+"""
+Модель -> поля заголовка и текста для индекса
+
+В PostgreSQL столбец search_vector строится по этим полям миграцией:
+изменение полей требует новой миграции.
+"""
+
+SEARCH_VECTOR_COLUMN = 'search_vector'
+
+MAX_RESULTS = 1000
+"""Сколько лучших совпадений ранжируется (SQLite)"""
+
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def is_indexed(model):
+    """Индексируется ли модель для полнотекстового поиска"""
+    return model._meta.label in SEARCH_INDEXES
+
+
+def uses_fts_table():
+    """Используется ли таблица FTS5 (только SQLite)"""
+    return connection.vendor == 'sqlite'
+
+
+def normalize_text(text):
+    """Текст для индекса: без HTML, в нижнем регистре, основы слов"""
+    return ' '.join(stem(word) for word in _WORD_RE.findall(strip_tags(text or '')))
+
+
+def build_match_query(terms):
+    """
+    Выражение FTS5 MATCH: все слова запроса по префиксу основы
+
+    Основы состоят только из букв и цифр, поэтому кавычки безопасны.
+    """
+    stems = [stem(word) for term in terms for word in _WORD_RE.findall(term)]
+    return ' '.join(f'"{word}"*' for word in stems if word)
+
+
+def get_document(label, values):
+    """
+    Заголовок и текст объекта для индекса
+
+    Args:
+        label: Метка модели ('news.News')
+        values: dict {поле: значение}
+    """
+    config = SEARCH_INDEXES[label]
+    return tuple(
+        normalize_text(' '.join(str(values.get(field) or '') for field in config[part]))
+        for part in ('title', 'body')
+    )
+
+
+def write_document(cursor, label, object_id, values):
+    """Записывает (заменяет) документ объекта в индексе"""
+    title, body = get_document(label, values)
+    cursor.execute(
+        f'DELETE FROM {SEARCH_TABLE} WHERE label = %s AND object_id = %s',
+        [label, object_id],
+    )
+    cursor.execute(
+        f'INSERT INTO {SEARCH_TABLE} (label, object_id, title, body) VALUES (%s, %s, %s, %s)',
+        [label, object_id, title, body],
+    )
+
+
+def index_object(instance):
+    """Обновляет документ объекта в индексе"""
+    if not uses_fts_table():
+        return
+    label = instance._meta.label
+    fields = [*SEARCH_INDEXES[label]['title'], *SEARCH_INDEXES[label]['body']]
+    values = {field: getattr(instance, field) for field in fields}
+    with connection.cursor() as cursor:
+        write_document(cursor, label, instance.pk, values)
+
+
+def remove_object(instance):
+    """Удаляет документ объекта из индекса"""
+    if not uses_fts_table():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE label = %s AND object_id = %s',
+            [instance._meta.label, instance.pk],
+        )
+
+
+def rebuild_index(label, model=None):
+    """
+    Перестраивает индекс модели
+
+    Args:
+        label: Метка модели ('news.News')
+        model: Класс модели (в миграции - исторический)
+
+    Returns:
+        int: Количество проиндексированных объектов
+    """
+    model = model or apps.get_model(label)
+    config = SEARCH_INDEXES[label]
+    fields = [*config['title'], *config['body']]
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE label = %s', [label])
+        for values in model.objects.values('pk', *fields).iterator():
+            write_document(cursor, label, values['pk'], values)
+            count += 1
+    return count
+
+
+def search_ids(label, terms, limit=MAX_RESULTS):
+    """
+    Первичные ключи совпадений в порядке релевантности (SQLite FTS5)
+
+    Returns:
+        list: pk объектов или None, если в запросе нет слов
+    """
+    query = build_match_query(terms)
+    if not query:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT object_id FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND label = %s '
+            f'ORDER BY bm25({SEARCH_TABLE}, 0, 0, %s, %s) LIMIT %s',
+            [query, label, TITLE_WEIGHT, BODY_WEIGHT, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_postgresql(queryset, label, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    # Хранимый столбец с индексом GIN (миграция core 0011) вместо
+    # SearchVector, вычисляемого для каждой строки
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    vector = RawSQL(f'{table}.{SEARCH_VECTOR_COLUMN}', [], output_field=SearchVectorField())
+    query = SearchQuery(' '.join(terms), config='russian', search_type='websearch')
+    return queryset.annotate(
+        search_vector=vector,
+        search_rank=SearchRank(vector, query),
+    ).filter(search_vector=query)
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Полнотекстовый поиск вместо icontains по search_fields
+
+    Без явного ?ordering= результаты сортируются по релевантности,
+    поэтому фильтр должен стоять после OrderingFilter. Для моделей
+    вне SEARCH_INDEXES и других СУБД работает как SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        label = queryset.model._meta.label
+        if not terms or label not in SEARCH_INDEXES:
+            return super().filter_queryset(request, queryset, view)
+
+        keep_ordering = bool(request.query_params.get(api_settings.ORDERING_PARAM))
+        if connection.vendor == 'postgresql':
+            queryset = _search_postgresql(queryset, label, terms)
+            return queryset if keep_ordering else queryset.order_by('-search_rank', 'pk')
+        if not uses_fts_table():
+            return super().filter_queryset(request, queryset, view)
+
+        ids = search_ids(label, terms)
+        if ids is None:
+            return queryset
+        queryset = queryset.filter(pk__in=ids)
+        if keep_ordering:
+            return queryset
+        rank = Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.order_by(rank)
+
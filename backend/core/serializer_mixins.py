@@ -1,17 +1,91 @@
 """
 Миксины для сериализаторов изображений
 """
-from rest_framework import serializers
+from .media_urls import get_media_url_builder
+from .sparse_fields import SparseFieldsMixin, get_requested_variants
 
 
-class ImageVariantsMixin:
+class MediaURLMixin:
+    """Миксин для построения URL медиафайлов (см. core.media_urls)"""
+
+    def build_media_url(self, url):
+        """Возвращает абсолютный (или относительный при ?urls=relative) URL"""
+        return get_media_url_builder(self.context).build(url)
+
+    def get_file_url(self, file):
+        """Возвращает URL файла из FileField/ImageField или None"""
+        if not file:
+            return None
+        return self.build_media_url(file.url)
+
+
+class ImageVariantsMixin(SparseFieldsMixin, MediaURLMixin):
     """
     Миксин для добавления методов получения вариантов изображений
+
+    Поддерживает ?fields= / ?omit= и ?variants= (см. core.sparse_fields).
+
+    URL вариантов строятся по манифесту Rendition (obj.renditions),
+    без обращения к хранилищу. Во вьюхах манифест загружается через
+    prefetch_related('renditions'); пока вариант не готов, отдается оригинал.
+
+    Meta.variant_fields описывает варианты каждого исходного поля:
+    {'image': {'large': 'gallery_large_webp', ...}}.
     """
 
+    def get_renditions(self, obj):
+        """
+        Возвращает готовые варианты объекта из манифеста
+
+        Записи, созданные для другого исходного файла (изображение заменили,
+        а новый вариант еще не готов), не учитываются.
+
+        Returns:
+            dict: {spec_name: Rendition}
+        """
+        cached = getattr(obj, '_rendition_map', None)
+        if cached is not None:
+            return cached
+
+        renditions = {}
+        related = getattr(obj, 'renditions', None)
+        if related is not None:
+            for rendition in related.all():
+                source = getattr(obj, rendition.source_field, None)
+                if source and source.name == rendition.source_name:
+                    renditions[rendition.spec_name] = rendition
+        obj._rendition_map = renditions
+        return renditions
+
+    def get_rendition_url(self, obj, spec_names, source_field_name='image'):
+        """
+        Возвращает URL первого готового варианта с fallback на оригинал
+
+        Args:
+            obj: Объект модели
+            spec_names: Имена вариантов в порядке предпочтения
+                Например: ['lodge_main_webp', 'image_webp']
+            source_field_name: Имя исходного поля изображения (по умолчанию 'image')
+
+        Returns:
+            str: URL варианта, оригинала или None
+        """
+        source_image = getattr(obj, source_field_name, None)
+        if not source_image:
+            return None
+
+        renditions = self.get_renditions(obj)
+        for spec_name in spec_names:
+            rendition = renditions.get(spec_name)
+            if rendition is not None:
+                return self.build_media_url(rendition.url)
+
+        # Вариант еще не готов - отдаем оригинал
+        return self.build_media_url(source_image.url)
+
     def get_image_variants(self, obj, variant_fields, source_field_name='image'):
         """
-        Возвращает объект со всеми вариантами размеров изображения
+        Возвращает объект с вариантами размеров изображения (все или из ?variants=)
 
         Args:
             obj: Объект модели
@@ -27,23 +101,78 @@ class ImageVariantsMixin:
         if not source_image:
             return None
 
-        request = self.context.get('request')
+        renditions = self.get_renditions(obj)
+        source_url = self.build_media_url(source_image.url)
+        requested = get_requested_variants(self.context)
         variants = {}
 
         for variant_name, field_name in variant_fields.items():
-            try:
-                variant_field = getattr(obj, field_name, None)
-                if variant_field and hasattr(variant_field, 'url'):
-                    url = variant_field.url
-                    if request:
-                        url = request.build_absolute_uri(url)
-                    variants[variant_name] = url
-            except Exception:
-                # Если вариант не существует, пропускаем
-                pass
+            if requested is not None and variant_name not in requested:
+                continue
+            rendition = renditions.get(field_name)
+            if rendition is not None:
+                variants[variant_name] = self.build_media_url(rendition.url)
+            else:
+                variants[variant_name] = source_url
 
         return variants if variants else None
 
+    def get_image_sources(self, obj, source_field_name='image'):
+        """
+        Возвращает варианты изображения с размерами и строку srcset
+
+        Размеры, размер файла и формат берутся из манифеста Rendition.
+        Пока вариант не готов, отдается оригинал без размеров, в srcset
+        он не попадает.
+
+        Args:
+            obj: Объект модели
+            source_field_name: Имя исходного поля изображения (ключ Meta.variant_fields)
+
+        Returns:
+            dict: {'variants': {имя: {url, width, height, size, format}},
+                'srcset': 'url 480w, url 960w'} или None
+        """
+        source_image = getattr(obj, source_field_name, None)
+        if not source_image:
+            return None
+
+        renditions = self.get_renditions(obj)
+        requested = get_requested_variants(self.context)
+        variants = {}
+        widths = {}
+
+        for variant_name, field_name in self.Meta.variant_fields[source_field_name].items():
+            if requested is not None and variant_name not in requested:
+                continue
+            rendition = renditions.get(field_name)
+            if rendition is None:
+                variants[variant_name] = {
+                    'url': self.build_media_url(source_image.url),
+                    'width': None,
+                    'height': None,
+                    'size': None,
+                    'format': None,
+                }
+                continue
+            url = self.build_media_url(rendition.url)
+            variants[variant_name] = {
+                'url': url,
+                'width': rendition.width,
+                'height': rendition.height,
+                'size': rendition.size,
+                'format': rendition.format.lower(),
+            }
+            # Одна ширина - один кандидат srcset
+            widths.setdefault(rendition.width, url)
+
+        if not variants:
+            return None
+        return {
+            'variants': variants,
+            'srcset': ', '.join(f'{widths[width]} {width}w' for width in sorted(widths)),
+        }
+
     def get_image_placeholder_url(self, obj, placeholder_field_name, source_field_name='image'):
         """
         Возвращает URL placeholder изображения
@@ -56,21 +185,46 @@ class ImageVariantsMixin:
         Returns:
             str: URL placeholder или None
         """
-        # Проверяем наличие исходного изображения
-        source_image = getattr(obj, source_field_name, None)
-        if not source_image:
+        rendition = self._get_placeholder_rendition(obj, placeholder_field_name, source_field_name)
+        if rendition is None:
             return None
+        return self.build_media_url(rendition.url)
 
-        request = self.context.get('request')
-        try:
-            placeholder_field = getattr(obj, placeholder_field_name, None)
-            if placeholder_field and hasattr(placeholder_field, 'url'):
-                url = placeholder_field.url
-                if request:
-                    url = request.build_absolute_uri(url)
-                return url
-        except Exception:
-            pass
+    def _get_placeholder_rendition(self, obj, placeholder_field_name, source_field_name):
+        if not getattr(obj, source_field_name, None):
+            return None
+        return self.get_renditions(obj).get(placeholder_field_name)
 
-        return None
+    def get_placeholder_data_uri(self, obj, placeholder_field_name, source_field_name='image'):
+        """
+        Возвращает LQIP-превью как data URI (встраивается в ответ без запроса к файлу)
 
+        Args:
+            obj: Объект модели
+            placeholder_field_name: Имя поля placeholder (например, 'hero_placeholder_webp')
+            source_field_name: Имя исходного поля изображения (по умолчанию 'image')
+
+        Returns:
+            str: data URI или None, если превью еще не готово
+        """
+        rendition = self._get_placeholder_rendition(obj, placeholder_field_name, source_field_name)
+        if rendition is None:
+            return None
+        return rendition.data_uri or None
+
+    def get_placeholder_blurhash(self, obj, placeholder_field_name, source_field_name='image'):
+        """
+        Возвращает BlurHash LQIP-превью
+
+        Args:
+            obj: Объект модели
+            placeholder_field_name: Имя поля placeholder (например, 'hero_placeholder_webp')
+            source_field_name: Имя исходного поля изображения (по умолчанию 'image')
+
+        Returns:
+            str: BlurHash или None, если превью еще не готово
+        """
+        rendition = self._get_placeholder_rendition(obj, placeholder_field_name, source_field_name)
+        if rendition is None:
+            return None
+        return rendition.blurhash or None
@@ -1,9 +1,15 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import serializers
-from .models import Statistic, GalleryImage, HeroSection, HeroImage, SiteSettings
-from .serializer_mixins import ImageVariantsMixin
+from .chunked_uploads import UPLOAD_TARGETS
+from .models import Statistic, GalleryImage, HeroSection, HeroImage, SiteSettings, ChunkedUpload
+from .serializer_mixins import ImageVariantsMixin, MediaURLMixin
+from .sparse_fields import SparseFieldsMixin
 
 
-class StatisticSerializer(serializers.ModelSerializer):
+class StatisticSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для статистики"""
     class Meta:
         model = Statistic
@@ -15,7 +21,10 @@ class GalleryImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_placeholder_url = serializers.SerializerMethodField()
+    image_placeholder = serializers.SerializerMethodField()
+    image_blurhash = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
     position_display = serializers.CharField(source='get_position_display', read_only=True)
     column_display = serializers.CharField(source='get_column_display', read_only=True)
 
@@ -23,65 +32,45 @@ class GalleryImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
         model = GalleryImage
         fields = [
             'id', 'image_url', 'image_webp_url', 'image_placeholder_url',
-            'image_variants', 'alt_text',
+            'image_placeholder', 'image_blurhash',
+            'image_variants', 'image_sources', 'alt_text',
             'position', 'position_display', 'column', 'column_display', 'order', 'is_active'
         ]
+        variant_fields = {
+            'image': {
+                'large': 'gallery_large_webp',
+                'medium': 'gallery_medium_webp',
+                'small': 'gallery_small_webp',
+            },
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if not obj.image:
-            return None
-
-        request = self.context.get('request')
-        try:
-            # Пытаемся получить WebP версию (может быть сгенерирована на лету)
-            if hasattr(obj, 'image_webp') and obj.image_webp:
-                webp_url = obj.image_webp.url
-                if request:
-                    return request.build_absolute_uri(webp_url)
-                return webp_url
-        except Exception:
-            # Если WebP не может быть получен, используем оригинал
-            pass
-
-        # Fallback на оригинальное изображение
-        return self.get_image_url(obj)
+        return self.get_rendition_url(obj, ['image_webp'], 'image')
 
     def get_image_placeholder_url(self, obj):
         """Возвращает URL placeholder"""
-        if not obj.image:
-            return None
+        return super().get_image_placeholder_url(obj, 'gallery_placeholder_webp', 'image')
 
-        request = self.context.get('request')
-        try:
-            placeholder_field = getattr(obj, 'gallery_placeholder_webp', None)
-            if placeholder_field:
-                url = placeholder_field.url
-                if request:
-                    url = request.build_absolute_uri(url)
-                return url
-        except Exception:
-            pass
+    def get_image_placeholder(self, obj):
+        """Возвращает LQIP-превью как data URI"""
+        return self.get_placeholder_data_uri(obj, 'gallery_placeholder_webp', 'image')
 
-        return None
+    def get_image_blurhash(self, obj):
+        """Возвращает BlurHash превью"""
+        return self.get_placeholder_blurhash(obj, 'gallery_placeholder_webp', 'image')
 
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'large': 'gallery_large_webp',
-            'medium': 'gallery_medium_webp',
-            'small': 'gallery_small_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
+
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
 
 class HeroImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
@@ -89,55 +78,53 @@ class HeroImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_placeholder_url = serializers.SerializerMethodField()
+    image_placeholder = serializers.SerializerMethodField()
+    image_blurhash = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
 
     class Meta:
         model = HeroImage
         fields = [
             'id', 'image_url', 'image_webp_url', 'image_placeholder_url',
-            'image_variants', 'alt_text',
+            'image_placeholder', 'image_blurhash',
+            'image_variants', 'image_sources', 'alt_text',
             'order', 'is_active', 'transition_duration'
         ]
+        variant_fields = {
+            'image': {
+                'full': 'hero_full_webp',
+                'thumb': 'hero_thumb_webp',
+            },
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                # Используем hero_full_webp как основной вариант
-                webp_url = obj.hero_full_webp.url if hasattr(obj, 'hero_full_webp') and obj.hero_full_webp else None
-                if not webp_url:
-                    webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['hero_full_webp', 'image_webp'], 'image')
 
     def get_image_placeholder_url(self, obj):
         """Возвращает URL placeholder"""
         return super().get_image_placeholder_url(obj, 'hero_placeholder_webp', 'image')
 
+    def get_image_placeholder(self, obj):
+        """Возвращает LQIP-превью как data URI"""
+        return self.get_placeholder_data_uri(obj, 'hero_placeholder_webp', 'image')
+
+    def get_image_blurhash(self, obj):
+        """Возвращает BlurHash превью"""
+        return self.get_placeholder_blurhash(obj, 'hero_placeholder_webp', 'image')
+
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'full': 'hero_full_webp',
-            'thumb': 'hero_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
+
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
 
 class HeroSectionSerializer(ImageVariantsMixin, serializers.ModelSerializer):
@@ -146,7 +133,10 @@ class HeroSectionSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     preview_image_url = serializers.SerializerMethodField()
     preview_image_webp_url = serializers.SerializerMethodField()
     preview_image_placeholder_url = serializers.SerializerMethodField()
+    preview_image_placeholder = serializers.SerializerMethodField()
+    preview_image_blurhash = serializers.SerializerMethodField()
     preview_image_variants = serializers.SerializerMethodField()
+    preview_image_sources = serializers.SerializerMethodField()
     video_poster_url = serializers.SerializerMethodField()
     promo_video_url = serializers.SerializerMethodField()
     display_type_display = serializers.CharField(source='get_display_type_display', read_only=True)
@@ -157,83 +147,62 @@ class HeroSectionSerializer(ImageVariantsMixin, serializers.ModelSerializer):
         fields = [
             'id', 'title', 'subtitle', 'preview_image_url', 'preview_image_webp_url',
             'preview_image_placeholder_url',
-            'preview_image_variants', 'promo_video_url', 'video_poster_url',
+            'preview_image_placeholder', 'preview_image_blurhash',
+            'preview_image_variants', 'preview_image_sources', 'promo_video_url', 'video_poster_url',
             'display_type', 'display_type_display',
             'autoplay_video', 'loop_video', 'mute_video', 'is_active', 'order',
             'images', 'seo_fields'
         ]
+        variant_fields = {
+            'preview_image': {
+                'full': 'preview_image_hero_full_webp',
+                'thumb': 'preview_image_hero_thumb_webp',
+            },
+        }
 
     def get_preview_image_url(self, obj):
         """Возвращает URL оригинального превью изображения"""
-        if obj.preview_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.preview_image.url)
-            return obj.preview_image.url
-        return None
+        return self.get_file_url(obj.preview_image)
 
     def get_preview_image_webp_url(self, obj):
         """Возвращает URL WebP превью изображения с fallback на оригинал"""
-        if obj.preview_image:
-            request = self.context.get('request')
-            try:
-                # Используем preview_image_hero_full_webp как основной вариант
-                webp_url = obj.preview_image_hero_full_webp.url if hasattr(obj, 'preview_image_hero_full_webp') and obj.preview_image_hero_full_webp else None
-                if not webp_url:
-                    webp_url = obj.preview_image_webp.url if hasattr(obj, 'preview_image_webp') and obj.preview_image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_preview_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['preview_image_hero_full_webp', 'preview_image_webp'], 'preview_image')
 
     def get_preview_image_placeholder_url(self, obj):
         """Возвращает URL placeholder для preview_image"""
-        if not obj.preview_image:
-            return None
-        request = self.context.get('request')
-        try:
-            placeholder_field = obj.preview_image_hero_placeholder_webp if hasattr(obj, 'preview_image_hero_placeholder_webp') else None
-            if placeholder_field and hasattr(placeholder_field, 'url'):
-                url = placeholder_field.url
-                if request:
-                    url = request.build_absolute_uri(url)
-                return url
-        except:
-            pass
-        return None
+        return super().get_image_placeholder_url(
+            obj, 'preview_image_hero_placeholder_webp', 'preview_image'
+        )
+
+    def get_preview_image_placeholder(self, obj):
+        """Возвращает LQIP-превью для preview_image как data URI"""
+        return self.get_placeholder_data_uri(
+            obj, 'preview_image_hero_placeholder_webp', 'preview_image'
+        )
+
+    def get_preview_image_blurhash(self, obj):
+        """Возвращает BlurHash превью для preview_image"""
+        return self.get_placeholder_blurhash(
+            obj, 'preview_image_hero_placeholder_webp', 'preview_image'
+        )
 
     def get_preview_image_variants(self, obj):
         """Возвращает варианты размеров preview_image"""
         if not obj.preview_image:
             return None
-        variant_fields = {
-            'full': 'preview_image_hero_full_webp',
-            'thumb': 'preview_image_hero_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'preview_image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['preview_image'], 'preview_image')
+
+    def get_preview_image_sources(self, obj):
+        """Возвращает варианты preview_image с размерами и srcset"""
+        return super().get_image_sources(obj, 'preview_image')
 
     def get_video_poster_url(self, obj):
         """Возвращает URL постера видео"""
-        if obj.video_poster:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.video_poster.url)
-            return obj.video_poster.url
-        return None
+        return self.get_file_url(obj.video_poster)
 
     def get_promo_video_url(self, obj):
         """Возвращает URL промо видео"""
-        if obj.promo_video:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.promo_video.url)
-            return obj.promo_video.url
-        return None
+        return self.get_file_url(obj.promo_video)
 
     def get_seo_fields(self, obj):
         """Возвращает SEO поля"""
@@ -351,10 +320,16 @@ class SiteSettingsSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     national_projects_logo_url = serializers.SerializerMethodField()
     hero_image_url = serializers.SerializerMethodField()
     hero_image_variants = serializers.SerializerMethodField()
+    hero_image_sources = serializers.SerializerMethodField()
     hero_image_placeholder_url = serializers.SerializerMethodField()
+    hero_image_placeholder = serializers.SerializerMethodField()
+    hero_image_blurhash = serializers.SerializerMethodField()
     base_plan_image_url = serializers.SerializerMethodField()
     base_plan_image_variants = serializers.SerializerMethodField()
+    base_plan_image_sources = serializers.SerializerMethodField()
     base_plan_image_placeholder_url = serializers.SerializerMethodField()
+    base_plan_image_placeholder = serializers.SerializerMethodField()
+    base_plan_image_blurhash = serializers.SerializerMethodField()
     seo_fields = serializers.SerializerMethodField()
 
     class Meta:
@@ -364,77 +339,85 @@ class SiteSettingsSerializer(ImageVariantsMixin, serializers.ModelSerializer):
             'email', 'address', 'telegram_url', 'vk_url',
             'registry_number', 'registry_url',
             'national_projects_logo_url', 'hero_image_url',
-            'hero_image_variants', 'hero_image_placeholder_url',
+            'hero_image_variants', 'hero_image_sources', 'hero_image_placeholder_url',
+            'hero_image_placeholder', 'hero_image_blurhash',
             'hero_title', 'hero_subtitle',
-            'base_plan_image_url', 'base_plan_image_variants',
+            'base_plan_image_url', 'base_plan_image_variants', 'base_plan_image_sources',
             'base_plan_image_placeholder_url',
+            'base_plan_image_placeholder', 'base_plan_image_blurhash',
             'base_plan_description', 'seo_fields'
         ]
+        variant_fields = {
+            'hero_image': {
+                'full': 'hero_image_full_webp',
+                'thumb': 'hero_image_thumb_webp',
+            },
+            'base_plan_image': {
+                'full': 'plan_full_webp',
+                'thumb': 'plan_thumb_webp',
+            },
+        }
 
     def get_logo_url(self, obj):
         """Возвращает URL логотипа"""
-        if obj.logo:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.logo.url)
-            return obj.logo.url
-        return None
+        return self.get_file_url(obj.logo)
 
     def get_national_projects_logo_url(self, obj):
         """Возвращает URL логотипа национальных проектов"""
-        if obj.national_projects_logo:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.national_projects_logo.url)
-            return obj.national_projects_logo.url
-        return None
+        return self.get_file_url(obj.national_projects_logo)
 
     def get_hero_image_url(self, obj):
         """Возвращает URL главного изображения"""
-        if obj.hero_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.hero_image.url)
-            return obj.hero_image.url
-        return None
+        return self.get_file_url(obj.hero_image)
 
     def get_hero_image_variants(self, obj):
         """Возвращает варианты размеров hero_image"""
         if not obj.hero_image:
             return None
-        variant_fields = {
-            'full': 'hero_image_full_webp',
-            'thumb': 'hero_image_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'hero_image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['hero_image'], 'hero_image')
+
+    def get_hero_image_sources(self, obj):
+        """Возвращает варианты hero_image с размерами и srcset"""
+        return super().get_image_sources(obj, 'hero_image')
 
     def get_hero_image_placeholder_url(self, obj):
         """Возвращает URL placeholder для hero_image"""
         return super().get_image_placeholder_url(obj, 'hero_image_placeholder_webp', 'hero_image')
 
+    def get_hero_image_placeholder(self, obj):
+        """Возвращает LQIP-превью для hero_image как data URI"""
+        return self.get_placeholder_data_uri(obj, 'hero_image_placeholder_webp', 'hero_image')
+
+    def get_hero_image_blurhash(self, obj):
+        """Возвращает BlurHash превью для hero_image"""
+        return self.get_placeholder_blurhash(obj, 'hero_image_placeholder_webp', 'hero_image')
+
     def get_base_plan_image_url(self, obj):
         """Возвращает URL изображения плана базы"""
-        if obj.base_plan_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.base_plan_image.url)
-            return obj.base_plan_image.url
-        return None
+        return self.get_file_url(obj.base_plan_image)
 
     def get_base_plan_image_variants(self, obj):
         """Возвращает варианты размеров base_plan_image"""
         if not obj.base_plan_image:
             return None
-        variant_fields = {
-            'full': 'plan_full_webp',
-            'thumb': 'plan_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'base_plan_image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['base_plan_image'], 'base_plan_image')
+
+    def get_base_plan_image_sources(self, obj):
+        """Возвращает варианты base_plan_image с размерами и srcset"""
+        return super().get_image_sources(obj, 'base_plan_image')
 
     def get_base_plan_image_placeholder_url(self, obj):
         """Возвращает URL placeholder для base_plan_image"""
         return super().get_image_placeholder_url(obj, 'plan_placeholder_webp', 'base_plan_image')
 
+    def get_base_plan_image_placeholder(self, obj):
+        """Возвращает LQIP-превью для base_plan_image как data URI"""
+        return self.get_placeholder_data_uri(obj, 'plan_placeholder_webp', 'base_plan_image')
+
+    def get_base_plan_image_blurhash(self, obj):
+        """Возвращает BlurHash превью для base_plan_image"""
+        return self.get_placeholder_blurhash(obj, 'plan_placeholder_webp', 'base_plan_image')
+
     def get_seo_fields(self, obj):
         """Возвращает SEO поля"""
         return {
@@ -448,3 +431,47 @@ class SiteSettingsSerializer(ImageVariantsMixin, serializers.ModelSerializer):
             'robots_meta': obj.robots_meta,
         }
 
+
+class ChunkedUploadCreateSerializer(serializers.Serializer):
+    """Начало загрузки файла частями."""
+    target = serializers.ChoiceField(choices=sorted(UPLOAD_TARGETS))
+    object_id = serializers.IntegerField(min_value=1)
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    checksum = serializers.RegexField(
+        r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True, default=''
+    )
+
+    def validate_filename(self, value):
+        value = os.path.basename(value.replace('\\', '/'))
+        if not value:
+            raise serializers.ValidationError('Пустое имя файла.')
+        return value
+
+    def validate_size(self, value):
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Файл больше {settings.CHUNKED_UPLOAD_MAX_SIZE} байт.'
+            )
+        return value
+
+
+class ChunkedUploadSerializer(MediaURLMixin, serializers.ModelSerializer):
+    """Состояние загрузки файла частями."""
+    chunk_size = serializers.SerializerMethodField()
+    file_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            'id', 'target', 'object_id', 'filename', 'size', 'offset',
+            'chunk_size', 'status', 'sha256', 'error', 'file_url',
+        ]
+
+    def get_chunk_size(self, obj):
+        return settings.CHUNKED_UPLOAD_CHUNK_SIZE
+
+    def get_file_url(self, obj):
+        if obj.status != ChunkedUpload.STATUS_COMPLETE:
+            return None
+        return self.build_media_url(default_storage.url(obj.name))
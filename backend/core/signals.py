@@ -0,0 +1,72 @@
+"""
+Сигналы приложения core
+"""
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .api_cache import invalidate_model
+from .image_pipeline import enqueue_renditions
+from .image_registry import image_spec_registry
+from .models import Rendition
+from .search import SEARCH_INDEXES, index_object, is_indexed, rebuild_index, remove_object, uses_fts_table
+
+SEARCH_INDEX_MIGRATION = ('core', '0008_search_index')
+
+
+@receiver(post_save, dispatch_uid='core_enqueue_image_renditions')
+def enqueue_image_renditions(sender, instance, raw=False, update_fields=None, **kwargs):
+    """После сохранения модели с ImageSpecField ставит генерацию вариантов в очередь"""
+    if raw:
+        return
+
+    source_fields = image_spec_registry.get_source_fields(sender)
+    if update_fields is not None:
+        source_fields &= set(update_fields)
+
+    source_fields = {
+        field_name for field_name in source_fields
+        if getattr(instance, field_name, None)
+    }
+    if source_fields:
+        enqueue_renditions(instance, source_fields)
+
+
+@receiver(post_save, dispatch_uid='core_invalidate_api_cache_on_save')
+@receiver(post_delete, dispatch_uid='core_invalidate_api_cache_on_delete')
+def invalidate_api_cache(sender, instance, **kwargs):
+    """Сбрасывает кеш ответов API, зависящих от сохраненной/удаленной модели"""
+    if sender is Rendition:
+        # Варианты изображений входят в ответы модели-владельца
+        sender = instance.content_type.model_class()
+        if sender is None:
+            return
+    invalidate_model(sender)
+
+
+@receiver(post_save, dispatch_uid='core_update_search_index_on_save')
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Обновляет документ объекта в полнотекстовом индексе"""
+    if raw or not is_indexed(sender):
+        return
+    index_object(instance)
+
+
+@receiver(post_delete, dispatch_uid='core_remove_from_search_index')
+def remove_from_search_index(sender, instance, **kwargs):
+    """Удаляет документ объекта из полнотекстового индекса"""
+    if is_indexed(sender):
+        remove_object(instance)
+
+
+@receiver(post_migrate, dispatch_uid='core_fill_search_index')
+def fill_search_index(sender, apps=None, plan=None, **kwargs):
+    """Заполняет индекс FTS5 после migrate, создавшего его таблицу"""
+    if sender.label != 'core' or not plan or not uses_fts_table():
+        return
+    created = any(
+        (migration.app_label, migration.name) == SEARCH_INDEX_MIGRATION and not backwards
+        for migration, backwards in plan
+    )
+    if created:
+        for label in SEARCH_INDEXES:
+            rebuild_index(label, apps.get_model(label))
@@ -0,0 +1,84 @@
+"""
+Кеш singleton-моделей (SiteSettings, Restaurant)
+
+Объект хранится в кеше django-solo (SOLO_CACHE): при save() SingletonModel
+сам обновляет запись в кеше, при delete() - удаляет ее. Поверх этого
+в пределах одного запроса объект запоминается в памяти
+(SingletonCacheMiddleware), поэтому Schema.org JSON каждого объекта
+в списке не обращается ни к БД, ни к Redis.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+_request_singletons = ContextVar('request_singletons', default=None)
+
+
+def _get_from_cache(model):
+    cache_name = getattr(settings, 'SOLO_CACHE', None)
+    if not cache_name:
+        return model.objects.first()
+
+    cache = caches[cache_name]
+    obj = cache.get(model.get_cache_key())
+    if obj is None:
+        # В отличие от get_solo() запись не создается: публичный API
+        # не должен писать в БД
+        obj = model.objects.first()
+        if obj is not None:
+            obj.set_to_cache()
+    return obj
+
+
+def get_singleton(model):
+    """
+    Возвращает единственную запись singleton-модели
+
+    Args:
+        model: Наследник solo.models.SingletonModel
+
+    Returns:
+        Объект модели или None, если запись еще не создана
+    """
+    singletons = _request_singletons.get()
+    if singletons is None:
+        return _get_from_cache(model)
+
+    if model not in singletons:
+        singletons[model] = _get_from_cache(model)
+    return singletons[model]
+
+
+class SingletonCacheMiddleware:
+    """
+    Запоминает singleton-объекты на время обработки запроса
+
+    Работает и в async-цепочке (ASGI): контекст запроса копируется
+    в поток синхронной вьюхи вместе с ContextVar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _request_singletons.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _request_singletons.reset(token)
+
+    async def __acall__(self, request):
+        token = _request_singletons.set({})
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_singletons.reset(token)
@@ -0,0 +1,327 @@
+"""
+Снимки (snapshots) JSON ответов публичного API
+
+Ответ JSON рендерится один раз для версии пространства имен кеша
+и хранится готовыми байтами вместе со сжатыми копиями (gzip, brotli).
+Запросы с актуальной версией получают эти байты без сериализаторов
+и рендерера. Хранилище - кеш Django или каталог на диске
+(API_SNAPSHOT_STORAGE).
+
+После изменения модели снимки ее пространств имен перестраиваются
+в фоне (enqueue_warm) для адресов API_SNAPSHOT_ORIGINS, чтобы первый
+посетитель не ждал сериализацию. Команда check_snapshots сравнивает
+снимки со свежим рендером.
+"""
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STORAGE_CACHE = 'cache'
+STORAGE_DISK = 'disk'
+
+ENCODING_GZIP = 'gzip'
+ENCODING_BROTLI = 'br'
+
+SNAPSHOT_MODE_ATTR = 'api_snapshot_mode'
+SNAPSHOT_DATA = 'data'
+"""Снимок отдается как Response с данными (разделы бандла)"""
+SNAPSHOT_REFRESH = 'refresh'
+"""Ответ рендерится заново и заменяет снимок (фоновое построение)"""
+SNAPSHOT_BYPASS = 'bypass'
+"""Снимки не читаются и не сохраняются (проверка расхождений)"""
+
+SNAPSHOT_URLS = {
+    'statistics': ('/api/statistics/',),
+    'gallery': ('/api/gallery/?ordering=order',),
+    'hero': ('/api/hero/',),
+    'site-settings': ('/api/site-settings/',),
+    'lodges': ('/api/lodges/', '/api/lodges/types/'),
+    'news': ('/api/news/',),
+    'activities': ('/api/activities/',),
+    'events': ('/api/events/',),
+    'restaurant': (
+        '/api/restaurant/', '/api/restaurant/images/',
+        '/api/restaurant/meal-types/', '/api/restaurant/benefits/',
+    ),
+    'bundle-home': ('/api/bundle/home/',),
+    'bundle-lodges': ('/api/bundle/lodges/',),
+    'bundle-restaurant': ('/api/bundle/restaurant/',),
+}
+"""Пространство имен кеша -> адреса, снимки которых строятся заранее"""
+
+_executor = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def is_snapshot_request(request):
+    """Снимок строится только для JSON (browsable API рендерится всегда)"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return isinstance(renderer, JSONRenderer)
+
+
+def get_snapshot_mode(request):
+    """Режим снимков запроса (SNAPSHOT_*) или None для обычного запроса"""
+    return getattr(request, SNAPSHOT_MODE_ATTR, None)
+
+
+def get_encodings():
+    """Настроенные кодировки сжатия, для которых доступен компрессор"""
+    return [
+        encoding for encoding in settings.API_SNAPSHOT_ENCODINGS
+        if encoding == ENCODING_GZIP or (encoding == ENCODING_BROTLI and brotli is not None)
+    ]
+
+
+def choose_encoding(request):
+    """
+    Кодировка ответа по Accept-Encoding клиента
+
+    Returns:
+        str: 'br', 'gzip' или None (без сжатия)
+    """
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        token, _, params = item.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(token.strip().lower())
+    for encoding in (ENCODING_BROTLI, ENCODING_GZIP):
+        if encoding in accepted and encoding in get_encodings():
+            return encoding
+    return None
+
+
+def etag_for_encoding(etag, encoding):
+    """ETag сжатого варианта отличается от ETag исходного ответа"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def make_snapshot(content):
+    """
+    Снимок из отрендеренного тела ответа
+
+    Returns:
+        dict: {'content': bytes, 'encodings': {кодировка: bytes}}
+    """
+    encodings = {}
+    for encoding in get_encodings():
+        if encoding == ENCODING_GZIP:
+            encodings[encoding] = gzip.compress(content, compresslevel=9, mtime=0)
+        else:
+            encodings[encoding] = brotli.compress(content)
+    return {'content': bytes(content), 'encodings': encodings}
+
+
+def snapshot_data(snapshot):
+    """Данные ответа из снимка"""
+    return json.loads(snapshot['content'])
+
+
+def apply_snapshot(response, snapshot, encoding):
+    """Записывает в ответ тело снимка в нужной кодировке"""
+    body = snapshot['encodings'].get(encoding) if encoding else None
+    if body is None:
+        response.content = snapshot['content']
+    else:
+        response.content = body
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def snapshot_response(snapshot, encoding):
+    """HttpResponse из снимка (Allow и Vary добавляет DRF или вызывающий)"""
+    return apply_snapshot(
+        HttpResponse(content_type=JSONRenderer.media_type), snapshot, encoding
+    )
+
+
+def _disk_path(key):
+    # Ключ: api-snapshot:<namespace>:<version>:<hash>
+    _, namespace, version, digest = key.split(':')
+    return Path(settings.API_SNAPSHOT_ROOT) / namespace / version / digest
+
+
+def _read_disk(key):
+    path = _disk_path(key)
+    try:
+        snapshot = {'content': path.with_suffix('.json').read_bytes(), 'encodings': {}}
+    except FileNotFoundError:
+        return None
+    for encoding in get_encodings():
+        try:
+            snapshot['encodings'][encoding] = path.with_suffix(f'.json.{encoding}').read_bytes()
+        except FileNotFoundError:
+            pass
+    return snapshot
+
+
+def _write_file(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_disk(key, snapshot):
+    path = _disk_path(key)
+    version_dir = path.parent
+    version_dir.mkdir(parents=True, exist_ok=True)
+    # Сжатые копии пишутся первыми: .json - признак готового снимка
+    for encoding, data in snapshot['encodings'].items():
+        _write_file(path.with_suffix(f'.json.{encoding}'), data)
+    _write_file(path.with_suffix('.json'), snapshot['content'])
+    _prune_disk(version_dir)
+
+
+def _prune_disk(version_dir):
+    """
+    Удаляет снимки версий пространства имен старше предыдущей
+
+    Предыдущая версия остается: запрос, прочитавший ее до сброса, еще
+    может читать или дописывать ее снимки. Новые версии не трогаются.
+    """
+    current = int(version_dir.name)
+    older = sorted(
+        int(old_dir.name) for old_dir in version_dir.parent.iterdir()
+        if old_dir.is_dir() and old_dir.name.isdigit() and int(old_dir.name) < current
+    )
+    for version in older[:-1]:
+        shutil.rmtree(version_dir.parent / str(version), ignore_errors=True)
+
+
+def get_snapshot(key):
+    if settings.API_SNAPSHOT_STORAGE == STORAGE_DISK:
+        return _read_disk(key)
+    return cache.get(key)
+
+
+async def aget_snapshot(key):
+    if settings.API_SNAPSHOT_STORAGE == STORAGE_DISK:
+        # Чтение нескольких КБ с диска (page cache) быстрее перехода в поток
+        return _read_disk(key)
+    return await cache.aget(key)
+
+
+def set_snapshot(key, snapshot):
+    if settings.API_SNAPSHOT_STORAGE == STORAGE_DISK:
+        _write_disk(key, snapshot)
+    else:
+        cache.set(key, snapshot, settings.API_CACHE_TIMEOUT)
+
+
+def build_request(origin, url, mode=None):
+    """
+    GET запрос к url так, как его получил бы сервер по адресу origin
+
+    Args:
+        origin: Схема и хост сайта, например 'https://example.com'
+        url: Путь с query string
+        mode: Режим снимков запроса (SNAPSHOT_*)
+    """
+    parts = urlsplit(origin)
+    extra = {}
+    if parts.scheme == 'https' and settings.SECURE_PROXY_SSL_HEADER:
+        header, value = settings.SECURE_PROXY_SSL_HEADER
+        extra[header] = value
+    request = RequestFactory().get(
+        url,
+        secure=parts.scheme == 'https',
+        HTTP_HOST=parts.netloc,
+        HTTP_ACCEPT='application/json',
+        **extra,
+    )
+    setattr(request, SNAPSHOT_MODE_ATTR, mode)
+    return request
+
+
+def render_url(origin, url, mode=None):
+    """Выполняет публичный эндпоинт и возвращает отрендеренный ответ"""
+    request = build_request(origin, url, mode)
+    match = resolve(request.path_info)
+    view = getattr(match.func, '__wrapped__', match.func)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def warm_snapshots(namespaces, origins=None):
+    """
+    Строит снимки адресов пространств имен
+
+    Args:
+        namespaces: Пространства имен из SNAPSHOT_URLS
+        origins: Адреса сайта (по умолчанию API_SNAPSHOT_ORIGINS)
+
+    Returns:
+        int: Количество построенных снимков
+    """
+    count = 0
+    for namespace in namespaces:
+        for url in SNAPSHOT_URLS.get(namespace, ()):
+            for origin in origins or settings.API_SNAPSHOT_ORIGINS:
+                response = render_url(origin, url, SNAPSHOT_REFRESH)
+                if response.status_code == 200:
+                    count += 1
+    return count
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshots')
+    return _executor
+
+
+def _warm_in_worker(namespaces):
+    with _pending_lock:
+        _pending.difference_update(namespaces)
+    close_old_connections()
+    try:
+        warm_snapshots(namespaces)
+    except Exception:
+        logger.exception('Ошибка построения снимков %s', ', '.join(namespaces))
+    finally:
+        connections.close_all()
+
+
+def enqueue_warm(namespaces):
+    """
+    Ставит перестроение снимков в фоновый поток (вызывается после коммита)
+
+    Пространства имен, уже ожидающие в очереди, повторно не добавляются:
+    сохранение объекта с inline-формами вызывает сброс много раз.
+    """
+    if not settings.API_CACHE_ENABLED or not settings.API_SNAPSHOT_ORIGINS:
+        return
+    with _pending_lock:
+        namespaces = [
+            namespace for namespace in namespaces
+            if namespace in SNAPSHOT_URLS and namespace not in _pending
+        ]
+        _pending.update(namespaces)
+    if namespaces:
+        _get_executor().submit(_warm_in_worker, namespaces)
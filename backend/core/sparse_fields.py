@@ -0,0 +1,174 @@
+"""
+Выборочные поля в ответах API
+
+Параметры запроса:
+    ?fields=name,slug,images.image_variants - оставить только эти поля
+    ?omit=description,seo_fields - исключить поля
+    ?variants=card,thumb - оставить только эти варианты в *_variants
+
+Путь через точку относится к вложенному сериализатору. Невыбранные поля
+удаляются до сериализации, поэтому их SerializerMethodField не вызываются,
+а SparseFieldsViewMixin не загружает их колонки из БД (defer).
+"""
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+VARIANTS_PARAM = 'variants'
+
+SEO_COLUMNS = (
+    'meta_title', 'meta_description', 'meta_keywords', 'og_title',
+    'og_description', 'og_image', 'canonical_url', 'robots_meta',
+)
+"""Колонки SEOMixin, которые читает get_seo_fields"""
+
+
+def _get_param(request, name):
+    if request is None:
+        return ''
+    params = getattr(request, 'query_params', request.GET)
+    return params.get(name, '')
+
+
+def parse_field_tree(value):
+    """
+    Разбирает список полей в дерево
+
+    'name,images.id,images.alt_text' -> {'name': {}, 'images': {'id': {}, 'alt_text': {}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for part in path.split('.'):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def get_field_selection(request):
+    """
+    Выбор полей верхнего уровня из параметров запроса
+
+    Returns:
+        tuple: (include, omit) - дерево fields (None - все поля) и дерево omit
+    """
+    include = parse_field_tree(_get_param(request, FIELDS_PARAM))
+    omit = parse_field_tree(_get_param(request, OMIT_PARAM))
+    return include or None, omit
+
+
+def is_field_selected(name, include, omit):
+    """Выбрано ли поле (вложенный omit не исключает поле целиком)"""
+    if include is not None and name not in include:
+        return False
+    return not (name in omit and not omit[name])
+
+
+def get_child_selection(name, include, omit):
+    """Выбор полей для вложенного сериализатора поля name"""
+    child_include = include.get(name) or None if include is not None else None
+    return child_include, omit.get(name, {})
+
+
+def get_requested_variants(context):
+    """
+    Имена вариантов из ?variants= (None - все варианты)
+
+    Разбирается один раз на ответ и хранится в контексте сериализатора.
+    """
+    if 'requested_variants' not in context:
+        value = _get_param(context.get('request'), VARIANTS_PARAM)
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        context['requested_variants'] = names or None
+    return context['requested_variants']
+
+
+class SparseFieldsMixin:
+    """
+    Миксин для ModelSerializer: оставляет только поля из ?fields= / ?omit=
+
+    Корневой сериализатор берет выбор из запроса, вложенным его передает
+    родитель. Meta.field_columns описывает колонки модели, которые читают
+    SerializerMethodField (для defer во вьюхе).
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = getattr(self, '_field_selection', None)
+        if selection is None:
+            if not self._is_root():
+                return fields
+            selection = get_field_selection(self.context.get('request'))
+
+        include, omit = selection
+        for name in list(fields):
+            if not is_field_selected(name, include, omit):
+                del fields[name]
+                continue
+            field = fields[name]
+            nested = getattr(field, 'child', field)
+            if isinstance(nested, SparseFieldsMixin):
+                nested._field_selection = get_child_selection(name, include, omit)
+        return fields
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    @classmethod
+    def get_deferred_columns(cls, request):
+        """
+        Колонки модели, которые не нужны для выбранных полей
+
+        Если среди выбранных есть SerializerMethodField или свойство модели
+        без описания в Meta.field_columns, ничего не откладывается: они
+        могут прочитать любую колонку.
+        """
+        include, omit = get_field_selection(request)
+        if include is None and not omit:
+            return []
+
+        declared = getattr(cls.Meta, 'field_columns', {})
+        model = cls.Meta.model
+        model_fields = {field.name for field in model._meta.get_fields()}
+        deferrable = {
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and not field.is_relation
+        }
+
+        kept, dropped = set(), set()
+        for name, field in cls(context={}).get_fields().items():
+            source = (field.source or name).split('.')[0]
+            if name in declared:
+                columns = set(declared[name])
+            elif source in model_fields:
+                columns = {source}
+            else:
+                # SerializerMethodField или свойство модели: колонки неизвестны
+                if is_field_selected(name, include, omit):
+                    return []
+                continue
+
+            if is_field_selected(name, include, omit):
+                kept |= columns
+            else:
+                dropped |= columns
+
+        return sorted((dropped - kept) & deferrable)
+
+
+class SparseFieldsViewMixin:
+    """Откладывает (defer) колонки, не нужные для выбранных полей"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsMixin):
+            columns = serializer_class.get_deferred_columns(self.request)
+            if columns:
+                queryset = queryset.defer(*columns)
+        return queryset
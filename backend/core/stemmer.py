@@ -0,0 +1,141 @@
+"""
+Стеммер для русского языка (алгоритм Snowball)
+
+Реализация по описанию https://snowballstem.org/algorithms/russian/stemmer.html,
+без внешних зависимостей. Используется полнотекстовым поиском
+(core.search): в индекс и в запрос попадают основы слов.
+"""
+import re
+
+_VOWELS = 'аеиоуыэюя'
+
+
+def _longest(*endings):
+    """Окончания в порядке убывания длины: ищется самое длинное"""
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+_PERFECTIVE_GERUND_1 = _longest('вшись', 'вши', 'в')
+_PERFECTIVE_GERUND_2 = _longest('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв')
+_ADJECTIVE = _longest(
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое', 'ей', 'ий',
+    'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+_PARTICIPLE_1 = _longest('ем', 'нн', 'вш', 'ющ', 'щ')
+_PARTICIPLE_2 = _longest('ивш', 'ывш', 'ующ')
+_REFLEXIVE = _longest('ся', 'сь')
+_VERB_1 = _longest(
+    'ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет', 'ют',
+    'ны', 'ть', 'й', 'л', 'н',
+)
+_VERB_2 = _longest(
+    'уйте', 'ейте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло', 'ено',
+    'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым',
+    'ен', 'ят', 'ит', 'ыт', 'ую', 'ю',
+)
+_NOUN = _longest(
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие', 'ье', 'еи',
+    'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию', 'ью', 'ия',
+    'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+_SUPERLATIVE = _longest('ейше', 'ейш')
+_DERIVATIONAL = _longest('ость', 'ост')
+
+_CYRILLIC_RE = re.compile('^[а-я]+$')
+
+
+def _regions(word):
+    """Начала областей RV и R2 (индексы в слове)"""
+    rv = len(word)
+    for i, char in enumerate(word):
+        if char in _VOWELS:
+            rv = i + 1
+            break
+
+    def after_vowel_consonant(start):
+        for i in range(start + 1, len(word)):
+            if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = after_vowel_consonant(0)
+    r2 = after_vowel_consonant(r1)
+    return rv, r2
+
+
+def _remove_ending(rv, endings):
+    """Удаляет самое длинное подходящее окончание из RV"""
+    for ending in endings:
+        if rv.endswith(ending):
+            return rv[:-len(ending)], True
+    return rv, False
+
+
+def _remove_grouped(rv, group_1, group_2):
+    """
+    Удаляет самое длинное окончание из двух групп
+
+    Окончание группы 1 удаляется, только если перед ним стоит 'а' или 'я'.
+    """
+    for ending in _longest(*group_1, *group_2):
+        if rv.endswith(ending):
+            stem = rv[:-len(ending)]
+            if ending in group_2 or (stem and stem[-1] in 'ая'):
+                return stem, True
+            return rv, False
+    return rv, False
+
+
+def _remove_adjectival(rv):
+    stem, found = _remove_ending(rv, _ADJECTIVE)
+    if not found:
+        return rv, False
+    participle_stem, participle = _remove_grouped(stem, _PARTICIPLE_1, _PARTICIPLE_2)
+    return (participle_stem if participle else stem), True
+
+
+def stem(word):
+    """
+    Возвращает основу русского слова
+
+    Слова не из кириллицы возвращаются в нижнем регистре без изменений.
+    """
+    word = word.lower().replace('ё', 'е')
+    if not _CYRILLIC_RE.match(word):
+        return word
+
+    rv_start, r2_start = _regions(word)
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    # Шаг 1
+    rv, found = _remove_grouped(rv, _PERFECTIVE_GERUND_1, _PERFECTIVE_GERUND_2)
+    if not found:
+        rv, _ = _remove_ending(rv, _REFLEXIVE)
+        rv, found = _remove_adjectival(rv)
+        if not found:
+            rv, found = _remove_grouped(rv, _VERB_1, _VERB_2)
+        if not found:
+            rv, _ = _remove_ending(rv, _NOUN)
+
+    # Шаг 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # Шаг 3: словообразовательное окончание в R2
+    r2 = (prefix + rv)[r2_start:] if r2_start < len(prefix + rv) else ''
+    for ending in _DERIVATIONAL:
+        if r2.endswith(ending):
+            rv = rv[:-len(ending)]
+            break
+
+    # Шаг 4
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        rv, superlative = _remove_ending(rv, _SUPERLATIVE)
+        if superlative and rv.endswith('нн'):
+            rv = rv[:-1]
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+
+    return prefix + rv
@@ -0,0 +1,141 @@
+"""
+Адресация медиафайлов по содержимому
+
+Загруженный оригинал сохраняется под именем из SHA-256 содержимого
+(content/<2 символа>/<sha256>.<ext>), а не по upload_to поля. Повторная
+загрузка того же файла в любую модель не записывает новый файл, а
+возвращает существующее имя.
+
+Варианты ImageKit именуются по паре (хеш оригинала, хеш спецификации):
+CACHE/images/content/<2 символа>/<sha256>/<хеш спецификации>.<ext>.
+Одинаковые оригиналы с одинаковыми параметрами варианта дают одно имя,
+и пайплайн (core.image_pipeline) не генерирует уже существующий вариант.
+Хеш спецификации включает версию рендера и Pillow, поэтому содержимое
+файла под одним именем не меняется: новые процессоры или обновление
+рендера дают новые имена, и URL вариантов можно кешировать навсегда.
+
+Файлы, загруженные до включения, сохраняют прежние имена и варианты
+(см. команду dedupe_media).
+"""
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+import PIL
+from imagekit import hashers
+from imagekit.utils import suggest_extension
+
+from .image_renderer import RENDERER_VERSION
+
+CONTENT_DIR = 'content'
+HASH_BLOCK_SIZE = 64 * 1024
+
+_CONTENT_NAME_RE = re.compile(
+    rf'^{CONTENT_DIR}/[0-9a-f]{{2}}/(?P<hash>[0-9a-f]{{64}})(\.[0-9a-z]+)?$'
+)
+
+
+def get_content_name(sha256, filename):
+    """Имя файла в хранилище по хешу содержимого и расширению исходного имени"""
+    ext = os.path.splitext(filename)[1].lower()
+    return f'{CONTENT_DIR}/{sha256[:2]}/{sha256}{ext}'
+
+
+def get_content_hash(name):
+    """SHA-256 из имени файла с адресацией по содержимому или None"""
+    match = _CONTENT_NAME_RE.match(name or '')
+    return match.group('hash') if match else None
+
+
+def is_content_addressed_rendition(name):
+    """Имя варианта из rendition_namer для оригинала с адресацией по содержимому"""
+    return name.startswith(f'{settings.IMAGEKIT_CACHEFILE_DIR}/{CONTENT_DIR}/')
+
+
+def _is_cachefile(name):
+    return name.replace('\\', '/').startswith(f'{settings.IMAGEKIT_CACHEFILE_DIR}/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище медиа с дедупликацией оригиналов
+
+    Варианты ImageKit (IMAGEKIT_CACHEFILE_DIR) сохраняются под своими
+    именами: их имя уже задает rendition_namer.
+    """
+
+    def _save(self, name, content):
+        if _is_cachefile(name):
+            return super()._save(name, content)
+
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(HASH_BLOCK_SIZE):
+            digest.update(chunk)
+        content_name = get_content_name(digest.hexdigest(), name)
+        if self.exists(content_name):
+            # Такой файл уже загружен
+            return content_name
+
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return super()._save(content_name, content)
+
+    def adopt(self, name, sha256):
+        """
+        Переносит готовый файл хранилища под имя по содержимому
+
+        Используется загрузкой частями: файл уже записан и хеш посчитан.
+        Перенос - переименование в пределах MEDIA_ROOT, без копирования.
+
+        Returns:
+            str: Новое имя файла
+        """
+        content_name = get_content_name(sha256, name)
+        if self.exists(content_name):
+            self.delete(name)
+            return content_name
+        target = self.path(content_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self.path(name), target)
+        return content_name
+
+
+def get_spec_hash(generator):
+    """Хеш всего, что определяет содержимое варианта, кроме исходника"""
+    return hashers.pickle([
+        generator.processors,
+        generator.format,
+        generator.options,
+        generator.autoconvert,
+        RENDERER_VERSION,
+        PIL.__version__,
+    ])
+
+
+def rendition_namer(generator):
+    """
+    Namer вариантов ImageKit с отпечатком в имени
+
+    Для оригинала с адресацией по содержимому: (хеш оригинала, хеш
+    спецификации). Для оригиналов со старыми именами - каталог по пути
+    оригинала (как source_name_as_path ImageKit) и хеш пары (имя оригинала,
+    хеш спецификации): хранилище не переиспользует имя оригинала для
+    другого файла.
+    """
+    source_name = getattr(generator.source, 'name', None)
+    ext = suggest_extension(source_name or '', generator.format)
+    spec_hash = get_spec_hash(generator)
+    source_hash = get_content_hash(source_name)
+    if source_hash is None:
+        return os.path.join(
+            settings.IMAGEKIT_CACHEFILE_DIR, os.path.splitext(source_name)[0],
+            f'{hashers.pickle([source_name, spec_hash])}{ext}',
+        )
+    return os.path.join(
+        settings.IMAGEKIT_CACHEFILE_DIR, CONTENT_DIR, source_hash[:2], source_hash,
+        f'{spec_hash}{ext}',
+    )
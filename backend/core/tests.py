@@ -1,3 +1,576 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import models
+from django.test import SimpleTestCase, TestCase, override_settings
+from imagekit.processors import ResizeToFill
+from PIL import Image
+
+from . import chunked_uploads
+from .admin import activate_hero, deactivate_hero
+from .api_cache import get_namespace_state
+from .models import ChunkedUpload, GalleryImage, HeroSection, Rendition, Statistic
+from .search import build_match_query, normalize_text
+from .snapshots import brotli, make_snapshot, warm_snapshots
+from .storage import CONTENT_DIR, get_content_name, get_spec_hash
+from .stemmer import stem
+
+
+class StemmerTests(SimpleTestCase):
+    """Стеммер Snowball для русского языка"""
+
+    def test_reference_words(self):
+        # Пары из словаря Snowball (russian/voc.txt -> output.txt)
+        words = {
+            'вагона': 'вагон',
+            'важнейшими': 'важн',
+            'возможности': 'возможн',
+            'красоты': 'красот',
+            'бегавшая': 'бега',
+            'бегая': 'бег',
+        }
+        for word, expected in words.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+    def test_inflected_forms_share_stem(self):
+        groups = [
+            ('баня', 'бани', 'баней', 'банях'),
+            ('озеро', 'озера', 'озёрах', 'Озеро'),
+            ('размещение', 'размещения', 'размещениях'),
+            ('красивая', 'красивых', 'красивый'),
+        ]
+        for forms in groups:
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(form) for form in forms}), 1)
+
+    def test_non_cyrillic(self):
+        self.assertEqual(stem('Wi-Fi'), 'wi-fi')
+        self.assertEqual(stem('2024'), '2024')
+        self.assertEqual(stem('Ёлкой'), 'елк')
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text('<p>Баня на <b>озере</b></p>'), 'бан на озер')
+        self.assertEqual(normalize_text(None), '')
+
+    def test_build_match_query(self):
+        self.assertEqual(build_match_query(['банями', 'у озёр']), '"бан"* "у"* "озер"*')
+        # Кавычки и операторы FTS5 из запроса не попадают в выражение
+        self.assertEqual(build_match_query(['"OR баня*']), '"or"* "бан"*')
+        self.assertEqual(build_match_query(['!!!']), '')
+
+
+class RenditionFingerprintTests(SimpleTestCase):
+    """Отпечаток в именах вариантов и правило immutable в nginx"""
+
+    source_hash = 'ab' * 32
+
+    def make_spec(self, **changes):
+        spec = {
+            'processors': [ResizeToFill(414, 296)],
+            'format': 'WEBP',
+            'options': {'quality': 75},
+            'autoconvert': True,
+        }
+        spec.update(changes)
+        return SimpleNamespace(**spec)
+
+    def test_spec_hash(self):
+        spec_hash = get_spec_hash(self.make_spec())
+        # Те же параметры в новых объектах - тот же хеш
+        self.assertEqual(get_spec_hash(self.make_spec()), spec_hash)
+        changes = {
+            'processors': [ResizeToFill(414, 300)],
+            'format': 'JPEG',
+            'options': {'quality': 80},
+            'autoconvert': False,
+        }
+        for field, value in changes.items():
+            with self.subTest(field=field):
+                self.assertNotEqual(get_spec_hash(self.make_spec(**{field: value})), spec_hash)
+        with mock.patch('core.storage.RENDERER_VERSION', 999):
+            self.assertNotEqual(get_spec_hash(self.make_spec()), spec_hash)
+
+    def test_rendition_names(self):
+        image = GalleryImage(image=f'content/ab/{self.source_hash}.png')
+        small, medium = image.gallery_small_webp.name, image.gallery_medium_webp.name
+        self.assertRegex(small, rf'^CACHE/images/content/ab/{self.source_hash}/[0-9a-f]{{32}}\.webp$')
+        self.assertNotEqual(small, medium)
+
+        other = GalleryImage(image=f'content/cd/{"cd" * 32}.png')
+        self.assertNotEqual(other.gallery_small_webp.name, small)
+        self.assertEqual(os.path.basename(other.gallery_small_webp.name), os.path.basename(small))
+
+        # Оригинал со старым именем: отпечаток из имени и спецификации
+        legacy = GalleryImage(image='gallery/photo.jpg').gallery_small_webp.name
+        self.assertRegex(legacy, r'^CACHE/images/gallery/photo/[0-9a-f]{32}\.webp$')
+        renamed = GalleryImage(image='gallery/photo_1.jpg').gallery_small_webp.name
+        self.assertNotEqual(os.path.basename(renamed), os.path.basename(legacy))
+
+    def test_immutable_locations(self):
+        config = os.path.join(settings.BASE_DIR.parent, 'nginx', 'sp-new.conf')
+        if not os.path.exists(config):
+            self.skipTest('nginx/sp-new.conf не найден')
+        with open(config, encoding='utf-8') as f:
+            blocks = re.findall(r'location\s+(?:\^~\s+)?(\S+)\s*\{([^}]*)\}', f.read())
+        immutable = {path for path, body in blocks if 'immutable' in body and path.startswith('/media/')}
+        self.assertEqual(immutable, {
+            f'/media/{settings.IMAGEKIT_CACHEFILE_DIR}/', f'/media/{CONTENT_DIR}/',
+        })
+
+        # Файлы по upload_to полей не попадают под immutable: имена
+        # в этих каталогах дают только rendition_namer и ContentAddressedStorage
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, models.FileField) and isinstance(field.upload_to, str):
+                    with self.subTest(field=f'{model._meta.label}.{field.name}'):
+                        self.assertFalse(field.upload_to.startswith(
+                            (f'{settings.IMAGEKIT_CACHEFILE_DIR}/', f'{CONTENT_DIR}/')
+                        ))
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class HeroAdminActionTests(TestCase):
+    """Действия админки с queryset.update() сбрасывают кеш /api/hero/"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_actions_bump_namespaces(self):
+        first = HeroSection.objects.create(title='Первая', is_active=True)
+        second = HeroSection.objects.create(title='Вторая', is_active=False)
+        actions = [
+            (activate_hero, second),
+            (deactivate_hero, second),
+        ]
+        for action, hero in actions:
+            with self.subTest(action=action.__name__):
+                before = [get_namespace_state(ns)[0] for ns in ('hero', 'bundle-home')]
+                action(None, None, HeroSection.objects.filter(pk=hero.pk))
+                after = [get_namespace_state(ns)[0] for ns in ('hero', 'bundle-home')]
+                self.assertNotEqual(before[0], after[0])
+                self.assertNotEqual(before[1], after[1])
+        first.refresh_from_db()
+        self.assertFalse(first.is_active)
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified и 304 для /api/statistics/"""
+
+    url = '/api/statistics/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.statistic = Statistic.objects.create(number='10', label='Домиков')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def assert_not_modified(self, response, etag):
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_if_none_match(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+        with self.assertNumQueries(0):
+            self.assert_not_modified(self.client.get(self.url, headers={'If-None-Match': etag}), etag)
+        for header in [f'W/{etag}', '*', f'"other", {etag}']:
+            with self.subTest(header=header):
+                self.assert_not_modified(self.client.get(self.url, headers={'If-None-Match': header}), etag)
+
+        response = self.client.get(self.url, headers={'If-None-Match': '"other"'})
+        self.assertEqual(response.status_code, 200)
+        # Другой URL - другой ETag
+        self.assertNotEqual(self.client.get(self.url, {'page': 1}).headers['ETag'], etag)
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.url)
+        modified = response.headers['Last-Modified']
+        self.assert_not_modified(
+            self.client.get(self.url, headers={'If-Modified-Since': modified}), response.headers['ETag'],
+        )
+
+    def test_etag_changes_after_save(self):
+        etag = self.client.get(self.url).headers['ETag']
+        self.statistic.number = '12'
+        self.statistic.save()
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['number'], '12')
+
+    def test_not_modified_keeps_vary(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        etag = response.headers['ETag']
+        self.assertTrue(etag.endswith('-gzip"'))
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assert_not_modified(response, etag)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+
+        # Сжатый и несжатый варианты не совпадают по ETag
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 200)
+
+
+@override_settings(API_CACHE_ENABLED=True, API_SNAPSHOT_ENCODINGS=['br', 'gzip'])
+class SnapshotTests(TestCase):
+    """Снимки ответов /api/statistics/ в кеше и на диске"""
+
+    url = '/api/statistics/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.statistic = Statistic.objects.create(number='10', label='Домиков')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_encodings(self):
+        snapshot = make_snapshot(b'{"a": 1}')
+        self.assertEqual(gzip.decompress(snapshot['encodings']['gzip']), b'{"a": 1}')
+        if brotli is None:
+            self.assertNotIn('br', snapshot['encodings'])
+        else:
+            self.assertEqual(brotli.decompress(snapshot['encodings']['br']), b'{"a": 1}')
+
+        plain = self.client.get(self.url)
+        compressed = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+    def test_save_invalidates_snapshot(self):
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).content, response.content)
+
+        self.statistic.number = '12'
+        self.statistic.save()
+        for headers in [{}, {'Accept-Encoding': 'gzip'}]:
+            with self.subTest(headers=headers):
+                response = self.client.get(self.url, headers=headers)
+                content = response.content
+                if headers:
+                    content = gzip.decompress(content)
+                self.assertIn(b'"number":"12"', content)
+
+    def test_warm_snapshots(self):
+        self.assertEqual(warm_snapshots(['statistics'], origins=['http://testserver']), 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertIn(b'"number":"10"', response.content)
+
+    def test_disk_storage(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+
+        with override_settings(API_SNAPSHOT_STORAGE='disk', API_SNAPSHOT_ROOT=root):
+            versions = []
+            for number in ['11', '12', '13']:
+                self.statistic.number = number
+                self.statistic.save()
+                versions.append(str(get_namespace_state('statistics')[0]))
+                self.client.get(self.url)
+                with self.assertNumQueries(0):
+                    response = self.client.get(self.url)
+                self.assertIn(f'"number":"{number}"'.encode(), response.content)
+
+        namespace_dir = os.path.join(root, 'statistics')
+        # Остаются текущая и предыдущая версии
+        self.assertEqual(sorted(os.listdir(namespace_dir)), sorted(versions[1:]))
+        files = os.listdir(os.path.join(namespace_dir, versions[-1]))
+        self.assertEqual(len([name for name in files if name.endswith('.json')]), 1)
+        self.assertEqual(len([name for name in files if name.endswith('.json.gzip')]), 1)
+
+
+@override_settings(API_CACHE_ENABLED=True, MEDIA_BASE_URL='')
+class RelativeMediaURLTests(TestCase):
+    """?urls=relative: префикс медиа в X-Media-Base и media_base"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.image = GalleryImage.objects.create(image='gallery/photo.jpg', order=1)
+        cls.editor = get_user_model().objects.create_user(
+            'editor', password='password', is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_list_response(self):
+        self.client.force_login(self.editor)
+        response = self.client.get('/api/auth/edit/gallery/all/', {'urls': 'relative'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(response.data[0]['image_url'], '/media/gallery/photo.jpg')
+        self.assertEqual(response.headers['X-Media-Base'], 'http://testserver')
+
+        response = self.client.get('/api/auth/edit/gallery/all/')
+        self.assertEqual(response.data[0]['image_url'], 'http://testserver/media/gallery/photo.jpg')
+        self.assertNotIn('X-Media-Base', response.headers)
+
+    def test_object_response(self):
+        for _ in range(2):
+            # Второй ответ - из снимка
+            response = self.client.get('/api/gallery/', {'urls': 'relative'})
+            data = response.json()
+            self.assertEqual(data['results'][0]['image_url'], '/media/gallery/photo.jpg')
+            self.assertEqual(data['media_base'], 'http://testserver')
+            self.assertEqual(response.headers['X-Media-Base'], 'http://testserver')
+
+        with override_settings(MEDIA_BASE_URL='https://cdn.example.com/'):
+            response = self.client.get('/api/auth/edit/gallery/all/', {'urls': 'relative'})
+        # Без прав редактора - 403 без префикса
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('X-Media-Base', response.headers)
+
+        self.client.force_login(self.editor)
+        with override_settings(MEDIA_BASE_URL='https://cdn.example.com/'):
+            response = self.client.get('/api/auth/edit/gallery/all/', {'urls': 'relative'})
+        self.assertEqual(response.headers['X-Media-Base'], 'https://cdn.example.com')
+
+
+@override_settings(API_CACHE_ENABLED=False, CHUNKED_UPLOAD_CHUNK_SIZE=4)
+class ChunkedUploadTests(TestCase):
+    """Загрузка частями /api/auth/edit/uploads/ (протокол Upload-Offset)"""
+
+    data = b'0123456789'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hero = HeroSection.objects.create(title='Hero')
+        cls.editor = get_user_model().objects.create_user(
+            'editor', password='password', is_staff=True
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.addCleanup(chunked_uploads._hashers.clear)
+        self.client.force_login(self.editor)
+
+    def start(self, checksum=None):
+        payload = {
+            'target': 'hero.promo_video',
+            'object_id': self.hero.pk,
+            'filename': 'promo.mp4',
+            'size': len(self.data),
+        }
+        if checksum is not None:
+            payload['checksum'] = checksum
+        response = self.client.post('/api/auth/edit/uploads/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.headers['Upload-Offset'], '0')
+        return response.headers['Location']
+
+    def send(self, url, offset, chunk, **extra):
+        return self.client.patch(
+            url, chunk,
+            content_type='application/offset+octet-stream',
+            headers={'Upload-Offset': str(offset)},
+            **extra,
+        )
+
+    def get_offset(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Upload-Offset'], str(response.data['offset']))
+        return response.data['offset']
+
+    def test_upload(self):
+        url = self.start(hashlib.sha256(self.data).hexdigest())
+        for offset in range(0, len(self.data), 4):
+            response = self.send(url, offset, self.data[offset:offset + 4])
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], ChunkedUpload.STATUS_COMPLETE)
+
+        # Файл переименован по содержимому и привязан к полю без копирования
+        self.hero.refresh_from_db()
+        sha256 = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(self.hero.promo_video.name, get_content_name(sha256, 'promo.mp4'))
+        with self.hero.promo_video.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_wrong_offset(self):
+        url = self.start()
+        self.assertEqual(self.send(url, 4, self.data[4:8]).status_code, 409)
+        self.assertEqual(self.send(url, 0, self.data[:4]).status_code, 200)
+        # Повтор уже полученной части и пропуск данных
+        self.assertEqual(self.send(url, 0, self.data[:4]).status_code, 409)
+        self.assertEqual(self.send(url, 8, self.data[8:]).status_code, 409)
+        self.assertEqual(self.get_offset(url), 4)
+
+        self.assertEqual(self.send(url, 4, self.data[4:]).status_code, 413)
+        self.assertEqual(self.send(url, 4, self.data[4:8]).status_code, 200)
+        self.assertEqual(self.send(url, 8, self.data[8:]).status_code, 200)
+        # Загрузка завершена
+        self.assertEqual(self.send(url, 10, b'x').status_code, 409)
+        self.assertEqual(self.send(url, 10, b'').status_code, 409)
+
+    def test_repeated_final_chunk(self):
+        url = self.start()
+        self.assertEqual(self.send(url, 0, self.data[:4]).status_code, 200)
+        self.assertEqual(self.send(url, 4, self.data[4:8]).status_code, 200)
+        # Повтор последней части загружен до завершения первой
+        stale = ChunkedUpload.objects.get()
+        self.assertEqual(self.send(url, 8, self.data[8:]).status_code, 200)
+
+        upload = chunked_uploads.write_chunk(stale, io.BytesIO(b''), 10, 0)
+        self.assertEqual(upload.status, ChunkedUpload.STATUS_COMPLETE)
+        self.hero.refresh_from_db()
+        self.assertEqual(self.hero.promo_video.name, upload.name)
+        with self.hero.promo_video.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_final_chunk_claimed_once(self):
+        url = self.start()
+        self.assertEqual(self.send(url, 0, self.data[:4]).status_code, 200)
+        self.assertEqual(self.send(url, 4, self.data[4:8]).status_code, 200)
+        upload = ChunkedUpload.objects.get()
+        # Параллельный запрос уже завершает загрузку
+        ChunkedUpload.objects.filter(pk=upload.pk).update(status=ChunkedUpload.STATUS_COMPLETING)
+
+        with self.assertRaises(chunked_uploads.UploadConflict):
+            chunked_uploads.write_chunk(upload, io.BytesIO(self.data[8:]), 8, 2)
+        self.hero.refresh_from_db()
+        self.assertFalse(self.hero.promo_video)
+
+    def test_resume_after_partial_upload(self):
+        url = self.start(hashlib.sha256(self.data).hexdigest())
+        # Клиент оборвал соединение: из 4 байт части дошли 3
+        response = self.send(url, 0, self.data[:4], **{
+            'CONTENT_LENGTH': '4', 'wsgi.input': io.BytesIO(self.data[:3]),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_offset(url), 3)
+
+        # Продолжение в другом процессе: хеш пересчитывается по файлу
+        chunked_uploads._hashers.clear()
+        offset = self.get_offset(url)
+        for start in range(offset, len(self.data), 4):
+            response = self.send(url, start, self.data[start:start + 4])
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], ChunkedUpload.STATUS_COMPLETE)
+        self.assertEqual(response.data['sha256'], hashlib.sha256(self.data).hexdigest())
+
+    def test_bad_checksum(self):
+        url = self.start(hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(self.send(url, 0, self.data[:4]).status_code, 200)
+        upload = ChunkedUpload.objects.get()
+        path = chunked_uploads.get_upload_path(upload)
+        self.assertTrue(os.path.exists(path))
+
+        self.assertEqual(self.send(url, 4, self.data[4:8]).status_code, 200)
+        response = self.send(url, 8, self.data[8:])
+        self.assertEqual(response.status_code, 400)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ChunkedUpload.STATUS_FAILED)
+        self.assertFalse(os.path.exists(path))
+        self.hero.refresh_from_db()
+        self.assertFalse(self.hero.promo_video)
+
+
+def make_png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 24), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(API_CACHE_ENABLED=False, IMAGE_RENDITION_WORKERS=0)
+class ContentAddressedStorageTests(TestCase):
+    """Дедупликация оригиналов и вариантов (core.storage, core.renditions)"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        # Состояние файлов ImageKit хранится в кеше, а MEDIA_ROOT у каждого теста свой
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def add_image(self, content, order):
+        image = GalleryImage(order=order)
+        # Варианты генерируются после коммита (синхронно при IMAGE_RENDITION_WORKERS=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image.save(f'photo-{order}.png', ContentFile(content))
+        return image
+
+    def replace_image(self, image, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image.save('replacement.png', ContentFile(content))
+
+    def get_rendition_names(self, image):
+        return set(Rendition.objects.filter(object_id=image.pk, content_type__model='galleryimage')
+                   .values_list('name', flat=True))
+
+    def exists(self, name):
+        return GalleryImage._meta.get_field('image').storage.exists(name)
+
+    def test_identical_uploads_share_files(self):
+        content = make_png('red')
+        first = self.add_image(content, 1)
+        second = self.add_image(content, 2)
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.image.name, get_content_name(hashlib.sha256(content).hexdigest(), 'x.png'))
+        names = self.get_rendition_names(first)
+        self.assertEqual(len(names), 5)
+        self.assertEqual(self.get_rendition_names(second), names)
+        self.assertTrue(all(self.exists(name) for name in names))
+
+    def test_replacing_keeps_shared_files(self):
+        content = make_png('red')
+        first = self.add_image(content, 1)
+        second = self.add_image(content, 2)
+        shared = self.get_rendition_names(first)
+
+        self.replace_image(first, make_png('blue'))
+        replaced = self.get_rendition_names(first)
+        self.assertEqual(len(replaced), 5)
+        self.assertFalse(replaced & shared)
+        # На прежние файлы еще ссылается second
+        self.assertTrue(all(self.exists(name) for name in shared))
+        self.assertTrue(self.exists(second.image.name))
+
+        # Больше не используются: удаляются
+        self.replace_image(second, make_png('blue'))
+        self.assertEqual(self.get_rendition_names(second), replaced)
+        self.assertFalse(any(self.exists(name) for name in shared))
+        self.assertTrue(all(self.exists(name) for name in replaced))
+
+        # Та же картинка снова: удаленные варианты создаются заново
+        third = self.add_image(content, 3)
+        self.assertEqual(self.get_rendition_names(third), shared)
+        self.assertTrue(all(self.exists(name) for name in shared))
@@ -5,18 +5,29 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.http import HttpResponse
+from rest_framework.reverse import reverse
+from django.http import HttpResponse, Http404
+from django.shortcuts import get_object_or_404
 from django.middleware.csrf import get_token
 from django.contrib.sitemaps import Sitemap
 from django.contrib.sitemaps.views import sitemap
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
-from .models import Statistic, GalleryImage, HeroSection, SiteSettings
+from django.db.models import prefetch_related_objects
+from .api_cache import CachedResponseMixin, get_bundle_namespace, invalidate_model
+from .async_reads import AsyncReadMixin
+from .bundles import PAGE_BUNDLES, build_bundle
+from .chunked_uploads import OFFSET_HEADER, delete_upload, start_upload, write_chunk
+from .image_pipeline import get_rendition_status
+from .media_urls import MediaBaseMixin
+from .models import Statistic, GalleryImage, HeroSection, SiteSettings, ChunkedUpload
+from .singletons import get_singleton
 from .serializers import (
     StatisticSerializer, GalleryImageSerializer,
     HeroSectionSerializer, SiteSettingsSerializer,
     HeroSectionPatchSerializer, StatisticPatchSerializer,
-    GalleryImageUploadSerializer, GalleryLayoutApplySerializer
+    GalleryImageUploadSerializer, GalleryLayoutApplySerializer,
+    ChunkedUploadCreateSerializer, ChunkedUploadSerializer
 )
 from .sitemaps import (
     LodgeTypeSitemap, LodgeSitemap, NewsSitemap,
@@ -24,8 +35,9 @@ from .sitemaps import (
 )
 
 
-class StatisticViewSet(viewsets.ReadOnlyModelViewSet):
+class StatisticViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для статистики"""
+    cache_namespace = 'statistics'
     queryset = Statistic.objects.filter(is_active=True)
     serializer_class = StatisticSerializer
     permission_classes = [AllowAny]
@@ -41,9 +53,10 @@ class StatisticViewSet(viewsets.ReadOnlyModelViewSet):
         return context
 
 
-class GalleryImageViewSet(viewsets.ReadOnlyModelViewSet):
+class GalleryImageViewSet(AsyncReadMixin, MediaBaseMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для изображений галереи"""
-    queryset = GalleryImage.objects.filter(is_active=True)
+    cache_namespace = 'gallery'
+    queryset = GalleryImage.objects.filter(is_active=True).prefetch_related('renditions')
     serializer_class = GalleryImageSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -58,15 +71,19 @@ class GalleryImageViewSet(viewsets.ReadOnlyModelViewSet):
         return context
 
 
-class HeroSectionView(generics.RetrieveAPIView):
+class HeroSectionView(AsyncReadMixin, MediaBaseMixin, CachedResponseMixin, generics.RetrieveAPIView):
     """View для Hero секции (активная запись)"""
+    cache_namespace = 'hero'
     queryset = HeroSection.objects.filter(is_active=True)
     serializer_class = HeroSectionSerializer
     permission_classes = [AllowAny]
 
     def get_object(self):
         """Возвращает активную Hero секцию"""
-        return HeroSection.get_active_hero()
+        hero = HeroSection.get_active_hero()
+        if hero is not None:
+            prefetch_related_objects([hero], 'renditions', 'images__renditions')
+        return hero
 
     def get_serializer_context(self):
         """Передаем request в контекст сериализатора"""
@@ -75,15 +92,20 @@ class HeroSectionView(generics.RetrieveAPIView):
         return context
 
 
-class SiteSettingsView(generics.RetrieveAPIView):
+class SiteSettingsView(AsyncReadMixin, MediaBaseMixin, CachedResponseMixin, generics.RetrieveAPIView):
     """View для настроек сайта (Singleton)"""
+    cache_namespace = 'site-settings'
     queryset = SiteSettings.objects.all()
     serializer_class = SiteSettingsSerializer
     permission_classes = [AllowAny]
 
     def get_object(self):
         """Возвращает единственную запись настроек сайта"""
-        return SiteSettings.objects.get()
+        site_settings = get_singleton(SiteSettings)
+        if site_settings is None:
+            raise Http404
+        prefetch_related_objects([site_settings], 'renditions')
+        return site_settings
 
     def get_serializer_context(self):
         """Передаем request в контекст сериализатора"""
@@ -92,6 +114,23 @@ class SiteSettingsView(generics.RetrieveAPIView):
         return context
 
 
+class PageBundleView(MediaBaseMixin, CachedResponseMixin, APIView):
+    """View для бандла страницы: ответы нескольких эндпоинтов в одном запросе"""
+    permission_classes = [AllowAny]
+
+    @property
+    def cache_namespace(self):
+        return get_bundle_namespace(self.kwargs['page'])
+
+    def get(self, request, page):
+        if page not in PAGE_BUNDLES:
+            raise Http404
+        return self.get_cached_response(self._get_bundle, request, page)
+
+    def _get_bundle(self, request, page):
+        return Response(build_bundle(page, request._request))
+
+
 class IsSiteEditor(BasePermission):
     """Доступ только для редакторов сайта (staff/superuser)."""
     def has_permission(self, request, view):
@@ -159,20 +198,36 @@ class StatisticPatchView(generics.UpdateAPIView):
     http_method_names = ['patch']
 
 
-class GalleryImageAdminListView(APIView):
+class GalleryImageAdminListView(MediaBaseMixin, APIView):
     """GET список всех изображений галереи (включая неактивные)."""
     permission_classes = [IsSiteEditor]
 
     def get(self, request):
-        queryset = GalleryImage.objects.all().order_by('position', 'column', 'order', 'id')
+        queryset = GalleryImage.objects.prefetch_related('renditions').order_by(
+            'position', 'column', 'order', 'id'
+        )
         serializer = GalleryImageSerializer(
             queryset, many=True, context={'request': request}
         )
         return Response(serializer.data)
 
 
+def get_gallery_upload_status(instance, request):
+    """Изображение галереи и прогресс генерации его вариантов."""
+    return {
+        **GalleryImageSerializer(instance, context={'request': request}).data,
+        'renditions': get_rendition_status(instance),
+        'status_url': reverse('gallery-upload-status', args=[instance.pk], request=request),
+    }
+
+
 class GalleryImageUploadView(APIView):
-    """POST загрузка изображения галереи для edit-mode."""
+    """
+    POST загрузка изображения галереи для edit-mode.
+
+    Отвечает 202 сразу после сохранения оригинала: варианты создаются
+    в фоне (core.image_pipeline), прогресс - по status_url.
+    """
     permission_classes = [IsSiteEditor]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -180,10 +235,76 @@ class GalleryImageUploadView(APIView):
         serializer = GalleryImageUploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         instance = serializer.save()
-        response_serializer = GalleryImageSerializer(
-            instance, context={'request': request}
+        data = get_gallery_upload_status(instance, request)
+        return Response(
+            data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['status_url']}
+        )
+
+
+class GalleryImageUploadStatusView(APIView):
+    """GET прогресс генерации вариантов загруженного изображения галереи."""
+    permission_classes = [IsSiteEditor]
+
+    def get(self, request, pk):
+        instance = get_object_or_404(GalleryImage, pk=pk)
+        return Response(get_gallery_upload_status(instance, request))
+
+
+class ChunkedUploadCreateView(APIView):
+    """POST начало загрузки большого файла частями (core.chunked_uploads)."""
+    permission_classes = [IsSiteEditor]
+    parser_classes = [JSONParser]
+
+    def post(self, request):
+        serializer = ChunkedUploadCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = start_upload(user=request.user, **serializer.validated_data)
+        response_serializer = ChunkedUploadSerializer(upload, context={'request': request})
+        location = reverse('chunked-upload', args=[upload.pk], request=request)
+        return Response(
+            response_serializer.data,
+            status=status.HTTP_201_CREATED,
+            headers={'Location': location, OFFSET_HEADER: upload.offset},
         )
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ChunkedUploadView(APIView):
+    """
+    GET смещение для продолжения загрузки, PATCH часть файла, DELETE отмена.
+
+    Часть передается сырым телом (application/offset+octet-stream)
+    с заголовком Upload-Offset и читается из потока запроса.
+    """
+    permission_classes = [IsSiteEditor]
+    parser_classes = []
+
+    def get_upload(self, request, pk):
+        return get_object_or_404(ChunkedUpload, pk=pk, user=request.user)
+
+    def respond(self, request, upload, status_code=status.HTTP_200_OK):
+        serializer = ChunkedUploadSerializer(upload, context={'request': request})
+        return Response(serializer.data, status=status_code, headers={OFFSET_HEADER: upload.offset})
+
+    def get(self, request, pk):
+        return self.respond(request, self.get_upload(request, pk))
+
+    def patch(self, request, pk):
+        upload = self.get_upload(request, pk)
+        try:
+            offset = int(request.headers[OFFSET_HEADER])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {'detail': f'Нужны заголовки {OFFSET_HEADER} и Content-Length.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Поток запроса Django, а не request.data: тело не разбирается и не буферизуется
+        upload = write_chunk(upload, request._request, offset, length)
+        return self.respond(request, upload)
+
+    def delete(self, request, pk):
+        delete_upload(self.get_upload(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class GalleryLayoutApplyView(APIView):
@@ -244,9 +365,12 @@ class GalleryLayoutApplyView(APIView):
                     ['position', 'column', 'order', 'is_active', 'alt_text']
                 )
 
+            # bulk_update не отправляет сигналы
+            invalidate_model(GalleryImage)
+
         updated_queryset = GalleryImage.objects.filter(
             is_active=True, position='main'
-        ).order_by('position', 'column', 'order', 'id')
+        ).prefetch_related('renditions').order_by('position', 'column', 'order', 'id')
         response_serializer = GalleryImageSerializer(
             updated_queryset, many=True, context={'request': request}
         )
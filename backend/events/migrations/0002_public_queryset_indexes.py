@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventtype',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'title'], name='eventtype_active_order_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
+from django.contrib.contenttypes.fields import GenericRelation
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
 from core.models import SEOMixin
@@ -54,6 +55,7 @@ class EventType(SEOMixin):
         format='WEBP',
         options={'quality': 70}
     )
+    renditions = GenericRelation('core.Rendition')
     is_active = models.BooleanField(
         default=True,
         verbose_name='Активен'
@@ -67,6 +69,13 @@ class EventType(SEOMixin):
         verbose_name = 'Тип мероприятия'
         verbose_name_plural = 'Типы мероприятий'
         ordering = ['order', 'title']
+        indexes = [
+            # /api/events/: активные по порядку
+            models.Index(
+                fields=['order', 'title'], condition=models.Q(is_active=True),
+                name='eventtype_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -8,6 +8,7 @@ class EventTypeSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
     schema_org_json = serializers.SerializerMethodField()
     seo_fields = serializers.SerializerMethodField()
 
@@ -15,45 +16,31 @@ class EventTypeSerializer(ImageVariantsMixin, serializers.ModelSerializer):
         model = EventType
         fields = [
             'id', 'title', 'slug', 'description', 'image_url', 'image_webp_url',
-            'image_variants', 'is_active', 'order', 'schema_org_json', 'seo_fields'
+            'image_variants', 'image_sources', 'is_active', 'order', 'schema_org_json', 'seo_fields'
         ]
+        variant_fields = {
+            'image': {
+                'large': 'event_large_webp',
+                'card': 'event_card_webp',
+                'thumb': 'event_thumb_webp',
+            },
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                # Используем event_card_webp как основной вариант
-                webp_url = obj.event_card_webp.url if hasattr(obj, 'event_card_webp') and obj.event_card_webp else None
-                if not webp_url:
-                    webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['event_card_webp', 'image_webp'], 'image')
 
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'large': 'event_large_webp',
-            'card': 'event_card_webp',
-            'thumb': 'event_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
+
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
     def get_schema_org_json(self, obj):
         """Возвращает Schema.org JSON-LD"""
@@ -1,13 +1,16 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from core.api_cache import CachedResponseMixin
+from core.media_urls import MediaBaseMixin
 from .models import EventType
 from .serializers import EventTypeSerializer
 
 
-class EventTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class EventTypeViewSet(MediaBaseMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для типов мероприятий"""
-    queryset = EventType.objects.filter(is_active=True)
+    cache_namespace = 'events'
+    queryset = EventType.objects.filter(is_active=True).prefetch_related('renditions')
     serializer_class = EventTypeSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lodges', '0002_lodge_conveniences_lodge_include_lodgeavailability_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lodge',
+            index=models.Index(fields=['order', 'name', 'id'], name='lodge_list_order_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lodges', '0003_lodge_lodge_list_order_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lodge',
+            name='lodge_list_order_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lodge',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name', 'id'], name='lodge_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lodgeavailability',
+            index=models.Index(fields=['lodge', 'order', 'id'], name='lodgeavail_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lodgeimage',
+            index=models.Index(fields=['lodge', 'order', 'id'], name='lodgeimage_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lodgeprice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['lodge', 'order', 'cost'], name='lodgeprice_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lodgetype',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='lodgetype_active_order_idx'),
+        ),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
+from django.contrib.contenttypes.fields import GenericRelation
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
-from core.models import SEOMixin
-from core.image_processors import SmartCropProcessor, NoOpProcessor
+from core.models import SEOMixin, SiteSettings
+from core.singletons import get_singleton
+from core.image_processors import SmartCropProcessor, LQIPProcessor
 
 
 class LodgeType(SEOMixin):
@@ -54,10 +56,11 @@ class LodgeType(SEOMixin):
     )
     lodge_hero_placeholder_webp = ImageSpecField(
         source='hero_image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     description = models.TextField(
         blank=True,
         null=True,
@@ -77,6 +80,13 @@ class LodgeType(SEOMixin):
         verbose_name = 'Тип размещения'
         verbose_name_plural = 'Типы размещения'
         ordering = ['order', 'name']
+        indexes = [
+            # /api/lodges/types/: активные по порядку
+            models.Index(
+                fields=['order', 'name'], condition=models.Q(is_active=True),
+                name='lodgetype_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -175,6 +185,13 @@ class Lodge(SEOMixin):
         verbose_name = 'Размещение'
         verbose_name_plural = 'Размещения'
         ordering = ['order', 'name']
+        indexes = [
+            # /api/lodges/: активные по порядку (и курсорная пагинация)
+            models.Index(
+                fields=['order', 'name', 'id'], condition=models.Q(is_active=True),
+                name='lodge_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.lodge_type.name} - {self.name}'
@@ -193,14 +210,16 @@ class Lodge(SEOMixin):
             # Если namespace не зарегистрирован, возвращаем простой URL
             return f"/lodges/{self.slug}/"
 
-    def get_schema_org_json(self):
-        """Генерирует JSON-LD для Schema.org (LodgingBusiness)"""
-        site_settings = None
-        try:
-            from core.models import SiteSettings
-            site_settings = SiteSettings.objects.get()
-        except Exception:
-            pass
+    def get_schema_org_json(self, site_settings=None):
+        """
+        Генерирует JSON-LD для Schema.org (LodgingBusiness)
+
+        Args:
+            site_settings: Уже загруженные SiteSettings (при сериализации
+                списка загружаются один раз на запрос)
+        """
+        if site_settings is None:
+            site_settings = get_singleton(SiteSettings)
 
         schema = {
             "@context": "https://schema.org",
@@ -279,10 +298,11 @@ class LodgeImage(models.Model):
     )
     lodge_placeholder_webp = ImageSpecField(
         source='image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     alt_text = models.CharField(
         max_length=255,
         blank=True,
@@ -299,6 +319,9 @@ class LodgeImage(models.Model):
         verbose_name = 'Изображение размещения'
         verbose_name_plural = 'Изображения размещения'
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['lodge', 'order', 'id'], name='lodgeimage_order_idx'),
+        ]
 
     def __str__(self):
         return f'{self.lodge.name} - Изображение {self.order}'
@@ -336,6 +359,13 @@ class LodgePrice(models.Model):
         verbose_name = 'Цена размещения'
         verbose_name_plural = 'Цены размещения'
         ordering = ['order', 'cost']
+        indexes = [
+            # Активные цены размещения (Prefetch в lodges.views)
+            models.Index(
+                fields=['lodge', 'order', 'cost'], condition=models.Q(is_active=True),
+                name='lodgeprice_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.lodge.name} - {self.name}: {self.cost} руб.'
@@ -363,6 +393,9 @@ class LodgeAvailability(models.Model):
         verbose_name = 'Доступность размещения'
         verbose_name_plural = 'Доступность размещения'
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['lodge', 'order', 'id'], name='lodgeavail_order_idx'),
+        ]
 
     def __str__(self):
         return f'{self.lodge.name} - {self.name}'
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import LodgeType, Lodge, LodgeImage, LodgePrice, LodgeAvailability
 from core.serializer_mixins import ImageVariantsMixin
+from core.sparse_fields import SEO_COLUMNS, SparseFieldsMixin
 
 
 class LodgeImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
@@ -8,72 +9,70 @@ class LodgeImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_placeholder_url = serializers.SerializerMethodField()
+    image_placeholder = serializers.SerializerMethodField()
+    image_blurhash = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
 
     class Meta:
         model = LodgeImage
         fields = [
             'id', 'image_url', 'image_webp_url', 'image_placeholder_url',
-            'image_variants', 'alt_text', 'order'
+            'image_placeholder', 'image_blurhash',
+            'image_variants', 'image_sources', 'alt_text', 'order'
         ]
+        variant_fields = {
+            'image': {
+                'main': 'lodge_main_webp',
+                'card': 'lodge_card_webp',
+                'thumb': 'lodge_thumb_webp',
+            },
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                # Используем lodge_main_webp как основной вариант
-                webp_url = obj.lodge_main_webp.url if hasattr(obj, 'lodge_main_webp') and obj.lodge_main_webp else None
-                if not webp_url:
-                    webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['lodge_main_webp', 'image_webp'], 'image')
 
     def get_image_placeholder_url(self, obj):
         """Возвращает URL placeholder"""
         return super().get_image_placeholder_url(obj, 'lodge_placeholder_webp', 'image')
 
+    def get_image_placeholder(self, obj):
+        """Возвращает LQIP-превью как data URI"""
+        return self.get_placeholder_data_uri(obj, 'lodge_placeholder_webp', 'image')
+
+    def get_image_blurhash(self, obj):
+        """Возвращает BlurHash превью"""
+        return self.get_placeholder_blurhash(obj, 'lodge_placeholder_webp', 'image')
+
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'main': 'lodge_main_webp',
-            'card': 'lodge_card_webp',
-            'thumb': 'lodge_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
 
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
-class LodgePriceSerializer(serializers.ModelSerializer):
+
+class LodgePriceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для цен размещения"""
     class Meta:
         model = LodgePrice
         fields = ['id', 'name', 'cost', 'order']
 
 
-class LodgeAvailabilitySerializer(serializers.ModelSerializer):
+class LodgeAvailabilitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для доступности размещения"""
     class Meta:
         model = LodgeAvailability
         fields = ['id', 'name', 'order']
 
 
-class LodgeSerializer(serializers.ModelSerializer):
+class LodgeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для размещения"""
     images = LodgeImageSerializer(many=True, read_only=True)
     lodge_type_name = serializers.CharField(source='lodge_type.name', read_only=True)
@@ -93,6 +92,12 @@ class LodgeSerializer(serializers.ModelSerializer):
             'images', 'price_set', 'special_price_set', 'availability_set',
             'schema_org_json', 'seo_fields'
         ]
+        # Колонки, которые читают SerializerMethodField (для ?fields= / ?omit=)
+        field_columns = {
+            'special_price_set': [],
+            'schema_org_json': ['name', 'short_description', 'description', 'price_from', 'capacity'],
+            'seo_fields': SEO_COLUMNS,
+        }
 
     def get_special_price_set(self, obj):
         """Возвращает пустой массив для совместимости с фронтендом"""
@@ -100,7 +105,7 @@ class LodgeSerializer(serializers.ModelSerializer):
 
     def get_schema_org_json(self, obj):
         """Возвращает Schema.org JSON-LD"""
-        return obj.get_schema_org_json()
+        return obj.get_schema_org_json(site_settings=self.context.get('site_settings'))
 
     def get_seo_fields(self, obj):
         """Возвращает SEO поля"""
@@ -122,7 +127,10 @@ class LodgeTypeSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     hero_image_url = serializers.SerializerMethodField()
     hero_image_webp_url = serializers.SerializerMethodField()
     hero_image_placeholder_url = serializers.SerializerMethodField()
+    hero_image_placeholder = serializers.SerializerMethodField()
+    hero_image_blurhash = serializers.SerializerMethodField()
     hero_image_variants = serializers.SerializerMethodField()
+    hero_image_sources = serializers.SerializerMethodField()
     seo_fields = serializers.SerializerMethodField()
 
     class Meta:
@@ -130,51 +138,57 @@ class LodgeTypeSerializer(ImageVariantsMixin, serializers.ModelSerializer):
         fields = [
             'id', 'name', 'slug', 'subtitle', 'hero_image_url', 'hero_image_webp_url',
             'hero_image_placeholder_url',
-            'hero_image_variants', 'description', 'is_active', 'order',
+            'hero_image_placeholder', 'hero_image_blurhash',
+            'hero_image_variants', 'hero_image_sources', 'description', 'is_active', 'order',
             'lodges', 'seo_fields'
         ]
+        variant_fields = {
+            'hero_image': {
+                'main': 'lodge_hero_main_webp',
+                'card': 'lodge_hero_card_webp',
+            },
+        }
+        # Колонки, которые читают SerializerMethodField (для ?fields= / ?omit=)
+        field_columns = {
+            'hero_image_url': ['hero_image'],
+            'hero_image_webp_url': ['hero_image'],
+            'hero_image_placeholder_url': ['hero_image'],
+            'hero_image_placeholder': ['hero_image'],
+            'hero_image_blurhash': ['hero_image'],
+            'hero_image_variants': ['hero_image'],
+            'hero_image_sources': ['hero_image'],
+            'seo_fields': SEO_COLUMNS,
+        }
 
     def get_hero_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.hero_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.hero_image.url)
-            return obj.hero_image.url
-        return None
+        return self.get_file_url(obj.hero_image)
 
     def get_hero_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.hero_image:
-            request = self.context.get('request')
-            try:
-                # Используем lodge_hero_main_webp как основной вариант
-                webp_url = obj.lodge_hero_main_webp.url if hasattr(obj, 'lodge_hero_main_webp') and obj.lodge_hero_main_webp else None
-                if not webp_url:
-                    webp_url = obj.hero_image_webp.url if hasattr(obj, 'hero_image_webp') and obj.hero_image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_hero_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['lodge_hero_main_webp', 'hero_image_webp'], 'hero_image')
 
     def get_hero_image_placeholder_url(self, obj):
         """Возвращает URL placeholder для hero_image"""
         return super().get_image_placeholder_url(obj, 'lodge_hero_placeholder_webp', 'hero_image')
 
+    def get_hero_image_placeholder(self, obj):
+        """Возвращает LQIP-превью для hero_image как data URI"""
+        return self.get_placeholder_data_uri(obj, 'lodge_hero_placeholder_webp', 'hero_image')
+
+    def get_hero_image_blurhash(self, obj):
+        """Возвращает BlurHash превью для hero_image"""
+        return self.get_placeholder_blurhash(obj, 'lodge_hero_placeholder_webp', 'hero_image')
+
     def get_hero_image_variants(self, obj):
         """Возвращает варианты размеров hero_image"""
         if not obj.hero_image:
             return None
-        variant_fields = {
-            'main': 'lodge_hero_main_webp',
-            'card': 'lodge_hero_card_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'hero_image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['hero_image'], 'hero_image')
+
+    def get_hero_image_sources(self, obj):
+        """Возвращает варианты hero_image с размерами и srcset"""
+        return super().get_image_sources(obj, 'hero_image')
 
     def get_seo_fields(self, obj):
         """Возвращает SEO поля"""
@@ -1,3 +1,259 @@
-from django.test import TestCase
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from core.api_cache import get_namespace_state
+from core.models import Rendition, SiteSettings
+from .models import LodgeType, Lodge, LodgeImage, LodgePrice, LodgeAvailability
+
+
+@override_settings(API_CACHE_ENABLED=False, SOLO_CACHE=None)
+class LodgeAPITestCase(TestCase):
+    """Тип размещения и SiteSettings; размещения добавляет add_lodge"""
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(address='Пермский край')
+        cls.lodge_type = LodgeType.objects.create(name='Коттеджи', slug='cottages')
+
+    def setUp(self):
+        # Кеш в памяти процесса общий для всех тестов
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # ContentType тоже кешируются в процессе: прогреваем, чтобы число
+        # запросов не зависело от порядка тестов
+        ContentType.objects.get_for_models(LodgeType, LodgeImage)
+
+    def add_lodge(self, number):
+        lodge = Lodge.objects.create(
+            lodge_type=self.lodge_type,
+            name=f'Коттедж №{number}',
+            slug=f'cottage-{number}',
+            description='Описание',
+            capacity=4,
+            area=50,
+        )
+        LodgePrice.objects.create(lodge=lodge, name='Будни', cost=5000)
+        LodgePrice.objects.create(lodge=lodge, name='Архив', cost=1000, is_active=False)
+        LodgeAvailability.objects.create(lodge=lodge, name='Доступен')
+        image = LodgeImage.objects.create(lodge=lodge, image=f'lodges/images/{number}.jpg')
+        Rendition.objects.create(
+            content_type=ContentType.objects.get_for_model(LodgeImage),
+            object_id=image.pk,
+            source_field='image',
+            source_name=image.image.name,
+            spec_name='lodge_card_webp',
+            name=f'CACHE/images/lodges/images/{number}/card.webp',
+            width=626,
+            height=456,
+            size=1000,
+            format='WEBP',
+        )
+        return lodge
+
+
+class LodgeTypeQueryCountTests(LodgeAPITestCase):
+    """Количество запросов к /api/lodges/types/ не зависит от числа размещений"""
+
+    # count, типы, варианты типов, размещения, изображения,
+    # варианты изображений, цены, доступность, SiteSettings (раз на запрос)
+    EXPECTED_QUERIES = 9
+
+    def get_types(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/lodges/types/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(context.captured_queries)
+
+    def test_query_count_is_constant(self):
+        self.add_lodge(1)
+        _, single = self.get_types()
+
+        for number in range(2, 6):
+            self.add_lodge(number)
+        response, many = self.get_types()
+
+        self.assertEqual(single, self.EXPECTED_QUERIES)
+        self.assertEqual(many, self.EXPECTED_QUERIES)
+        self.assertEqual(len(response.data['results'][0]['lodges']), 5)
+
+    def test_only_active_prices(self):
+        self.add_lodge(1)
+        response, _ = self.get_types()
+
+        lodge = response.data['results'][0]['lodges'][0]
+        self.assertEqual([price['name'] for price in lodge['price_set']], ['Будни'])
+        self.assertEqual(
+            lodge['schema_org_json']['address']['addressLocality'], 'Пермский край'
+        )
+        self.assertTrue(lodge['images'][0]['image_variants']['card'].endswith('card.webp'))
+
+    def test_image_sources_from_manifest(self):
+        self.add_lodge(1)
+        response, _ = self.get_types()
+
+        sources = response.data['results'][0]['lodges'][0]['images'][0]['image_sources']
+        card = sources['variants']['card']
+        self.assertEqual(
+            (card['width'], card['height'], card['size'], card['format']),
+            (626, 456, 1000, 'webp'),
+        )
+        # Неготовый вариант - оригинал без размеров, в srcset не попадает
+        self.assertIsNone(sources['variants']['main']['width'])
+        self.assertEqual(sources['srcset'], f'{card["url"]} 626w')
+
+
+class LodgeSparseFieldsTests(LodgeAPITestCase):
+    """?fields= / ?omit= / ?variants= для /api/lodges/"""
+
+    def get_lodges(self, params, queries):
+        """Ответ для 1 и 5 размещений: число запросов одинаковое"""
+        self.add_lodge(1)
+        with self.assertNumQueries(queries):
+            single = self.client.get('/api/lodges/', params)
+        for number in range(2, 6):
+            self.add_lodge(number)
+        with self.assertNumQueries(queries):
+            response = self.client.get('/api/lodges/', params)
+        self.assertEqual(single.status_code, 200)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 5)
+        return response.data['results']
+
+    def get_select_sql(self, params):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/lodges/', params)
+        return next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT "lodges_lodge"."id"')
+        )
+
+    def test_fields(self):
+        # count, размещения, изображения, варианты изображений:
+        # без schema_org_json SiteSettings не загружаются
+        results = self.get_lodges({'fields': 'id,name,images.image_variants'}, 4)
+        self.assertEqual(set(results[0]), {'id', 'name', 'images'})
+        self.assertEqual(set(results[0]['images'][0]), {'image_variants'})
+
+    def test_omit(self):
+        # count, размещения: связи и SiteSettings не загружаются
+        results = self.get_lodges(
+            {'omit': 'images,price_set,availability_set,schema_org_json,seo_fields'}, 2,
+        )
+        self.assertFalse({'images', 'price_set', 'availability_set', 'seo_fields'} & set(results[0]))
+        self.assertIn('description', results[0])
+
+    def test_variants(self):
+        results = self.get_lodges({'fields': 'images', 'variants': 'card'}, 4)
+        image = results[0]['images'][0]
+        self.assertEqual(list(image['image_variants']), ['card'])
+        self.assertEqual(list(image['image_sources']['variants']), ['card'])
+
+    def test_site_settings_only_for_schema_org(self):
+        self.add_lodge(1)
+        cases = [
+            ('/api/lodges/', {'fields': 'id,schema_org_json'}, True),
+            ('/api/lodges/', {'omit': 'schema_org_json'}, False),
+            ('/api/lodges/types/', {}, True),
+            ('/api/lodges/types/', {'fields': 'id,name'}, False),
+            ('/api/lodges/types/', {'fields': 'lodges.id'}, False),
+            ('/api/lodges/types/', {'fields': 'lodges.schema_org_json'}, True),
+            ('/api/lodges/types/', {'omit': 'lodges.schema_org_json'}, False),
+        ]
+        for url, params, loaded in cases:
+            with self.subTest(url=url, params=params):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    any('core_sitesettings' in query['sql'] for query in context.captured_queries),
+                    loaded,
+                )
+
+    def test_deferred_columns(self):
+        self.add_lodge(1)
+        sql = self.get_select_sql({'fields': 'id,name,schema_org_json'})
+        # schema_org_json объявлен в Meta.field_columns: его колонки остаются
+        self.assertIn('"lodges_lodge"."description"', sql)
+        self.assertNotIn('"lodges_lodge"."location_description"', sql)
+        self.assertNotIn('"lodges_lodge"."meta_title"', sql)
+
+        # Без ?fields= колонки не откладываются
+        sql = self.get_select_sql({})
+        self.assertIn('"lodges_lodge"."location_description"', sql)
+
+    def test_deferred_columns_without_n_plus_one(self):
+        # Отложенные колонки не читаются сериализатором: запросов
+        # не больше, чем без ?fields=
+        results = self.get_lodges({'fields': 'id,name,short_description,schema_org_json'}, 3)
+        self.assertEqual(set(results[0]), {'id', 'name', 'short_description', 'schema_org_json'})
+
+
+@override_settings(API_CACHE_ENABLED=True, SOLO_CACHE=None)
+class LodgeCacheTests(LodgeAPITestCase):
+    """Кеш ответов /api/lodges/ и его сброс при изменении моделей"""
+
+    def get_versions(self, *namespaces):
+        return [get_namespace_state(namespace)[0] for namespace in namespaces]
+
+    def test_invalidation(self):
+        lodge = self.add_lodge(1)
+        price = lodge.price_set.first()
+        settings = SiteSettings.objects.get()
+        changes = {
+            'lodge save': lodge.save,
+            'price save': price.save,
+            'price delete': price.delete,
+            'site settings save': settings.save,
+            'lodge delete': lodge.delete,
+        }
+        for name, change in changes.items():
+            with self.subTest(change=name):
+                before = self.get_versions('lodges', 'bundle-lodges', 'bundle-home', 'statistics')
+                change()
+                after = self.get_versions('lodges', 'bundle-lodges', 'bundle-home', 'statistics')
+                self.assertTrue(all(a != b for a, b in zip(before[:3], after[:3])))
+                self.assertEqual(before[3], after[3])
+
+    def test_cached_response(self):
+        lodge = self.add_lodge(1)
+        response = self.client.get('/api/lodges/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/lodges/')
+        self.assertEqual(cached.content, response.content)
+
+        # После сохранения цены ответ строится заново
+        price = lodge.price_set.get(is_active=True)
+        price.cost = 7000
+        price.save()
+        response = self.client.get('/api/lodges/')
+        self.assertEqual(response.json()['results'][0]['price_set'][0]['cost'], '7000.00')
+
+    def test_key_depends_on_query_string(self):
+        self.add_lodge(1)
+        sparse = self.client.get('/api/lodges/', {'fields': 'id,name'}).json()
+        full = self.client.get('/api/lodges/').json()
+        self.assertEqual(set(sparse['results'][0]), {'id', 'name'})
+        self.assertIn('price_set', full['results'][0])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/lodges/', {'fields': 'id,name'}).json()
+        self.assertEqual(cached, sparse)
+
+        # Другой набор полей - другой снимок
+        with CaptureQueriesContext(connection) as context:
+            omitted = self.client.get('/api/lodges/', {'omit': 'price_set'}).json()
+        self.assertGreater(len(context.captured_queries), 0)
+        self.assertNotIn('price_set', omitted['results'][0])
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_cache_disabled(self):
+        self.add_lodge(1)
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get('/api/lodges/')
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(len(context.captured_queries), 0)
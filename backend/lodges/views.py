@@ -1,14 +1,79 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import AllowAny
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import LodgeType, Lodge
+from core.api_cache import CachedResponseMixin
+from core.async_reads import AsyncReadMixin
+from core.media_urls import MediaBaseMixin
+from core.pagination import SelectablePaginationMixin
+from core.search import FullTextSearchFilter
+from core.models import SiteSettings
+from core.singletons import get_singleton
+from core.sparse_fields import (
+    SparseFieldsViewMixin, get_child_selection, get_field_selection, is_field_selected,
+)
+from .models import LodgeType, Lodge, LodgePrice
 from .serializers import LodgeTypeSerializer, LodgeSerializer
 from .filters import LodgeFilter
 
 
-class LodgeTypeViewSet(viewsets.ReadOnlyModelViewSet):
+def lodge_prefetches(prefix='', selection=(None, {})):
+    """
+    Prefetch для вложенных данных LodgeSerializer
+
+    Количество запросов не зависит от числа размещений: изображения,
+    варианты, активные цены и доступность загружаются по одному запросу.
+    Связи, исключенные через ?fields= / ?omit=, не загружаются.
+
+    Args:
+        prefix: Путь до размещений (например, 'lodges__')
+        selection: Выбор полей размещения (include, omit)
+    """
+    include, omit = selection
+    prefetches = []
+    if is_field_selected('images', include, omit):
+        prefetches.append(f'{prefix}images__renditions')
+    if is_field_selected('price_set', include, omit):
+        prefetches.append(
+            Prefetch(f'{prefix}price_set', queryset=LodgePrice.objects.filter(is_active=True))
+        )
+    if is_field_selected('availability_set', include, omit):
+        prefetches.append(f'{prefix}availability_set')
+    return prefetches
+
+
+class LodgeSerializerContextMixin:
+    """Передает в контекст сериализатора request и SiteSettings"""
+    lodge_path = ()
+    """Путь до полей размещения в ответе (('lodges',) у типов размещения)"""
+
+    def uses_site_settings(self):
+        """Выбран ли schema_org_json размещений в ?fields= / ?omit="""
+        include, omit = get_field_selection(self.request)
+        for name in self.lodge_path:
+            if not is_field_selected(name, include, omit):
+                return False
+            include, omit = get_child_selection(name, include, omit)
+        return is_field_selected('schema_org_json', include, omit)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['request'] = self.request
+        # Schema.org JSON каждого размещения берет адрес из SiteSettings -
+        # загружаем их один раз на запрос, а не на каждое размещение
+        if self.uses_site_settings():
+            context['site_settings'] = get_singleton(SiteSettings)
+        return context
+
+
+class LodgeTypeViewSet(
+    AsyncReadMixin, LodgeSerializerContextMixin, SparseFieldsViewMixin, MediaBaseMixin,
+    CachedResponseMixin, viewsets.ReadOnlyModelViewSet,
+):
     """ViewSet для типов размещения"""
-    queryset = LodgeType.objects.filter(is_active=True).prefetch_related('lodges')
+    cache_namespace = 'lodges'
+    lodge_path = ('lodges',)
+    queryset = LodgeType.objects.filter(is_active=True).prefetch_related('renditions')
     serializer_class = LodgeTypeSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -16,26 +81,36 @@ class LodgeTypeViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['order', 'name']
     ordering = ['order', 'name']
 
-    def get_serializer_context(self):
-        """Передаем request в контекст сериализатора"""
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+    def get_queryset(self):
+        """Загружает вложенные размещения, если они выбраны"""
+        queryset = super().get_queryset()
+        include, omit = get_field_selection(self.request)
+        if not is_field_selected('lodges', include, omit):
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch('lodges', queryset=Lodge.objects.filter(is_active=True)),
+            *lodge_prefetches('lodges__', get_child_selection('lodges', include, omit)),
+        )
 
 
-class LodgeViewSet(viewsets.ReadOnlyModelViewSet):
+class LodgeViewSet(
+    AsyncReadMixin, LodgeSerializerContextMixin, SelectablePaginationMixin, SparseFieldsViewMixin, MediaBaseMixin,
+    CachedResponseMixin, viewsets.ReadOnlyModelViewSet,
+):
     """ViewSet для размещений"""
-    queryset = Lodge.objects.filter(is_active=True).select_related('lodge_type').prefetch_related('images')
+    cache_namespace = 'lodges'
+    queryset = Lodge.objects.filter(is_active=True).select_related('lodge_type')
     serializer_class = LodgeSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = LodgeFilter
     search_fields = ['name', 'description', 'short_description']
     ordering_fields = ['order', 'name', 'price_from', 'capacity']
-    ordering = ['order', 'name']
+    # Совпадает с индексом lodge_active_order_idx
+    ordering = ['order', 'name', 'id']
 
-    def get_serializer_context(self):
-        """Передаем request в контекст сериализатора"""
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+    def get_queryset(self):
+        """Загружает только выбранные связи размещения"""
+        return super().get_queryset().prefetch_related(
+            *lodge_prefetches(selection=get_field_selection(self.request))
+        )
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.utils import timezone
+from core.api_cache import invalidate_model
 from .models import News
 
 
@@ -7,12 +8,14 @@ from .models import News
 def make_published(modeladmin, request, queryset):
     """Действие для массовой публикации новостей"""
     queryset.update(is_published=True, published_at=timezone.now())
+    invalidate_model(News)
 
 
 @admin.action(description='Снять с публикации выбранные новости')
 def make_unpublished(modeladmin, request, queryset):
     """Действие для массового снятия с публикации"""
     queryset.update(is_published=False)
+    invalidate_model(News)
 
 
 @admin.register(News)
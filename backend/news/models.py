@@ -2,9 +2,11 @@ from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
 from django.utils import timezone
+from django.contrib.contenttypes.fields import GenericRelation
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
-from core.models import SEOMixin
+from core.models import SEOMixin, SiteSettings
+from core.singletons import get_singleton
 
 
 class News(SEOMixin):
@@ -69,6 +71,7 @@ class News(SEOMixin):
         format='WEBP',
         options={'quality': 70}
     )
+    renditions = GenericRelation('core.Rendition')
     published_at = models.DateTimeField(
         default=timezone.now,
         verbose_name='Дата публикации',
@@ -97,6 +100,13 @@ class News(SEOMixin):
         verbose_name = 'Новость'
         verbose_name_plural = 'Новости'
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # /api/news/: опубликованные по дате (и курсорная пагинация)
+            models.Index(
+                fields=['-published_at', '-created_at', 'id'], condition=models.Q(is_published=True),
+                name='news_published_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -132,12 +142,7 @@ class News(SEOMixin):
 
     def get_schema_org_json(self):
         """Генерирует JSON-LD для Schema.org (NewsArticle)"""
-        site_settings = None
-        try:
-            from core.models import SiteSettings
-            site_settings = SiteSettings.objects.get()
-        except Exception:
-            pass
+        site_settings = get_singleton(SiteSettings)
 
         schema = {
             "@context": "https://schema.org",
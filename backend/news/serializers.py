@@ -8,50 +8,44 @@ class NewsListSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
 
     class Meta:
         model = News
         fields = [
             'id', 'title', 'slug', 'short_description', 'excerpt',
-            'image_url', 'image_webp_url', 'image_variants',
+            'image_url', 'image_webp_url', 'image_variants', 'image_sources',
             'published_at', 'reading_time'
         ]
+        variant_fields = {
+            'image': {
+                'card': 'news_card_webp',
+                'thumb': 'news_thumb_webp',
+            },
+        }
+        # Колонки, которые читают SerializerMethodField (для ?fields= / ?omit=)
+        field_columns = {
+            'image_url': ['image'],
+            'image_webp_url': ['image'],
+            'image_variants': ['image'],
+            'image_sources': ['image'],
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                # Используем news_card_webp для списка
-                webp_url = obj.news_card_webp.url if hasattr(obj, 'news_card_webp') and obj.news_card_webp else None
-                if not webp_url:
-                    webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['news_card_webp', 'image_webp'], 'image')
 
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'card': 'news_card_webp',
-            'thumb': 'news_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
+
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
 
 class NewsDetailSerializer(ImageVariantsMixin, serializers.ModelSerializer):
@@ -59,6 +53,7 @@ class NewsDetailSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
     schema_org_json = serializers.SerializerMethodField()
     seo_fields = serializers.SerializerMethodField()
 
@@ -66,47 +61,33 @@ class NewsDetailSerializer(ImageVariantsMixin, serializers.ModelSerializer):
         model = News
         fields = [
             'id', 'title', 'slug', 'content', 'short_description', 'excerpt',
-            'image_url', 'image_webp_url', 'image_variants',
+            'image_url', 'image_webp_url', 'image_variants', 'image_sources',
             'published_at', 'is_published', 'reading_time',
             'created_at', 'updated_at', 'schema_org_json', 'seo_fields'
         ]
+        variant_fields = {
+            'image': {
+                'large': 'news_large_webp',
+                'card': 'news_card_webp',
+                'thumb': 'news_thumb_webp',
+            },
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                # Используем news_large_webp для детальной страницы
-                webp_url = obj.news_large_webp.url if hasattr(obj, 'news_large_webp') and obj.news_large_webp else None
-                if not webp_url:
-                    webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['news_large_webp', 'image_webp'], 'image')
 
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'large': 'news_large_webp',
-            'card': 'news_card_webp',
-            'thumb': 'news_thumb_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
+
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
     def get_schema_org_json(self, obj):
         """Возвращает Schema.org JSON-LD"""
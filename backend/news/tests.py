@@ -1,3 +1,242 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.api_cache import get_namespace_state
+from core.models import SiteSettings
+from core.pagination import KeysetPagination
+from .admin import make_published, make_unpublished
+from core.search import SEARCH_TABLE, rebuild_index, search_ids
+from core.signals import fill_search_index
+from .models import News
+
+
+def encode_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+
+@override_settings(API_CACHE_ENABLED=False)
+@mock.patch.object(KeysetPagination, 'page_size', 2)
+class NewsCursorPaginationTests(TestCase):
+    """Курсорная пагинация /api/news/?pagination=cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        published = timezone.now() - timedelta(days=1)
+        cls.news = []
+        for number in range(5):
+            cls.news.append(News.objects.create(
+                title=f'Новость {number}',
+                slug=f'news-{number}',
+                content='Текст',
+                is_published=True,
+                # Две новости с одной датой: порядок решают created_at и id
+                published_at=published - timedelta(hours=min(number, 3)),
+            ))
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_walk_pages(self):
+        expected = [news.pk for news in News.objects.filter(is_published=True).order_by(
+            '-published_at', '-created_at', 'id'
+        )]
+
+        pages = [self.get_page('/api/news/?pagination=cursor')]
+        while pages[-1]['next']:
+            pages.append(self.get_page(pages[-1]['next']))
+        ids = [item['id'] for page in pages for item in page['results']]
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        # Назад по ссылкам previous - те же страницы
+        previous = self.get_page(pages[-1]['previous'])
+        self.assertEqual(previous['results'], pages[-2]['results'])
+
+    def test_malformed_cursor(self):
+        cursors = [
+            'не base64',
+            encode_cursor([1, 2]),
+            encode_cursor({'r': 0, 'p': ['a', 'b']}),
+            encode_cursor({'r': 0, 'p': ['a', 'b', 'c']}),
+            encode_cursor({'r': 0, 'p': [None, None, 1]}),
+            encode_cursor({'r': 0, 'p': [[], {}, 'x']}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/news/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class NewsSearchTests(TestCase):
+    """Полнотекстовый поиск /api/news/?search= (индекс FTS5)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        published = timezone.now() - timedelta(days=1)
+        cls.sauna = News.objects.create(
+            title='Открылась новая баня',
+            slug='sauna',
+            content='<p>Баня у самого озера, с купелью.</p>',
+            is_published=True,
+            published_at=published,
+        )
+        cls.lake = News.objects.create(
+            title='Рыбалка',
+            slug='lake',
+            content='Зимняя рыбалка на озерах и банях',
+            is_published=True,
+            published_at=published,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get('/api/news/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_inflected_forms(self):
+        for query in ['баня', 'бани', 'баней', 'банями']:
+            with self.subTest(query=query):
+                # Совпадение в заголовке ранжируется выше
+                self.assertEqual(self.search(query), [self.sauna.pk, self.lake.pk])
+        self.assertCountEqual(self.search('озёрами'), [self.sauna.pk, self.lake.pk])
+        self.assertEqual(self.search('рыбалкой'), [self.lake.pk])
+        self.assertEqual(self.search('купели озеро'), [self.sauna.pk])
+        self.assertEqual(self.search('самолёт'), [])
+
+    def test_index_updated_on_save(self):
+        self.lake.title = 'Катание на лыжах'
+        self.lake.save()
+        self.assertEqual(self.search('лыжи'), [self.lake.pk])
+        self.assertEqual(self.search('рыбалка'), [self.lake.pk])
+
+        self.lake.content = 'Лыжная трасса вокруг леса'
+        self.lake.save()
+        self.assertEqual(self.search('рыбалка'), [])
+        self.assertEqual(self.search('бани'), [self.sauna.pk])
+
+    def test_index_updated_on_delete(self):
+        self.sauna.delete()
+        self.assertEqual(search_ids('news.News', ['баня']), [self.lake.pk])
+        self.assertEqual(search_ids('news.News', ['купель']), [])
+
+    def test_rebuild_index(self):
+        # update() не отправляет сигналы: индекс догоняет rebuild_index
+        News.objects.filter(pk=self.lake.pk).update(title='Катание на лыжах')
+        self.assertEqual(self.search('лыжи'), [])
+        self.assertEqual(rebuild_index('news.News'), 2)
+        self.assertEqual(self.search('лыжи'), [self.lake.pk])
+
+    def test_fill_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        core = apps.get_app_config('core')
+        migration = SimpleNamespace(app_label='core', name='0008_search_index')
+
+        # Миграция откатывается или уже применена - индекс не трогается
+        fill_search_index(sender=core, apps=apps, plan=[(migration, True)])
+        fill_search_index(sender=core, apps=apps, plan=[])
+        self.assertEqual(self.search('баня'), [])
+
+        fill_search_index(sender=core, apps=apps, plan=[(migration, False)])
+        self.assertEqual(self.search('баня'), [self.sauna.pk, self.lake.pk])
+
+
+@override_settings(API_CACHE_ENABLED=True, SOLO_CACHE=None)
+class NewsCacheTests(TestCase):
+    """Кеш ответов /api/news/: сброс при изменениях и отложенная публикация"""
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(address='Пермский край')
+        cls.published = News.objects.create(
+            title='Опубликована',
+            slug='published',
+            content='Текст',
+            is_published=True,
+            published_at=timezone.now() - timedelta(days=1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get_ids(self, **headers):
+        response = self.client.get('/api/news/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']], response
+
+    def assert_bumps(self, change, namespaces=('news', 'bundle-home')):
+        before = [get_namespace_state(namespace)[0] for namespace in namespaces]
+        lodges = get_namespace_state('lodges')[0]
+        change()
+        after = [get_namespace_state(namespace)[0] for namespace in namespaces]
+        self.assertTrue(all(a != b for a, b in zip(before, after)))
+        self.assertEqual(get_namespace_state('lodges')[0], lodges)
+
+    def test_invalidation(self):
+        news = News.objects.create(title='Новая', slug='new', content='Текст')
+        self.assert_bumps(news.save)
+        self.assert_bumps(news.delete)
+
+        settings = SiteSettings.objects.get()
+        before = get_namespace_state('news')[0]
+        settings.save()
+        self.assertNotEqual(get_namespace_state('news')[0], before)
+
+    def test_admin_actions(self):
+        draft = News.objects.create(title='Черновик', slug='draft', content='Текст')
+        ids, _ = self.get_ids()
+        self.assertEqual(ids, [self.published.pk])
+
+        # queryset.update() не отправляет сигналы: сброс делает действие
+        queryset = News.objects.filter(pk=draft.pk)
+        self.assert_bumps(lambda: make_published(None, None, queryset))
+        ids, _ = self.get_ids()
+        self.assertEqual(ids, [draft.pk, self.published.pk])
+
+        self.assert_bumps(lambda: make_unpublished(None, None, queryset))
+        ids, _ = self.get_ids()
+        self.assertEqual(ids, [self.published.pk])
+
+    def test_scheduled_publication(self):
+        now = timezone.now()
+        scheduled = News.objects.create(
+            title='Отложенная',
+            slug='scheduled',
+            content='Текст',
+            is_published=True,
+            published_at=now + timedelta(hours=1),
+        )
+        ids, response = self.get_ids()
+        self.assertEqual(ids, [self.published.pk])
+        etag = response.headers['ETag']
+
+        with mock.patch('django.utils.timezone.now', return_value=now + timedelta(minutes=30)):
+            ids, _ = self.get_ids()
+            self.assertEqual(ids, [self.published.pk])
+            self.assertEqual(self.client.get('/api/news/', headers={'If-None-Match': etag}).status_code, 304)
+
+        # Дата публикации наступила без сохранения модели
+        with mock.patch('django.utils.timezone.now', return_value=now + timedelta(hours=2)):
+            ids, response = self.get_ids(if_none_match=etag)
+        self.assertEqual(ids, [scheduled.pk, self.published.pk])
+        self.assertNotEqual(response.headers['ETag'], etag)
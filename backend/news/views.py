@@ -2,19 +2,31 @@ from rest_framework import viewsets, filters
 from rest_framework.permissions import AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
+from core.api_cache import CachedResponseMixin
+from core.async_reads import AsyncReadMixin
+from core.media_urls import MediaBaseMixin
+from core.pagination import SelectablePaginationMixin
+from core.search import FullTextSearchFilter
+from core.sparse_fields import SparseFieldsViewMixin
 from .models import News
 from .serializers import NewsListSerializer, NewsDetailSerializer
 
 
-class NewsViewSet(viewsets.ReadOnlyModelViewSet):
+class NewsViewSet(AsyncReadMixin, SelectablePaginationMixin, SparseFieldsViewMixin, MediaBaseMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для новостей"""
-    queryset = News.objects.filter(is_published=True, published_at__lte=timezone.now())
+    cache_namespace = 'news'
+    queryset = News.objects.filter(is_published=True).prefetch_related('renditions')
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['is_published']
     search_fields = ['title', 'content', 'short_description']
     ordering_fields = ['published_at', 'created_at']
-    ordering = ['-published_at', '-created_at']
+    # Совпадает с индексом news_published_order_idx
+    ordering = ['-published_at', '-created_at', 'id']
+
+    def get_queryset(self):
+        """Отложенные новости появляются, когда наступает published_at"""
+        return super().get_queryset().filter(published_at__lte=timezone.now())
 
     def get_serializer_class(self):
         """Используем разные сериализаторы для списка и детальной страницы"""
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0002_alter_restaurant_description'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mealtype',
+            index=models.Index(fields=['order', 'name'], name='mealtype_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantbenefit',
+            index=models.Index(fields=['restaurant', 'order', 'id'], name='restaurantbenefit_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantbenefit',
+            index=models.Index(fields=['order', 'id'], name='restaurantbenefit_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantimage',
+            index=models.Index(fields=['restaurant', 'order', 'id'], name='restaurantimage_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantimage',
+            index=models.Index(fields=['order', 'id'], name='restaurantimage_list_idx'),
+        ),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from solo.models import SingletonModel
+from django.contrib.contenttypes.fields import GenericRelation
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
-from core.models import SEOMixin
-from core.image_processors import NoOpProcessor
+from core.models import SEOMixin, SiteSettings
+from core.singletons import get_singleton
+from core.image_processors import LQIPProcessor
 
 
 class Restaurant(SingletonModel, SEOMixin):
@@ -46,12 +48,7 @@ class Restaurant(SingletonModel, SEOMixin):
 
     def get_schema_org_json(self):
         """Генерирует JSON-LD для Schema.org (Restaurant)"""
-        site_settings = None
-        try:
-            from core.models import SiteSettings
-            site_settings = SiteSettings.objects.get()
-        except Exception:
-            pass
+        site_settings = get_singleton(SiteSettings)
 
         schema = {
             "@context": "https://schema.org",
@@ -105,10 +102,11 @@ class RestaurantImage(models.Model):
     )
     restaurant_placeholder_webp = ImageSpecField(
         source='image',
-        processors=[NoOpProcessor()],
+        processors=[LQIPProcessor()],
         format='WEBP',
         options={'quality': 50}
     )
+    renditions = GenericRelation('core.Rendition')
     alt_text = models.CharField(
         max_length=255,
         blank=True,
@@ -125,6 +123,11 @@ class RestaurantImage(models.Model):
         verbose_name = 'Изображение ресторана'
         verbose_name_plural = 'Изображения ресторана'
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['restaurant', 'order', 'id'], name='restaurantimage_order_idx'),
+            # /api/restaurant/images/: все изображения по порядку
+            models.Index(fields=['order', 'id'], name='restaurantimage_list_idx'),
+        ]
 
     def __str__(self):
         return f'{self.restaurant.title} - Изображение {self.order}'
@@ -165,6 +168,9 @@ class MealType(models.Model):
         verbose_name = 'Тип приема пищи'
         verbose_name_plural = 'Типы приема пищи'
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name'], name='mealtype_order_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -192,6 +198,10 @@ class RestaurantBenefit(models.Model):
         verbose_name = 'Преимущество ресторана'
         verbose_name_plural = 'Преимущества ресторана'
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['restaurant', 'order', 'id'], name='restaurantbenefit_order_idx'),
+            models.Index(fields=['order', 'id'], name='restaurantbenefit_list_idx'),
+        ]
 
     def __str__(self):
         return self.text
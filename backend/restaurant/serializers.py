@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Restaurant, RestaurantImage, MealType, RestaurantBenefit
 from core.serializer_mixins import ImageVariantsMixin
+from core.sparse_fields import SparseFieldsMixin
 
 
 class RestaurantImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
@@ -8,71 +9,69 @@ class RestaurantImageSerializer(ImageVariantsMixin, serializers.ModelSerializer)
     image_url = serializers.SerializerMethodField()
     image_webp_url = serializers.SerializerMethodField()
     image_placeholder_url = serializers.SerializerMethodField()
+    image_placeholder = serializers.SerializerMethodField()
+    image_blurhash = serializers.SerializerMethodField()
     image_variants = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
 
     class Meta:
         model = RestaurantImage
         fields = [
             'id', 'image_url', 'image_webp_url', 'image_placeholder_url',
-            'image_variants', 'alt_text', 'order'
+            'image_placeholder', 'image_blurhash',
+            'image_variants', 'image_sources', 'alt_text', 'order'
         ]
+        variant_fields = {
+            'image': {
+                'large': 'restaurant_large_webp',
+                'card': 'restaurant_card_webp',
+            },
+        }
 
     def get_image_url(self, obj):
         """Возвращает URL оригинального изображения"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.get_file_url(obj.image)
 
     def get_image_webp_url(self, obj):
         """Возвращает URL WebP изображения с fallback на оригинал"""
-        if obj.image:
-            request = self.context.get('request')
-            try:
-                # Используем restaurant_large_webp как основной вариант
-                webp_url = obj.restaurant_large_webp.url if hasattr(obj, 'restaurant_large_webp') and obj.restaurant_large_webp else None
-                if not webp_url:
-                    webp_url = obj.image_webp.url if hasattr(obj, 'image_webp') and obj.image_webp else None
-                if webp_url:
-                    if request:
-                        return request.build_absolute_uri(webp_url)
-                    return webp_url
-            except:
-                pass
-            # Fallback на оригинальное изображение
-            return self.get_image_url(obj)
-        return None
+        return self.get_rendition_url(obj, ['restaurant_large_webp', 'image_webp'], 'image')
 
     def get_image_placeholder_url(self, obj):
         """Возвращает URL placeholder"""
         return super().get_image_placeholder_url(obj, 'restaurant_placeholder_webp', 'image')
 
+    def get_image_placeholder(self, obj):
+        """Возвращает LQIP-превью как data URI"""
+        return self.get_placeholder_data_uri(obj, 'restaurant_placeholder_webp', 'image')
+
+    def get_image_blurhash(self, obj):
+        """Возвращает BlurHash превью"""
+        return self.get_placeholder_blurhash(obj, 'restaurant_placeholder_webp', 'image')
+
     def get_image_variants(self, obj):
         """Возвращает варианты размеров изображения"""
-        variant_fields = {
-            'large': 'restaurant_large_webp',
-            'card': 'restaurant_card_webp',
-        }
-        return super().get_image_variants(obj, variant_fields, 'image')
+        return super().get_image_variants(obj, self.Meta.variant_fields['image'], 'image')
+
+    def get_image_sources(self, obj):
+        """Возвращает варианты изображения с размерами и srcset"""
+        return super().get_image_sources(obj, 'image')
 
 
-class MealTypeSerializer(serializers.ModelSerializer):
+class MealTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для типа приема пищи"""
     class Meta:
         model = MealType
         fields = ['id', 'name', 'icon_name', 'description', 'time_start', 'order']
 
 
-class RestaurantBenefitSerializer(serializers.ModelSerializer):
+class RestaurantBenefitSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для преимуществ ресторана"""
     class Meta:
         model = RestaurantBenefit
         fields = ['id', 'text', 'order']
 
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для ресторана"""
     images = RestaurantImageSerializer(many=True, read_only=True)
     meal_types = MealTypeSerializer(many=True, read_only=True)
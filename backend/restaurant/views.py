@@ -1,6 +1,11 @@
 from rest_framework import viewsets, generics, filters
 from rest_framework.permissions import AllowAny
+from django.db.models import prefetch_related_objects
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
+from core.api_cache import CachedResponseMixin
+from core.media_urls import MediaBaseMixin
+from core.singletons import get_singleton
 from .models import Restaurant, RestaurantImage, MealType, RestaurantBenefit
 from .serializers import (
     RestaurantSerializer, RestaurantImageSerializer,
@@ -8,15 +13,20 @@ from .serializers import (
 )
 
 
-class RestaurantView(generics.RetrieveAPIView):
+class RestaurantView(MediaBaseMixin, CachedResponseMixin, generics.RetrieveAPIView):
     """View для ресторана (Singleton)"""
+    cache_namespace = 'restaurant'
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
     permission_classes = [AllowAny]
 
     def get_object(self):
         """Возвращает единственную запись ресторана"""
-        return Restaurant.objects.get()
+        restaurant = get_singleton(Restaurant)
+        if restaurant is None:
+            raise Http404
+        prefetch_related_objects([restaurant], 'images__renditions')
+        return restaurant
 
     def get_serializer_context(self):
         """Передаем request в контекст сериализатора"""
@@ -25,9 +35,10 @@ class RestaurantView(generics.RetrieveAPIView):
         return context
 
 
-class RestaurantImageViewSet(viewsets.ReadOnlyModelViewSet):
+class RestaurantImageViewSet(MediaBaseMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для изображений ресторана"""
-    queryset = RestaurantImage.objects.all()
+    cache_namespace = 'restaurant'
+    queryset = RestaurantImage.objects.prefetch_related('renditions')
     serializer_class = RestaurantImageSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -42,8 +53,9 @@ class RestaurantImageViewSet(viewsets.ReadOnlyModelViewSet):
         return context
 
 
-class MealTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class MealTypeViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для типов приема пищи"""
+    cache_namespace = 'restaurant'
     queryset = MealType.objects.all()
     serializer_class = MealTypeSerializer
     permission_classes = [AllowAny]
@@ -52,8 +64,9 @@ class MealTypeViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ['order', 'name']
 
 
-class RestaurantBenefitViewSet(viewsets.ReadOnlyModelViewSet):
+class RestaurantBenefitViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для преимуществ ресторана"""
+    cache_namespace = 'restaurant'
     queryset = RestaurantBenefit.objects.all()
     serializer_class = RestaurantBenefitSerializer
     permission_classes = [AllowAny]
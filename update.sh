@@ -48,6 +48,8 @@ source venv/bin/activate
 pip install -r requirements.txt
 python manage.py migrate
 python manage.py collectstatic --noinput
+# Дозаполняем манифест вариантов изображений (готовые варианты пропускаются)
+python manage.py process_images --all --workers 2
 sudo systemctl restart sp-new-django
 
 echo "✅ Обновление завершено успешно!"